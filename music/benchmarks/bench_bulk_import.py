@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+歌曲导入吞吐基准
+================
+
+在临时目录中新建数据库，对比逐条 create_song 与 bulk_upsert_songs 的导入速度，
+并测量对已存在歌曲的批量更新 (ON CONFLICT DO UPDATE)。
+
+用法:
+    python benchmarks/bench_bulk_import.py [--songs 50000] [--single 2000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+# DatabaseManager 把数据库放在 ~/.hibiki_music 下，基准使用独立的临时 HOME
+os.environ["HOME"] = tempfile.mkdtemp(prefix="hibiki_bench_")
+
+from hibiki.music.data.database import SongService  # noqa: E402
+from hibiki.music.data.models import SongCreate  # noqa: E402
+
+
+def make_songs(count: int, prefix: str):
+    for i in range(count):
+        yield SongCreate(
+            title=f"Song {i}",
+            artist=f"Artist {i % 500}",
+            album=f"Album {i % 4000}",
+            duration=180.0 + i % 120,
+            year=1970 + i % 50,
+            track_number=i % 12 + 1,
+            genre="Pop",
+            file_format="flac",
+            file_path=f"/library/{prefix}/{i // 100}/{i}.flac",
+            file_size=30_000_000 + i,
+        )
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count:>7} songs {seconds:>8.2f}s {count / seconds:>10.0f} songs/s"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hibiki Music import throughput benchmark")
+    parser.add_argument("--songs", type=int, default=50_000)
+    parser.add_argument("--single", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    service = SongService()
+
+    start = time.perf_counter()
+    for song in make_songs(args.single, "single"):
+        service.create_song(song)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids = service.bulk_upsert_songs(make_songs(args.songs, "bulk"), batch_size=args.batch_size)
+    bulk = time.perf_counter() - start
+    assert len(ids) == args.songs
+
+    start = time.perf_counter()
+    service.bulk_upsert_songs(make_songs(args.songs, "bulk"), batch_size=args.batch_size)
+    update = time.perf_counter() - start
+
+    print(f"create_song (per-song txn)  {_rate(args.single, single)}")
+    print(f"bulk_upsert_songs (insert)  {_rate(args.songs, bulk)}")
+    print(f"bulk_upsert_songs (update)  {_rate(args.songs, update)}")
+
+
+if __name__ == "__main__":
+    main()
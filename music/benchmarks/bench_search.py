@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+歌曲搜索延迟基准
+================
+
+逐步扩大曲库（默认 25k / 50k / 100k），对比原来的 LIKE '%q%' 全表扫描
+与 FTS5 索引查询 (search_songs) 的平均延迟。
+
+用法:
+    python benchmarks/bench_search.py [--sizes 25000 50000 100000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+# DatabaseManager 把数据库放在 ~/.hibiki_music 下，基准使用独立的临时 HOME
+os.environ["HOME"] = tempfile.mkdtemp(prefix="hibiki_bench_")
+
+from sqlmodel import func, or_, select  # noqa: E402
+
+from hibiki.music.data.database import (  # noqa: E402
+    FTS_WEIGHTS, SongService, _fts_phrase, _songs_fts, _songs_fts_ref
+)
+from hibiki.music.data.models import Song, SongCreate  # noqa: E402
+
+_WORDS = ["love", "night", "summer", "dream", "blue", "heart", "rain", "city", "star", "light",
+          "晴天", "夜曲", "稻香", "青花瓷", "告白", "海阔天空", "光辉岁月", "红豆", "传奇", "月亮"]
+# 既有命中很多的常见词，也有只命中几十首的精确查询（LIKE 必须扫完全表）
+_QUERIES = ["summer rain", "青花瓷 告白", "Artist 427", "Album 1234", "光辉岁月 红豆 9"]
+
+
+def make_songs(start: int, count: int):
+    for i in range(start, start + count):
+        yield SongCreate(
+            title=f"{_WORDS[i % 20]} {_WORDS[(i * 7) % 20]} {i}",
+            artist=f"Artist {i % 700}",
+            album=f"Album {i % 5000}",
+            genre="Pop",
+            file_path=f"/library/{i // 100}/{i}.flac",
+        )
+
+
+def like_search(service: SongService, text: str, limit: int = 50):
+    """改动前 search_songs 的 LIKE 查询（只取 id，排除结果转换的开销）"""
+    with service.db.get_session() as session:
+        statement = select(Song.id).where(or_(
+            Song.title.contains(text), Song.artist.contains(text), Song.album.contains(text)
+        )).order_by(Song.title).limit(limit)
+        return session.exec(statement).all()
+
+
+def fts_search(service: SongService, text: str, limit: int = 50, ranked: bool = False):
+    """search_songs 的 FTS5 查询（只取 id）"""
+    with service.db.get_session() as session:
+        statement = select(Song.id).join(_songs_fts, _songs_fts.c.rowid == Song.id).where(
+            _songs_fts_ref.op("MATCH")(_fts_phrase(text))
+        )
+        if ranked:
+            statement = statement.order_by(func.bm25(_songs_fts_ref, *FTS_WEIGHTS))
+        else:
+            statement = statement.order_by(Song.title)
+        return session.exec(statement.limit(limit)).all()
+
+
+def _mean_ms(fn, repeat: int = 5) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in _QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (repeat * len(_QUERIES)) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hibiki Music search latency benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25_000, 50_000, 100_000])
+    args = parser.parse_args()
+
+    service = SongService()
+    loaded = 0
+    print(f"{'songs':>8}{'LIKE ms':>10}{'FTS ms':>10}{'FTS ranked ms':>15}")
+    for size in sorted(args.sizes):
+        service.bulk_upsert_songs(make_songs(loaded, size - loaded))
+        loaded = size
+
+        like = _mean_ms(lambda q: like_search(service, q))
+        fts = _mean_ms(lambda q: fts_search(service, q))
+        ranked = _mean_ms(lambda q: fts_search(service, q, ranked=True))
+        print(f"{size:>8}{like:>10.2f}{fts:>10.2f}{ranked:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+歌曲搜索索引基准
+================
+
+构造一个中英文混合的合成曲库，逐字符模拟输入搜索词，
+对比原来的线性扫描 (_apply_filters) 与 SongSearchIndex 每次按键的耗时。
+
+用法:
+    python benchmarks/bench_search_index.py [--songs 50000]
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from hibiki.music.core.search_index import SongSearchIndex
+
+_LATIN = ["love", "night", "summer", "dream", "blue", "heart", "rain", "city", "star", "light",
+          "forever", "wind", "fire", "moon", "road", "song", "river", "shadow", "gold", "time"]
+_CJK = ["晴天", "夜曲", "稻香", "七里香", "青花瓷", "告白", "气球", "东风破", "花海", "简单爱",
+        "海阔天空", "光辉岁月", "红豆", "传奇", "月亮", "代表", "我的心", "恋人", "夜空", "樱花"]
+_ARTISTS = ["周杰伦", "陈奕迅", "王菲", "Beyond", "邓紫棋", "Taylor Swift", "Coldplay", "宇多田ヒカル",
+            "Adele", "五月天", "林俊杰", "The Beatles", "米津玄師", "Radiohead", "孙燕姿"]
+_QUERIES = ["周杰伦", "love", "夜曲", "taylor", "heart of gold", "ヒカル", "天空"]
+
+
+@dataclass
+class Song:
+    id: str
+    title: str
+    artist: str
+    album: Optional[str] = None
+
+
+def make_library(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    songs = []
+    for i in range(count):
+        words = _LATIN if rng.random() < 0.5 else _CJK
+        title = " ".join(rng.sample(words, 2)) + f" {i}"
+        album = rng.choice(words).title() + " Collection"
+        songs.append(Song(str(i), title, rng.choice(_ARTISTS), album))
+    return songs
+
+
+def linear_filter(songs, search):
+    """改动前 MusicAppState._apply_filters 的文本搜索"""
+    search = search.lower()
+    return [
+        song for song in songs
+        if search in song.title.lower()
+        or search in song.artist.lower()
+        or (song.album and search in song.album.lower())
+    ]
+
+
+def _per_keystroke(search, queries):
+    timings = []
+    for query in queries:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            search(query[:end])
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hibiki Music search index benchmark")
+    parser.add_argument("--songs", type=int, default=50_000)
+    args = parser.parse_args()
+
+    songs = make_library(args.songs)
+
+    start = time.perf_counter()
+    index = SongSearchIndex()
+    index.rebuild(songs)
+    build = time.perf_counter() - start
+
+    extra = make_library(1_000, seed=11)
+    start = time.perf_counter()
+    index._apply_change(len(index), 0, extra)
+    append = time.perf_counter() - start
+    songs = songs + extra
+
+    for query in _QUERIES:
+        assert index.search(query) == linear_filter(songs, query), query
+
+    linear = _per_keystroke(lambda q: linear_filter(songs, q), _QUERIES)
+    indexed = _per_keystroke(index.search, _QUERIES)
+
+    print(f"songs={len(songs)} keystrokes={len(indexed)}")
+    print(f"index build: {build * 1e3:.0f} ms, append 1000 songs: {append * 1e3:.1f} ms")
+    print(f"{'mode':<10}{'mean ms':>10}{'max ms':>10}")
+    for name, timings in (("linear", linear), ("indexed", indexed)):
+        print(f"{name:<10}{sum(timings) / len(timings) * 1e3:>10.2f}{max(timings) * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
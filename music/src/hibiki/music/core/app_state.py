@@ -5,11 +5,15 @@
 基于 Hibiki UI Signal 系统的全局响应式状态管理
 """
 
-from hibiki.ui import Signal, Computed, Effect
+from hibiki.ui import Signal, Computed, Effect, ListSignal, run_on_ui_thread
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from datetime import datetime
 
+from hibiki.music.data.models import SongFilter
+
+from .search_index import SongSearchIndex
+
 # 导入数据模型 (将在 MVP Phase 2 实现)
 # from data.models import Song, SmartPlaylist, TagFilter
 
@@ -22,16 +26,38 @@ class Song:
     album: Optional[str] = None
     duration: float = 0.0
     file_path: str = ""
+    artwork_hash: Optional[str] = None  # 封面缩略图缓存键
 
 @dataclass  
 class TagFilter:
-    """临时标签筛选器 - MVP v0.1"""
+    """标签筛选器 - 各维度内任一值命中即可，维度之间取交集"""
     search_text: str = ""
     selected_tags: List[str] = None
+    languages: List[str] = None
+    eras: List[str] = None
+    emotions: List[str] = None
     
     def __post_init__(self):
         if self.selected_tags is None:
             self.selected_tags = []
+        if self.languages is None:
+            self.languages = []
+        if self.eras is None:
+            self.eras = []
+        if self.emotions is None:
+            self.emotions = []
+    
+    def is_empty(self) -> bool:
+        return not (self.selected_tags or self.languages or self.eras or self.emotions)
+    
+    def to_song_filter(self) -> SongFilter:
+        """转换为数据层的 SongFilter（情感只要求存在，不限强度）"""
+        return SongFilter(
+            languages=self.languages or None,
+            eras=self.eras or None,
+            emotions={emotion: 0.0 for emotion in self.emotions} or None,
+            tags=self.selected_tags or None,
+        )
 
 class MusicAppState:
     """
@@ -70,14 +96,18 @@ class MusicAppState:
         # ================================
         # 音乐库状态  
         # ================================
-        self.all_songs = Signal([])       # List[Song] - 所有歌曲
+        self.all_songs = ListSignal()     # List[Song] - 所有歌曲，原地追加并发出变更记录
         self.current_playlist = Signal([]) # List[Song] - 当前播放列表
         self.selected_song = Signal(None) # Song | None - 选中的歌曲
         
         # 筛选和搜索
         self.current_filter = Signal(TagFilter())
         self.search_query = Signal("")
-        self.filtered_songs = Computed(lambda: self._apply_filters())
+        self._search_index = SongSearchIndex()  # 随 all_songs 增量维护
+        self.facet_index = Signal(None)  # FacetBitmapIndex | None - 标签筛选用的位图索引
+        self.facet_counts = Signal({})   # 当前标签筛选命中集合的分面计数
+        # 无筛选时直接返回 all_songs 的列表本身，原地修改后新旧值是同一对象，需按版本通知
+        self.filtered_songs = Computed(lambda: self._apply_filters(), equals="versioned")
         
         # ================================
         # UI 状态
@@ -99,7 +129,10 @@ class MusicAppState:
         # 统计和分析数据
         # ================================
         self.total_songs = Computed(lambda: len(self.all_songs.value))
-        self.total_duration = Computed(lambda: sum(song.duration for song in self.all_songs.value))
+        self.library_stats = Signal(None)  # LibraryStats | None - 数据库中的汇总统计
+        self._duration_version = None
+        self._duration_total = 0.0
+        self.total_duration = Computed(self._compute_total_duration)
         self.play_progress = Computed(lambda: 
             self.position.value / self.duration.value if self.duration.value > 0 else 0.0
         )
@@ -122,22 +155,41 @@ class MusicAppState:
         else:
             self.logger.debug("🎵 [AppState] AudioPlayer 已存在，跳过初始化")
         
+    def _compute_total_duration(self) -> float:
+        """总时长 - 按 all_songs 的变更记录增量维护"""
+        songs = self.all_songs.value
+        changes = None
+        if self._duration_version is not None:
+            changes = self.all_songs.changes_since(self._duration_version)
+        
+        if changes is None:
+            total = sum(song.duration for song in songs)
+        else:
+            total = self._duration_total
+            for change in changes:
+                total += sum(song.duration for song in change.inserted)
+                total -= sum(song.duration for song in change.removed)
+        
+        self._duration_version = self.all_songs.version
+        self._duration_total = total
+        return total
+        
     def _apply_filters(self) -> List[Song]:
         """应用当前筛选条件"""
         songs = self.all_songs.value
         filter_obj = self.current_filter.value
-        search = self.search_query.value.lower()
+        search = self.search_query.value
         
-        # 文本搜索
+        # 文本搜索：查索引而不是逐首歌曲做字符串处理
         if search:
-            songs = [
-                song for song in songs 
-                if search in song.title.lower() 
-                or search in song.artist.lower()
-                or (song.album and search in song.album.lower())
-            ]
+            self._search_index.sync(self.all_songs)
+            songs = self._search_index.search(search)
             
-        # TODO: 标签筛选将在 MVP Phase 2 实现
+        # 标签筛选：位图索引求出命中的歌曲 id 集合
+        index = self.facet_index.value
+        if index is not None and not filter_obj.is_empty():
+            matched = set(index.ids(index.match(filter_obj.to_song_filter())))
+            songs = [song for song in songs if song.id.isdigit() and int(song.id) in matched]
         
         return songs
         
@@ -237,9 +289,31 @@ class MusicAppState:
     
     def add_songs(self, songs: List[Song]):
         """添加歌曲到音乐库"""
-        current_songs = self.all_songs.value.copy()
-        current_songs.extend(songs)
-        self.all_songs.value = current_songs
+        self.all_songs.extend(songs)
+        
+    def apply_library_changes(self, added: List[Song] = (), updated: List[Song] = (),
+                              removed_ids: List[str] = ()):
+        """
+        应用目录监听得到的增量变更（可从后台线程调用）
+        
+        整个操作作为一个闭包在 UI 线程上执行：执行时才按 id 查找位置，
+        之前排队的追加/删除都已生效，位置不会过期。删除和替换从后往前执行，新增的追加到末尾。
+        """
+        run_on_ui_thread(self._apply_library_changes, tuple(added), tuple(updated), frozenset(removed_ids))
+    
+    def _apply_library_changes(self, added, updated, removed):
+        replacements = {song.id: song for song in updated}
+        positions = [
+            (index, song.id) for index, song in enumerate(self.all_songs.value)
+            if song.id in removed or song.id in replacements
+        ]
+        for index, song_id in reversed(positions):
+            if song_id in removed:
+                self.all_songs.splice(index, 1)
+            else:
+                self.all_songs.set_item(index, replacements[song_id])
+        if added:
+            self.all_songs.extend(added)
         
     def set_playlist(self, songs: List[Song]):
         """设置当前播放列表"""
@@ -253,12 +327,32 @@ class MusicAppState:
     # 标签系统方法 (MVP v0.2)
     # ================================
     
+    def set_library_stats(self, stats):
+        """设置数据库汇总统计（LibraryStats），可从后台线程调用"""
+        self.library_stats.value = stats
+        
+    def set_facet_index(self, index):
+        """设置标签位图索引（FacetBitmapIndex），曲库变化后重新加载并设置"""
+        self.facet_index.value = index
+        
     def apply_tag_filter(self, languages: List[str] = None, 
                         eras: List[str] = None,
-                        emotions: List[str] = None):
-        """应用标签筛选"""
-        # TODO: 实现完整的标签筛选逻辑
-        pass
+                        emotions: List[str] = None,
+                        tags: List[str] = None):
+        """应用标签筛选，并同步更新分面计数"""
+        current = self.current_filter.value
+        tag_filter = TagFilter(
+            search_text=current.search_text,
+            selected_tags=list(tags or []),
+            languages=list(languages or []),
+            eras=list(eras or []),
+            emotions=list(emotions or []),
+        )
+        self.current_filter.value = tag_filter
+        
+        index = self.facet_index.value
+        if index is not None:
+            self.facet_counts.value = index.facet_counts(index.match(tag_filter.to_song_filter()))
         
     def get_filtered_count(self) -> int:
         """获取筛选后的歌曲数量"""
@@ -268,6 +362,7 @@ class MusicAppState:
         """清空所有筛选条件"""
         self.current_filter.value = TagFilter()
         self.search_query.value = ""
+        self.facet_counts.value = {}
         
     # ================================
     # 音频播放器控制方法
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+🖼️ Hibiki Music 封面异步加载
+
+界面请求的是 (封面哈希, 显示像素) 对应的缩略图：
+- 解码在后台线程执行，主线程只接收结果
+- 已解码的图片放在 LRU 中，滚动回来时直接命中
+- 同一缩略图的并发请求只解码一次
+- 只解码 ArtworkCache 中的缩略图；直接给出的图片文件先在后台生成缩略图，原图不会交给解码器
+
+解码器由界面层提供（macOS 上为 NSImage），这里不依赖 AppKit。
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from hibiki.music.data.artwork import THUMBNAIL_SIZES, ArtworkCache
+
+from .logging import get_logger
+
+logger = get_logger("artwork_loader")
+
+Decoder = Callable[[str], Any]
+
+
+class ArtworkLoader:
+    """缩略图解码器 + 已解码图片的 LRU"""
+
+    def __init__(self, decoder: Decoder, cache: Optional[ArtworkCache] = None,
+                 capacity: int = 256, max_workers: int = 2):
+        """
+        Args:
+            decoder: 缩略图文件路径 -> 图片对象，失败时返回 None
+            cache: 封面缩略图缓存，默认使用 ~/.hibiki_music/artwork
+            capacity: LRU 中最多保留的已解码图片数
+            max_workers: 解码线程数
+        """
+        self.decoder = decoder
+        self.cache = cache or ArtworkCache()
+        self.capacity = capacity
+
+        self._images: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._pending: Dict[Hashable, List[Callable[[Any], None]]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hibiki-artwork")
+        self.decoded = 0  # 实际解码次数
+
+    def request(self, art_hash: str, size: int, callback: Callable[[Any], None]) -> Optional[Any]:
+        """
+        请求封面缩略图
+
+        已解码时直接返回图片（不调用 callback）；否则返回 None，
+        解码完成后在后台线程中调用 callback(image)，失败时 image 为 None。
+        """
+        size = _bucket(size)
+        return self._request((art_hash, size), callback, lambda: self.cache.thumbnail_path(art_hash, size))
+
+    def request_file(self, image_path: str, size: int, callback: Callable[[Any], None]) -> Optional[Any]:
+        """请求图片文件（如 cover.jpg）的缩略图，首次请求时在后台生成缩略图"""
+        size = _bucket(size)
+
+        def resolve() -> Optional[Path]:
+            art_hash = self.cache.store_file(image_path)
+            return self.cache.thumbnail_path(art_hash, size) if art_hash else None
+
+        return self._request(("file", image_path, size), callback, resolve)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    # ================================
+    # 内部方法
+    # ================================
+
+    def _request(self, key: Hashable, callback: Callable[[Any], None],
+                 resolve: Callable[[], Optional[Path]]) -> Optional[Any]:
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                return image
+            waiting = self._pending.get(key)
+            if waiting is not None:
+                waiting.append(callback)
+                return None
+            self._pending[key] = [callback]
+        self._executor.submit(self._load, key, resolve)
+        return None
+
+    def _load(self, key: Hashable, resolve: Callable[[], Optional[Path]]) -> None:
+        image = None
+        try:
+            path = resolve()
+            if path is not None:
+                image = self.decoder(str(path))
+        except Exception as e:
+            logger.warning(f"⚠️ 封面解码失败 {key}: {e}")
+
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+            if image is not None:
+                self.decoded += 1
+                self._images[key] = image
+                while len(self._images) > self.capacity:
+                    self._images.popitem(last=False)
+
+        for callback in callbacks:
+            try:
+                callback(image)
+            except Exception as e:
+                logger.error(f"❌ 封面回调失败: {e}")
+
+
+def _bucket(size: int) -> int:
+    """显示像素归到缩略图尺寸档位，同一档位共用一个 LRU 条目"""
+    for thumbnail_size in THUMBNAIL_SIZES:
+        if size <= thumbnail_size:
+            return thumbnail_size
+    return THUMBNAIL_SIZES[-1]
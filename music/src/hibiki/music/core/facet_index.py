@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+🏷️ Hibiki Music 标签位图索引
+
+SongFilter 的内存版求值器，供 UI 即时组合多个筛选维度：
+- 每个 (维度, 值) 一个位图，位图用 Python 大整数表示，第 song_id 位为 1 表示命中
+- 维度内任一值命中取 OR，维度之间按 logic_operator 取 AND / OR
+- 分面计数是命中位图与各值位图求交后的 popcount
+
+匹配语义与 SongService.filter_songs 的 SQL 版本一致。
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from hibiki.music.data.database import FACET_COUNT_KINDS
+from hibiki.music.data.models import FacetKind, SongFilter
+
+from .logging import get_logger
+
+logger = get_logger("facet_index")
+
+# 字节 -> 其中为 1 的位序号，位图转 id 列表时按字节查表
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+
+def _bitmap(ids: Iterable[int]) -> int:
+    """由 id 集合构造位图（一次性写入 bytearray，避免逐位 OR 产生大量大整数拷贝）"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for song_id in ids:
+        buffer[song_id >> 3] |= 1 << (song_id & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class FacetBitmapIndex:
+    """
+    歌曲筛选维度的位图索引
+
+    通过 load() 从数据库一次性构建；目录变化后用 apply() 只重新读取变化的歌曲。
+    """
+
+    def __init__(self, song_ids: Iterable[int],
+                 facet_rows: Iterable[Tuple[str, Optional[str], int, Optional[float]]]):
+        members, numeric, favorites, scores = self._group(facet_rows)
+        self._scores: Dict[str, Dict[int, float]] = dict(scores)  # 情感 -> {song_id: 强度}
+        self._all = _bitmap(song_ids)
+        self._values = {key: _bitmap(ids) for key, ids in members.items()}
+        self._numeric = {key: _bitmap(ids) for key, ids in numeric.items()}
+        self._favorite = _bitmap(favorites)
+        self._threshold_cache: Dict[Tuple[str, float], int] = {}
+        logger.debug(f"🏷️ 位图索引构建完成: {self.count(self._all)} 首歌曲, {len(self._values)} 个标签值")
+
+    @classmethod
+    def load(cls, song_service) -> "FacetBitmapIndex":
+        """从数据库构建索引"""
+        song_ids = (row.id for row in song_service.iter_songs(order_by="id"))
+        return cls(song_ids, song_service.iter_facet_rows())
+
+    def apply(self, delta, song_service) -> "FacetBitmapIndex":
+        """
+        应用一批目录变更（LibraryDelta），返回新索引
+
+        清除新增/更新/删除歌曲在所有位图中的位，再只读取新增和更新歌曲的维度置位；
+        原索引不变，UI 线程可以继续使用它直到新索引被设置。
+        """
+        changed = [row.id for row in delta.added] + [row.id for row in delta.updated]
+        stale_ids = set(changed).union(delta.removed)
+        if not stale_ids:
+            return self
+        keep = ~_bitmap(stale_ids)
+        members, numeric, favorites, scores = self._group(song_service.iter_facet_rows(changed))
+
+        index = object.__new__(FacetBitmapIndex)
+        index._all = self._all & keep | _bitmap(changed)
+        index._values = self._merge(self._values, members, keep)
+        index._numeric = self._merge(self._numeric, numeric, keep)
+        index._favorite = self._favorite & keep | _bitmap(favorites)
+        index._scores = {
+            emotion: values if stale_ids.isdisjoint(values)
+            else {song_id: score for song_id, score in values.items() if song_id not in stale_ids}
+            for emotion, values in self._scores.items()
+        }
+        for emotion, values in scores.items():
+            index._scores[emotion] = {**index._scores.get(emotion, {}), **values}
+        index._threshold_cache = {}
+        return index
+
+    # ================================
+    # 求值
+    # ================================
+
+    def match(self, filters: SongFilter) -> int:
+        """返回满足筛选条件的歌曲位图"""
+        conditions = []
+
+        if filters.languages:
+            conditions.append(self._any(FacetKind.LANGUAGE, filters.languages))
+        if filters.emotions:
+            bitmap = 0
+            for emotion, threshold in filters.emotions.items():
+                bitmap |= self._emotion_at_least(emotion, threshold)
+            conditions.append(bitmap)
+        if filters.themes:
+            conditions.append(self._any(FacetKind.THEME, filters.themes))
+        if filters.eras:
+            conditions.append(self._any(FacetKind.ERA, filters.eras))
+        if filters.styles:
+            conditions.append(self._any(FacetKind.STYLE, filters.styles))
+        if filters.tags:
+            conditions.append(self._any(FacetKind.TAG, filters.tags))
+        if filters.favorite_only:
+            conditions.append(self._favorite)
+        if filters.min_rating:
+            conditions.append(self._range(FacetKind.RATING, filters.min_rating, None))
+        if filters.year_start is not None or filters.year_end is not None:
+            # SQL 版本中两个边界是两个独立条件，OR 组合时任一边界满足即可
+            if filters.logic_operator == "OR":
+                if filters.year_start is not None:
+                    conditions.append(self._range(FacetKind.YEAR, filters.year_start, None))
+                if filters.year_end is not None:
+                    conditions.append(self._range(FacetKind.YEAR, None, filters.year_end))
+            else:
+                conditions.append(self._range(FacetKind.YEAR, filters.year_start, filters.year_end))
+
+        if not conditions:
+            return self._all
+        result = conditions[0]
+        if filters.logic_operator == "OR":
+            for bitmap in conditions[1:]:
+                result |= bitmap
+        else:
+            for bitmap in conditions[1:]:
+                result &= bitmap
+        return result
+
+    def facet_counts(self, bitmap: int) -> Dict[str, Dict[str, int]]:
+        """命中位图在各分面维度上的计数，结构与 SongFilterResult.facet_counts 一致"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for (facet, value), members in self._values.items():
+            if facet in FACET_COUNT_KINDS:
+                count = (members & bitmap).bit_count()
+                if count:
+                    counts.setdefault(facet, {})[value] = count
+        return counts
+
+    @staticmethod
+    def count(bitmap: int) -> int:
+        return bitmap.bit_count()
+
+    @staticmethod
+    def ids(bitmap: int) -> List[int]:
+        """位图转升序 song_id 列表"""
+        data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+        result = []
+        for offset, byte in enumerate(data):
+            if byte:
+                base = offset << 3
+                result.extend(base + bit for bit in _BYTE_BITS[byte])
+        return result
+
+    # ================================
+    # 内部方法
+    # ================================
+
+    @staticmethod
+    def _group(facet_rows: Iterable[Tuple[str, Optional[str], int, Optional[float]]]):
+        """维度行按 (维度, 值) 分组为 id 列表，另外收集收藏和情感强度"""
+        # 键统一用维度的字符串值（str 枚举的哈希与其值不同，不能混用作字典键）
+        members: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        numeric: Dict[Tuple[str, int], List[int]] = defaultdict(list)
+        favorites: List[int] = []
+        scores: Dict[str, Dict[int, float]] = defaultdict(dict)
+
+        for facet, value, song_id, score in facet_rows:
+            if facet in (FacetKind.YEAR, FacetKind.RATING):
+                numeric[(facet, int(score))].append(song_id)
+            elif facet == FacetKind.FAVORITE:
+                favorites.append(song_id)
+            else:
+                members[(facet, value)].append(song_id)
+                if facet == FacetKind.EMOTION:
+                    scores[value][song_id] = score
+        return members, numeric, favorites, scores
+
+    @staticmethod
+    def _merge(bitmaps: Dict[tuple, int], additions: Dict[tuple, List[int]], keep: int) -> Dict[tuple, int]:
+        """位图与 keep 求交后并入新增的 id，丢弃变为空的位图"""
+        merged = {}
+        for key in bitmaps.keys() | additions.keys():
+            bitmap = bitmaps.get(key, 0) & keep | _bitmap(additions.get(key, ()))
+            if bitmap:
+                merged[key] = bitmap
+        return merged
+
+    def _any(self, facet: FacetKind, values: Iterable[str]) -> int:
+        bitmap = 0
+        for value in values:
+            bitmap |= self._values.get((facet.value, value), 0)
+        return bitmap
+
+    def _range(self, facet: FacetKind, low: Optional[int], high: Optional[int]) -> int:
+        bitmap = 0
+        for (kind, value), members in self._numeric.items():
+            if kind == facet.value and (low is None or value >= low) and (high is None or value <= high):
+                bitmap |= members
+        return bitmap
+
+    def _emotion_at_least(self, emotion: str, threshold: float) -> int:
+        key = (emotion, threshold)
+        bitmap = self._threshold_cache.get(key)
+        if bitmap is None:
+            scores = self._scores.get(emotion, {})
+            bitmap = _bitmap(song_id for song_id, score in scores.items() if score >= threshold)
+            self._threshold_cache[key] = bitmap
+        return bitmap
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+👀 Hibiki Music 音乐库目录监听
+
+MusicLibraryScanner.watch() 的实现，用 watchdog 接收文件系统事件
+（Linux 上为 inotify，macOS 上为 FSEvents），原生监听不可用时退回轮询：
+- 事件按路径合并：同一文件的多次修改只处理一次，移动链 a -> b -> c 合并为 a -> c，
+  新建后又删除的文件直接抵消
+- 防抖：最后一个事件之后静默 debounce 秒再处理；持续有事件时最长 max_delay 秒处理一次
+- 合并后的变更交给 MusicLibraryScanner.apply_changes，只更新涉及的歌曲
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set
+
+from watchdog.events import (
+    EVENT_TYPE_CREATED, EVENT_TYPE_DELETED, EVENT_TYPE_MODIFIED, EVENT_TYPE_MOVED,
+    FileSystemEventHandler,
+)
+from watchdog.observers import Observer
+from watchdog.observers.polling import PollingObserver
+
+from .logging import get_logger
+
+logger = get_logger("library_watcher")
+
+# 写入完成事件（watchdog 2.1+，inotify 上才有）
+_EVENT_TYPE_CLOSED = "closed"
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "LibraryWatcher"):
+        super().__init__()
+        self._watcher = watcher
+
+    def on_any_event(self, event):
+        self._watcher._on_event(event)
+
+
+class LibraryWatcher:
+    """
+    音乐库目录监听器
+
+    事件在 watchdog 的线程中合并，防抖到期后在独立的同步线程中写数据库并调用 on_change。
+    """
+
+    def __init__(self, scanner, directory_path: str, on_change: Callable,
+                 debounce: float = 0.2, max_delay: float = 1.0, polling: bool = False):
+        self.scanner = scanner
+        self.directory = str(Path(directory_path).absolute())
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.polling = polling
+
+        self._cond = threading.Condition()
+        self._apply_lock = threading.Lock()
+        self._observer = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        # 待处理的变更
+        self._upserts: Set[str] = set()
+        self._deletes: Set[str] = set()
+        self._moves: Dict[str, str] = {}  # 新路径 -> 最初的路径
+        self._deleted_dirs: Set[str] = set()
+        self._first_event = 0.0
+        self._last_event = 0.0
+
+    # ================================
+    # 生命周期
+    # ================================
+
+    def start(self) -> None:
+        """启动文件系统监听和同步线程"""
+        self._observer = self._start_observer(PollingObserver if self.polling else Observer)
+        self._thread = threading.Thread(target=self._run, name="hibiki-library-watch", daemon=True)
+        self._thread.start()
+        logger.info(f"👀 开始监听音乐目录: {self.directory} ({type(self._observer).__name__})")
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """停止监听，已收到的变更在停止前处理完"""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _start_observer(self, observer_class):
+        observer = observer_class()
+        observer.schedule(_EventHandler(self), self.directory, recursive=True)
+        try:
+            observer.start()
+        except OSError as e:
+            if observer_class is PollingObserver:
+                raise
+            # inotify 监听数达到上限、文件系统不支持等情况
+            logger.warning(f"⚠️ 原生文件监听不可用，改用轮询: {e}")
+            return self._start_observer(PollingObserver)
+        return observer
+
+    # ================================
+    # 事件合并
+    # ================================
+
+    def _on_event(self, event) -> None:
+        kind = event.event_type
+        src = os.fsdecode(event.src_path)
+        dest = os.fsdecode(event.dest_path) if kind == EVENT_TYPE_MOVED else None
+        scanner = self.scanner
+
+        with self._cond:
+            if event.is_directory:
+                if kind == EVENT_TYPE_MOVED:
+                    # 目录移动：其下每个文件按移动处理（inotify 可能另外发出逐个文件的事件，合并结果相同）
+                    for entry in scanner._find_audio_files(Path(dest), True):
+                        self._record_move(src + entry.path[len(dest):], entry.path)
+                    self._deleted_dirs.add(src)
+                elif kind == EVENT_TYPE_CREATED:
+                    # 新目录在开始监听之前已写入的文件不会再产生事件
+                    for entry in scanner._find_audio_files(Path(src), True):
+                        self._record_upsert(entry.path)
+                elif kind == EVENT_TYPE_DELETED:
+                    self._deleted_dirs.add(src)
+                else:
+                    return
+            elif kind == EVENT_TYPE_MOVED:
+                if scanner._is_audio_file(dest):
+                    if scanner._is_audio_file(src):
+                        self._record_move(src, dest)
+                    else:
+                        self._record_upsert(dest)  # 下载完成时的 .part -> .mp3
+                elif scanner._is_audio_file(src):
+                    self._record_delete(src)
+                else:
+                    return
+            elif not scanner._is_audio_file(src):
+                return
+            elif kind == EVENT_TYPE_DELETED:
+                self._record_delete(src)
+            elif kind in (EVENT_TYPE_CREATED, EVENT_TYPE_MODIFIED, _EVENT_TYPE_CLOSED):
+                self._record_upsert(src)
+            else:
+                return
+
+            now = time.monotonic()
+            if not self._first_event:
+                self._first_event = now
+            self._last_event = now
+            self._cond.notify_all()
+
+    def _record_upsert(self, path: str) -> None:
+        self._deletes.discard(path)
+        self._upserts.add(path)
+
+    def _record_delete(self, path: str) -> None:
+        self._upserts.discard(path)
+        self._deletes.add(self._moves.pop(path, path))
+
+    def _record_move(self, src: str, dest: str) -> None:
+        origin = self._moves.pop(src, src)
+        if src in self._upserts:
+            self._upserts.discard(src)
+            self._upserts.add(dest)
+        self._deletes.discard(dest)
+        if origin == dest:
+            self._upserts.add(dest)  # 移回原处
+        else:
+            self._moves[dest] = origin
+
+    # ================================
+    # 同步
+    # ================================
+
+    def flush(self) -> None:
+        """立即处理已合并的变更（不等待防抖）"""
+        with self._cond:
+            batch = self._take_pending()
+        if batch is not None:
+            self._apply(batch)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._first_event)
+                if self._stopped:
+                    return
+                while not self._stopped:
+                    due = min(self._last_event + self.debounce, self._first_event + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take_pending()
+            if batch is not None:
+                self._apply(batch)
+
+    def _take_pending(self):
+        if not self._first_event:
+            return None
+        batch = (self._upserts, self._deletes, self._moves, self._deleted_dirs)
+        self._upserts, self._deletes, self._moves, self._deleted_dirs = set(), set(), {}, set()
+        self._first_event = self._last_event = 0.0
+        return batch
+
+    def _apply(self, batch) -> None:
+        upserts, deletes, moves, deleted_dirs = batch
+        with self._apply_lock:
+            try:
+                delta = self.scanner.apply_changes(upserts, deletes, moves, deleted_dirs)
+            except Exception as e:
+                logger.error(f"❌ 同步目录变更失败: {e}")
+                return
+            if delta:
+                try:
+                    self.on_change(delta)
+                except Exception as e:
+                    logger.error(f"❌ 处理音乐库变更回调失败: {e}")
@@ -24,6 +24,7 @@ import time
 from ...core.app_state import MusicAppState, Song
 # 导入数据模型和服务
 from ...data.database import UserActionService, UserActionType, ActionTrigger, PlaySource
+from ...data.action_recorder import get_action_recorder
 
 class AudioPlayerDelegate(NSObject):
     """音频播放器事件委托"""
@@ -77,8 +78,8 @@ class AudioPlayer:
         # 进度跟踪观察者
         self.time_observer = None
         
-        # 用户行为记录服务
-        self.action_service = UserActionService()
+        # 用户行为记录服务 - 异步写入，UI 线程不等待数据库
+        self.action_service = UserActionService(recorder=get_action_recorder())
         
         # 播放会话管理
         self.current_session_id: Optional[str] = None
@@ -6,9 +6,14 @@
 """
 
 import os
+import hashlib
+import itertools
 import mimetypes
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 from datetime import datetime
 
 from mutagen import File as MutagenFile
@@ -17,8 +22,69 @@ from mutagen.mp3 import MP3
 from mutagen.flac import FLAC
 from mutagen.mp4 import MP4
 
+from ..data.artwork import ArtworkCache, extract_embedded_artwork
 from ..data.database import SongService, DatabaseManager
-from ..data.models import SongCreate, SongPublic
+from ..data.models import SongCreate
+
+
+class AudioFileEntry(NamedTuple):
+    """扫描到的音频文件及其 stat 信息"""
+    path: str
+    size: int
+    modified_at: datetime
+
+
+@dataclass
+class ScanStats:
+    """一次扫描的统计"""
+    found: int = 0
+    unchanged: int = 0
+    imported: int = 0
+    cached: int = 0      # 元数据取自缓存，未打开音频文件
+    moved: int = 0       # 识别为移动/改名，只更新了路径
+    duplicates: int = 0  # 与其他文件内容相同
+    failed: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class LibraryDelta:
+    """一批文件系统变更对应的数据库变化，行元组字段见 SONG_ROW_COLUMNS"""
+    added: List[Any] = field(default_factory=list)
+    updated: List[Any] = field(default_factory=list)  # 元数据或路径变化
+    removed: List[int] = field(default_factory=list)  # 被删除的歌曲 id
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+# 内容指纹读取文件头尾各多少字节
+FINGERPRINT_CHUNK_SIZE = 64 * 1024
+
+
+def file_content_hash(file_path: str, size: int) -> Optional[str]:
+    """
+    文件内容指纹：文件大小 + 头尾各 64KB 的 BLAKE2b
+    
+    标签（ID3、Vorbis comment、MP4 moov）都位于文件头尾，改标签会改变指纹；
+    不包含路径和修改时间，所以移动、改名、复制后指纹不变。
+    """
+    digest = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=16)
+    try:
+        with open(file_path, "rb") as f:
+            digest.update(f.read(FINGERPRINT_CHUNK_SIZE))
+            if size > FINGERPRINT_CHUNK_SIZE:
+                f.seek(max(FINGERPRINT_CHUNK_SIZE, size - FINGERPRINT_CHUNK_SIZE))
+                digest.update(f.read(FINGERPRINT_CHUNK_SIZE))
+    except OSError as e:
+        print(f"⚠️ 无法读取文件: {file_path} - {e}")
+        return None
+    return digest.hexdigest()
+
+
+def _extract_metadata_worker(file_path: str) -> Optional[Dict[str, Any]]:
+    """进程池入口：提取单个文件的元数据"""
+    return MusicLibraryScanner._extract_metadata(Path(file_path))
 
 class MusicLibraryScanner:
     """
@@ -29,25 +95,48 @@ class MusicLibraryScanner:
     - 使用 mutagen 提取元数据
     - 导入到 SQLModel 数据库
     - 支持 MP3, FLAC, M4A 等格式
+    - 增量扫描：按文件大小和修改时间跳过未变化的文件
+    - 多进程并行提取元数据
+    - 按内容指纹缓存元数据：移动/改名的文件只更新路径，重复文件在扫描时识别
+    - 监听模式：watch() 持续把目录变更增量同步到数据库
+    - 提取内嵌封面，生成按内容去重的缩略图缓存
     """
     
     # 支持的音频格式
     SUPPORTED_FORMATS = {'.mp3', '.flac', '.m4a', '.mp4', '.ogg', '.wav'}
     
+    # 少于该数量的待处理文件直接在当前进程提取，不启动进程池
+    PARALLEL_THRESHOLD = 32
+    # 每个工作进程最多排队的任务数（有界队列）
+    QUEUE_DEPTH_PER_WORKER = 4
+    # 每个写入事务包含的歌曲数
+    WRITE_BATCH_SIZE = 500
+    
     def __init__(self):
         self.song_service = SongService()
         self.db = DatabaseManager()
+        self.last_stats: Optional[ScanStats] = None
+        self.last_duplicates: Dict[str, List[str]] = {}  # 内容指纹 -> 内容相同的文件路径
         
-    def scan_directory(self, directory_path: str, recursive: bool = True) -> List[SongPublic]:
+    def scan_directory(self, directory_path: str, recursive: bool = True,
+                       max_workers: Optional[int] = None) -> List[int]:
         """
-        扫描目录中的音频文件
+        增量扫描目录中的音频文件
+        
+        与数据库中记录的 file_size / file_modified_at 比对，未变化的文件不会被打开；
+        新增或修改过的文件先计算内容指纹查元数据缓存：
+        - 内容与某个已不存在的入库文件相同 -> 移动/改名，只更新该歌曲的路径
+        - 缓存命中 -> 直接使用缓存的元数据
+        - 未命中 -> 交给进程池提取元数据
+        最后按批写入数据库。
         
         Args:
             directory_path: 要扫描的目录路径
             recursive: 是否递归扫描子目录
+            max_workers: 元数据提取进程数，默认为 CPU 核数
             
         Returns:
-            导入成功的歌曲列表
+            本次新导入或更新的歌曲 id 列表（未变化的文件不包含在内）
         """
         directory = Path(directory_path)
         if not directory.exists() or not directory.is_dir():
@@ -55,99 +144,337 @@ class MusicLibraryScanner:
             return []
             
         print(f"🔍 开始扫描音乐目录: {directory_path}")
+        started = time.perf_counter()
         
-        # 收集音频文件
+        # 收集音频文件（每个文件只 stat 一次）
         audio_files = self._find_audio_files(directory, recursive)
-        print(f"📁 发现 {len(audio_files)} 个音频文件")
         
-        # 处理每个文件
-        imported_songs = []
-        for i, file_path in enumerate(audio_files, 1):
-            print(f"📀 处理 ({i}/{len(audio_files)}): {file_path.name}")
-            
-            try:
-                song = self._process_audio_file(file_path)
-                if song:
-                    imported_songs.append(song)
-                    print(f"✅ 导入成功: {song.title} - {song.artist}")
-                else:
-                    print(f"⚠️ 跳过文件: {file_path.name}")
-                    
-            except Exception as e:
-                print(f"❌ 处理失败: {file_path.name} - {e}")
+        # 与数据库比对，跳过未变化的文件；前缀带分隔符，避免匹配到同名前缀的兄弟目录
+        prefix = os.path.join(str(directory.absolute()), "")
+        known = self.song_service.get_file_fingerprints(prefix)
+        changed = [
+            entry for entry in audio_files
+            if known.get(entry.path) != (entry.size, entry.modified_at)
+        ]
+        stats = ScanStats(found=len(audio_files), unchanged=len(audio_files) - len(changed))
+        print(f"📁 发现 {stats.found} 个音频文件，{len(changed)} 个需要处理")
+        
+        # 内容指纹 + 元数据缓存：识别移动/改名和重复文件
+        moves, reused, to_extract, hashes = self._resolve_with_cache(
+            audio_files, changed, known, prefix, stats
+        )
+        imported_ids = self.song_service.relocate_songs(
+            (old_path, entry.path, entry.size, entry.modified_at) for old_path, entry in moves
+        )
+        stats.moved = len(imported_ids)
+        
+        # 并行提取元数据，流式批量写入
+        imported_ids += self._import_entries(reused, to_extract, hashes, max_workers, stats)
+        
+        stats.imported = len(imported_ids)
+        stats.elapsed = time.perf_counter() - started
+        self.last_stats = stats
+        print(
+            f"🎵 扫描完成！导入/更新 {stats.imported} 首（移动 {stats.moved}，缓存命中 {stats.cached}），"
+            f"跳过未变化 {stats.unchanged} 首，重复 {stats.duplicates} 个，"
+            f"失败 {stats.failed} 个，耗时 {stats.elapsed:.2f}s"
+        )
+        return imported_ids
+    
+    def _resolve_with_cache(self, audio_files: List[AudioFileEntry], changed: List[AudioFileEntry],
+                            known: Dict[str, Tuple[int, Optional[datetime]]], prefix: str,
+                            stats: ScanStats):
+        """
+        计算内容指纹，按元数据缓存把待处理文件分为：移动/改名、缓存命中、需要提取三类
+        
+        移动只在扫描目录内识别：原路径已入库且已不在磁盘上，新路径尚未入库。
+        未变化但还没有缓存记录的文件（升级前入库的）顺带计算指纹，用数据库中的元数据回填缓存。
+        
+        Returns:
+            (moves, reused, to_extract, hashes)
+            moves: [(原路径, entry)]，reused: [(entry, metadata)]，
+            hashes: 路径 -> 内容指纹
+        """
+        on_disk = {entry.path for entry in audio_files}
+        changed_paths = {entry.path for entry in changed}
+        cached_paths = self.song_service.get_cached_paths(prefix)
+        backfill = [
+            entry for entry in audio_files
+            if entry.path not in changed_paths and entry.path not in cached_paths
+        ]
+        
+        hashes: Dict[str, str] = {}
+        for entry in itertools.chain(changed, backfill):
+            content_hash = file_content_hash(entry.path, entry.size)
+            if content_hash:
+                hashes[entry.path] = content_hash
+        self.song_service.cache_song_metadata(
+            {entry.path: hashes[entry.path] for entry in backfill if entry.path in hashes}
+        )
+        cache = self.song_service.get_cached_metadata(
+            hashes[path] for path in changed_paths if path in hashes
+        )
+        
+        moves, reused, to_extract = [], [], []
+        claimed = set()
+        for entry in changed:
+            row = cache.get(hashes.get(entry.path))
+            if row is None:
+                to_extract.append(entry)
                 continue
-                
-        print(f"🎵 扫描完成！成功导入 {len(imported_songs)} 首歌曲")
-        return imported_songs
+            old_path = row.file_path
+            if (old_path != entry.path and old_path not in on_disk and old_path in known
+                    and entry.path not in known and old_path not in claimed):
+                claimed.add(old_path)
+                moves.append((old_path, entry))
+            else:
+                reused.append((entry, row.metadata))
+        stats.cached = len(reused)
+        
+        # 重复文件：本次计算过指纹的文件，加上缓存中仍在磁盘上的同内容文件
+        groups: Dict[str, set] = {}
+        for path, content_hash in hashes.items():
+            groups.setdefault(content_hash, set()).add(path)
+        for content_hash, row in cache.items():
+            if row.file_path in on_disk:
+                groups[content_hash].add(row.file_path)
+        self.last_duplicates = {
+            content_hash: sorted(paths) for content_hash, paths in groups.items() if len(paths) > 1
+        }
+        stats.duplicates = sum(len(paths) - 1 for paths in self.last_duplicates.values())
+        for paths in self.last_duplicates.values():
+            print(f"👯 发现重复文件: {', '.join(paths)}")
+        
+        return moves, reused, to_extract, hashes
+    
+    def _import_entries(self, reused: List[Tuple[AudioFileEntry, Dict[str, Any]]],
+                        to_extract: List[AudioFileEntry], hashes: Dict[str, str],
+                        max_workers: Optional[int], stats: ScanStats) -> List[int]:
+        """写入缓存命中的文件，并行提取其余文件的元数据后流式批量写入，新提取的结果写回缓存"""
+        cache_updates = []
+        
+        def songs_to_import():
+            for entry, metadata in reused:
+                yield self._build_song_create(entry, metadata)
+            for entry, metadata in self._extract_all(to_extract, max_workers):
+                if not metadata:
+                    stats.failed += 1
+                    print(f"⚠️ 跳过文件: {entry.path}")
+                    continue
+                if entry.path in hashes:
+                    cache_updates.append({
+                        "content_hash": hashes[entry.path],
+                        "file_path": entry.path,
+                        "file_size": entry.size,
+                        "metadata": metadata,
+                    })
+                yield self._build_song_create(entry, metadata)
+        
+        imported_ids = self.song_service.bulk_upsert_songs(
+            songs_to_import(), batch_size=self.WRITE_BATCH_SIZE
+        )
+        self.song_service.cache_metadata(cache_updates)
+        return imported_ids
     
-    def _find_audio_files(self, directory: Path, recursive: bool) -> List[Path]:
-        """查找目录中的音频文件"""
+    # ================================
+    # 监听模式
+    # ================================
+    
+    def watch(self, directory_path: str, on_change: Callable[[LibraryDelta], None],
+              debounce: float = 0.2, max_delay: float = 1.0, polling: bool = False):
+        """
+        持续监听目录，把文件的新增/修改/移动/删除增量同步到数据库
+        
+        事件经防抖合并后调用 apply_changes，结果通过 on_change(LibraryDelta) 回调
+        （在监听线程中调用）。返回已启动的 LibraryWatcher，调用 stop() 停止监听。
+        
+        Args:
+            directory_path: 要监听的目录
+            on_change: 每批变更写入数据库后的回调
+            debounce: 最后一个事件之后静默多少秒再处理
+            max_delay: 事件持续不断时最长多少秒处理一次
+            polling: 强制使用轮询（网络盘等不支持原生监听的文件系统）
+        """
+        from .library_watcher import LibraryWatcher
+        watcher = LibraryWatcher(self, directory_path, on_change, debounce=debounce,
+                                 max_delay=max_delay, polling=polling)
+        watcher.start()
+        return watcher
+    
+    def apply_changes(self, upserts: Iterable[str] = (), deletes: Iterable[str] = (),
+                      moves: Optional[Dict[str, str]] = None,
+                      deleted_dirs: Iterable[str] = ()) -> LibraryDelta:
+        """
+        把一批文件系统变更写入数据库，只处理涉及的文件
+        
+        处理顺序：移动 -> 删除 -> 新增/修改。移动只更新路径；删除时文件又出现了的跳过；
+        新增/修改的文件按 size/mtime 跳过未变化的，其余先查元数据缓存再提取。
+        
+        Args:
+            upserts: 新建或修改过的文件
+            deletes: 已删除的文件
+            moves: 新路径 -> 原路径
+            deleted_dirs: 已删除的目录，其下所有歌曲一并删除
+        """
+        moves = moves or {}
+        stats = ScanStats()
+        
+        # 移动：原路径已入库的直接改路径，其余按新文件处理
+        moved_entries = [entry for entry in map(self._stat_entry, moves) if entry is not None]
+        relocated = self.song_service.relocate_songs(
+            (moves[entry.path], entry.path, entry.size, entry.modified_at) for entry in moved_entries
+        )
+        
+        # 删除：移动目标已不存在的，原路径一并删除
+        deletes = set(deletes)
+        deletes.update(src for dest, src in moves.items() if not os.path.exists(dest))
+        removed = self.song_service.delete_songs_by_path(
+            (path for path in deletes if not os.path.exists(path)),
+            [path for path in deleted_dirs if not os.path.exists(path)],
+        )
+        
+        # 新增/修改
+        candidates = set(upserts) | {entry.path for entry in moved_entries}
+        entries = [entry for entry in map(self._stat_entry, sorted(candidates)) if entry is not None]
+        known = self.song_service.get_file_fingerprints(paths=[entry.path for entry in entries])
+        changed = [
+            entry for entry in entries
+            if known.get(entry.path) != (entry.size, entry.modified_at)
+        ]
+        hashes = {}
+        for entry in changed:
+            content_hash = file_content_hash(entry.path, entry.size)
+            if content_hash:
+                hashes[entry.path] = content_hash
+        cache = self.song_service.get_cached_metadata(hashes.values())
+        reused, to_extract = [], []
+        for entry in changed:
+            row = cache.get(hashes.get(entry.path))
+            if row is None:
+                to_extract.append(entry)
+            else:
+                reused.append((entry, row.metadata))
+        imported = self._import_entries(reused, to_extract, hashes, None, stats)
+        
+        new_paths = {entry.path for entry in changed if entry.path not in known}
+        delta = LibraryDelta(removed=removed)
+        for row in self.song_service.get_song_rows(itertools.chain(relocated, imported)):
+            (delta.added if row.file_path in new_paths else delta.updated).append(row)
+        if delta:
+            print(
+                f"👀 音乐库变更：新增 {len(delta.added)} 首，更新 {len(delta.updated)} 首"
+                f"（移动 {len(relocated)}），删除 {len(delta.removed)} 首"
+            )
+        return delta
+    
+    def _stat_entry(self, file_path: str) -> Optional[AudioFileEntry]:
+        """stat 单个文件，不存在或不是支持的音频格式时返回 None"""
+        if not self._is_audio_file(file_path):
+            return None
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return AudioFileEntry(
+            path=file_path,
+            size=stat.st_size,
+            modified_at=datetime.fromtimestamp(stat.st_mtime),
+        )
+    
+    def _find_audio_files(self, directory: Path, recursive: bool) -> List[AudioFileEntry]:
+        """查找目录中的音频文件，stat 信息直接取自 os.scandir"""
         audio_files = []
+        pending = [str(directory.absolute())]
         
-        if recursive:
-            # 递归搜索
-            for file_path in directory.rglob('*'):
-                if file_path.is_file() and self._is_audio_file(file_path):
-                    audio_files.append(file_path)
-        else:
-            # 只搜索当前目录
-            for file_path in directory.iterdir():
-                if file_path.is_file() and self._is_audio_file(file_path):
-                    audio_files.append(file_path)
+        while pending:
+            try:
+                iterator = os.scandir(pending.pop())
+            except OSError as e:
+                print(f"⚠️ 无法读取目录: {e}")
+                continue
+            with iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                pending.append(entry.path)
+                        elif self._is_audio_file(entry.name) and entry.is_file():
+                            stat = entry.stat()
+                            audio_files.append(AudioFileEntry(
+                                path=entry.path,
+                                size=stat.st_size,
+                                modified_at=datetime.fromtimestamp(stat.st_mtime),
+                            ))
+                    except OSError:
+                        continue
                     
-        return sorted(audio_files)
+        audio_files.sort(key=lambda entry: entry.path)
+        return audio_files
     
-    def _is_audio_file(self, file_path: Path) -> bool:
+    def _is_audio_file(self, file_name: Union[str, Path]) -> bool:
         """检查文件是否为支持的音频格式"""
-        return file_path.suffix.lower() in self.SUPPORTED_FORMATS
+        return os.path.splitext(str(file_name))[1].lower() in self.SUPPORTED_FORMATS
     
-    def _process_audio_file(self, file_path: Path) -> Optional[SongPublic]:
+    def _extract_all(self, entries: List[AudioFileEntry], max_workers: Optional[int]):
         """
-        处理单个音频文件
+        提取元数据，按完成顺序产出 (entry, metadata)
         
-        1. 提取元数据
-        2. 创建SongCreate对象
-        3. 导入数据库
+        文件较少时直接在当前进程处理，避免进程池的启动开销；
+        否则使用进程池，并限制同时在途的任务数，保持内存占用有界。
         """
-        try:
-            # 提取元数据
-            metadata = self._extract_metadata(file_path)
-            if not metadata:
-                return None
-                
-            # 检查文件是否已存在
-            existing_song = self.song_service.get_song_by_path(str(file_path))
-            if existing_song:
-                print(f"📋 文件已存在数据库中: {file_path.name}")
-                return existing_song
-            
-            # 创建歌曲数据
-            song_data = SongCreate(
-                title=metadata.get('title', file_path.stem),
-                artist=metadata.get('artist', '未知艺术家'),
-                album=metadata.get('album'),
-                album_artist=metadata.get('albumartist'),
-                duration=metadata.get('duration', 0.0),
-                year=metadata.get('year'),
-                track_number=metadata.get('tracknumber'),
-                disc_number=metadata.get('discnumber'),
-                genre=metadata.get('genre'),
-                file_format=file_path.suffix.lower().replace('.', ''),
-                bitrate=metadata.get('bitrate'),
-                sample_rate=metadata.get('sample_rate'),
-                file_path=str(file_path.absolute()),
-                file_size=file_path.stat().st_size,
-                file_modified_at=datetime.fromtimestamp(file_path.stat().st_mtime)
-            )
-            
-            # 导入数据库
-            return self.song_service.create_song(song_data)
+        if len(entries) < self.PARALLEL_THRESHOLD or max_workers == 1:
+            for entry in entries:
+                yield entry, self._extract_metadata(Path(entry.path))
+            return
+        
+        workers = max_workers or os.cpu_count() or 1
+        max_in_flight = workers * self.QUEUE_DEPTH_PER_WORKER
+        pending = iter(entries)
+        in_flight = {}
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for entry in itertools.islice(pending, max_in_flight):
+                in_flight[executor.submit(_extract_metadata_worker, entry.path)] = entry
             
-        except Exception as e:
-            print(f"❌ 处理文件失败 {file_path}: {e}")
-            return None
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry = in_flight.pop(future)
+                    try:
+                        metadata = future.result()
+                    except Exception as e:
+                        print(f"❌ 处理失败: {entry.path} - {e}")
+                        metadata = None
+                    yield entry, metadata
+                    
+                    next_entry = next(pending, None)
+                    if next_entry is not None:
+                        in_flight[executor.submit(_extract_metadata_worker, next_entry.path)] = next_entry
     
-    def _extract_metadata(self, file_path: Path) -> Optional[Dict[str, Any]]:
+    def _build_song_create(self, entry: AudioFileEntry, metadata: Dict[str, Any]) -> SongCreate:
+        """根据元数据创建 SongCreate"""
+        file_path = Path(entry.path)
+        return SongCreate(
+            title=metadata.get('title', file_path.stem),
+            artist=metadata.get('artist', '未知艺术家'),
+            album=metadata.get('album'),
+            album_artist=metadata.get('albumartist'),
+            duration=metadata.get('duration', 0.0),
+            year=metadata.get('year'),
+            track_number=metadata.get('tracknumber'),
+            disc_number=metadata.get('discnumber'),
+            genre=metadata.get('genre'),
+            file_format=file_path.suffix.lower().replace('.', ''),
+            bitrate=metadata.get('bitrate'),
+            sample_rate=metadata.get('sample_rate'),
+            file_path=entry.path,
+            file_size=entry.size,
+            file_modified_at=entry.modified_at,
+            artwork_hash=metadata.get('artwork'),
+        )
+    
+    @classmethod
+    def _extract_metadata(cls, file_path: Path) -> Optional[Dict[str, Any]]:
         """
         使用 mutagen 提取音频文件元数据
         """
@@ -168,14 +495,21 @@ class MusicLibraryScanner:
             
             # 处理不同格式的标签
             if isinstance(audio_file, MP3):
-                metadata.update(self._extract_id3_tags(audio_file))
+                metadata.update(cls._extract_id3_tags(audio_file))
             elif isinstance(audio_file, FLAC):
-                metadata.update(self._extract_vorbis_tags(audio_file))
+                metadata.update(cls._extract_vorbis_tags(audio_file))
             elif isinstance(audio_file, MP4):
-                metadata.update(self._extract_mp4_tags(audio_file))
+                metadata.update(cls._extract_mp4_tags(audio_file))
             else:
                 # 通用标签处理
-                metadata.update(self._extract_generic_tags(audio_file))
+                metadata.update(cls._extract_generic_tags(audio_file))
+            
+            # 内嵌封面：只保存缩略图，同一张封面只解码一次
+            artwork = extract_embedded_artwork(audio_file)
+            if artwork:
+                art_hash = ArtworkCache().store(artwork)
+                if art_hash:
+                    metadata['artwork'] = art_hash
                 
             return metadata
             
@@ -186,7 +520,8 @@ class MusicLibraryScanner:
             print(f"❌ 元数据提取失败 {file_path}: {e}")
             return None
     
-    def _extract_id3_tags(self, audio_file: MP3) -> Dict[str, Any]:
+    @staticmethod
+    def _extract_id3_tags(audio_file: MP3) -> Dict[str, Any]:
         """提取ID3标签 (MP3)"""
         tags = {}
         
@@ -225,7 +560,8 @@ class MusicLibraryScanner:
                     
         return tags
     
-    def _extract_vorbis_tags(self, audio_file: FLAC) -> Dict[str, Any]:
+    @staticmethod
+    def _extract_vorbis_tags(audio_file: FLAC) -> Dict[str, Any]:
         """提取Vorbis标签 (FLAC)"""
         tags = {}
         
@@ -262,7 +598,8 @@ class MusicLibraryScanner:
                     
         return tags
     
-    def _extract_mp4_tags(self, audio_file: MP4) -> Dict[str, Any]:
+    @staticmethod
+    def _extract_mp4_tags(audio_file: MP4) -> Dict[str, Any]:
         """提取MP4标签 (M4A)"""
         tags = {}
         
@@ -308,7 +645,8 @@ class MusicLibraryScanner:
                     
         return tags
     
-    def _extract_generic_tags(self, audio_file) -> Dict[str, Any]:
+    @staticmethod
+    def _extract_generic_tags(audio_file) -> Dict[str, Any]:
         """通用标签提取 (其他格式)"""
         tags = {}
         
@@ -319,24 +657,24 @@ class MusicLibraryScanner:
         common_fields = ['title', 'artist', 'album', 'albumartist', 
                         'date', 'tracknumber', 'discnumber', 'genre']
         
-        for field in common_fields:
-            if field in audio_file.tags:
-                value = audio_file.tags[field]
+        for tag_name in common_fields:
+            if tag_name in audio_file.tags:
+                value = audio_file.tags[tag_name]
                 if isinstance(value, list) and value:
                     value = value[0]
                     
-                if field == 'date':
+                if tag_name == 'date':
                     try:
                         tags['year'] = int(str(value)[:4])
                     except (ValueError, IndexError):
                         pass
                 else:
-                    tags[field] = str(value)
+                    tags[tag_name] = str(value)
                     
         return tags
 
 # 便捷函数
-def scan_music_library(directory_path: str) -> List[SongPublic]:
+def scan_music_library(directory_path: str) -> List[int]:
     """
     扫描音乐库的便捷函数
     
@@ -344,7 +682,7 @@ def scan_music_library(directory_path: str) -> List[SongPublic]:
         directory_path: 音乐目录路径
         
     Returns:
-        导入成功的歌曲列表
+        导入或更新的歌曲 id 列表
     """
     scanner = MusicLibraryScanner()
     return scanner.scan_directory(directory_path)
\ No newline at end of file
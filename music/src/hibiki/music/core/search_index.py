@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+🔍 Hibiki Music 歌曲搜索索引
+
+为 MusicAppState.filtered_songs 提供增量维护的内存索引：
+- 标题/艺术家/专辑预先做 NFKC + casefold 归一化（全角转半角、大小写不敏感）
+- 1~3 字符片段的倒排表：短查询（常见于中日韩歌名）直接查表得到精确结果
+- 更长的查询取最稀有的两个三元组 (trigram) 求交集，再做子串校验
+- 输入变长时（"周杰" -> "周杰伦"）在上一次的结果集上继续收窄
+
+匹配语义与原来的线性扫描一致：查询是任一字段的子串即命中，结果保持 all_songs 中的顺序。
+"""
+
+import unicodedata
+from typing import Any, Dict, List, Optional, Sequence
+
+from .logging import get_logger
+
+logger = get_logger("search_index")
+
+_FIELDS = ("title", "artist", "album")
+_SEPARATOR = "\x1f"  # 字段分隔符，保证子串不会跨字段匹配
+_EXACT_GRAM = 3  # 1~3 个字符的片段全部入索引，更长的查询拆成三元组
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """搜索用的文本归一化：NFKC + casefold"""
+    if not text:
+        return ""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+class SongSearchIndex:
+    """
+    歌曲子串搜索索引
+
+    通过 sync() 跟随 all_songs (ListSignal) 的变更记录增量更新：
+    追加的歌曲直接建索引，删除的歌曲标记为失效，只有整体替换时才全量重建。
+    """
+
+    # 失效槽位超过存活槽位时压缩重建
+    _COMPACT_RATIO = 1.0
+
+    def __init__(self):
+        self._songs: List[Any] = []  # 槽位 -> 歌曲
+        self._haystacks: List[Optional[str]] = []  # 槽位 -> 归一化文本，None 表示已删除
+        self._postings: Dict[str, List[int]] = {}  # 1~3 字符片段 -> 升序槽位列表
+        self._order: List[int] = []  # all_songs 中按顺序排列的存活槽位
+        self._rank: Optional[Dict[int, int]] = None  # 槽位 -> 位置，仅在顺序被打乱时使用
+        self._monotone = True  # _order 是否按槽位升序（只有追加和删除时成立）
+        self._dead = 0
+        self._synced_version: Optional[int] = None
+
+        # 收窄查询缓存
+        self._last_query = ""
+        self._last_result: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    # ================================
+    # 索引维护
+    # ================================
+
+    def sync(self, songs_signal) -> None:
+        """根据 ListSignal 的变更记录把索引同步到最新版本"""
+        songs = songs_signal.value
+        changes = None
+        if self._synced_version is not None:
+            changes = songs_signal.changes_since(self._synced_version)
+
+        if changes is None:
+            self.rebuild(songs)
+        else:
+            for change in changes:
+                self._apply_change(change.index, len(change.removed), change.inserted)
+            if self._dead > len(self._order) * self._COMPACT_RATIO:
+                self.rebuild(songs)
+
+        self._synced_version = songs_signal.version
+
+    def rebuild(self, songs: Sequence[Any]) -> None:
+        """全量重建索引"""
+        self._songs = []
+        self._haystacks = []
+        self._postings = {}
+        self._order = []
+        self._rank = None
+        self._monotone = True
+        self._dead = 0
+        self._invalidate_cache()
+        self._order = self._add_songs(songs)
+        logger.debug(f"🔍 搜索索引重建: {len(self._order)} 首歌曲, {len(self._postings)} 个词条")
+
+    def _apply_change(self, index: int, removed: int, inserted: Sequence[Any]) -> None:
+        order = self._order
+        if removed:
+            for slot in order[index:index + removed]:
+                self._haystacks[slot] = None
+                self._songs[slot] = None
+            self._dead += removed
+            del order[index:index + removed]
+
+        if inserted:
+            new_slots = self._add_songs(inserted)
+            if index < len(order):
+                self._monotone = False
+            order[index:index] = new_slots
+
+        self._rank = None
+        self._invalidate_cache()
+
+    def _add_songs(self, songs: Sequence[Any]) -> List[int]:
+        postings = self._postings
+        haystacks = self._haystacks
+        slots = []
+        for song in songs:
+            slot = len(haystacks)
+            fields = [normalize_text(getattr(song, name, None)) for name in _FIELDS]
+            grams = set()
+            for text in fields:
+                grams.update(text)
+                for i in range(len(text) - 1):
+                    grams.add(text[i:i + 2])
+                    grams.add(text[i:i + 3])
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [slot]
+                else:
+                    posting.append(slot)
+            haystacks.append(_SEPARATOR.join(fields))
+            self._songs.append(song)
+            slots.append(slot)
+        return slots
+
+    def _invalidate_cache(self) -> None:
+        self._last_query = ""
+        self._last_result = None
+
+    # ================================
+    # 查询
+    # ================================
+
+    def search(self, query: str) -> List[Any]:
+        """返回任一字段包含 query 的歌曲，保持原有顺序"""
+        songs = self._songs
+        return [songs[slot] for slot in self.search_slots(query)]
+
+    def search_slots(self, query: str) -> List[int]:
+        """返回命中歌曲的槽位（按 all_songs 顺序）"""
+        q = normalize_text(query)
+        if not q:
+            return list(self._order)
+
+        haystacks = self._haystacks
+        previous = self._last_result
+        if previous is not None and self._last_query in q:
+            best = previous  # 收窄：上一次的结果是本次的超集，且已经有序
+        else:
+            best = None
+
+        if len(q) <= _EXACT_GRAM:
+            # 查询本身就是一个索引词条，倒排表即为精确结果
+            posting = self._postings.get(q, ())
+            if best is not None and len(best) < len(posting):
+                result = [slot for slot in best if q in haystacks[slot]]
+            else:
+                result = self._ordered(posting)
+        else:
+            # 取最稀有的两个三元组求交集，再做子串校验
+            postings = []
+            for i in range(len(q) - 2):
+                posting = self._postings.get(q[i:i + 3])
+                if posting is None:
+                    self._remember(q, [])
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+
+            if best is not None and len(best) <= len(postings[0]):
+                candidates = best
+            else:
+                other = set(postings[1]) if len(postings) > 1 else None
+                candidates = self._ordered(
+                    [slot for slot in postings[0] if slot in other] if other else postings[0]
+                )
+            result = [slot for slot in candidates if q in haystacks[slot]]
+
+        self._remember(q, result)
+        return result
+
+    def _ordered(self, slots: Sequence[int]) -> List[int]:
+        """去掉已删除的槽位，并在顺序被打乱时按 all_songs 中的位置排序"""
+        if self._dead:
+            haystacks = self._haystacks
+            slots = [slot for slot in slots if haystacks[slot] is not None]
+        else:
+            slots = list(slots)
+        if not self._monotone:
+            slots.sort(key=self._positions().__getitem__)
+        return slots
+
+    def _remember(self, query: str, result: List[int]) -> None:
+        self._last_query = query
+        self._last_result = result
+
+    def _positions(self) -> Dict[int, int]:
+        if self._rank is None:
+            self._rank = {slot: position for position, slot in enumerate(self._order)}
+        return self._rank
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+📝 Hibiki Music 用户行为异步记录器
+
+播放/暂停/拖拽等操作发生在 UI 线程上，不能等待 SQLite 提交。
+UserActionRecorder 采用 write-behind 方式：
+- record() 只把记录放进有界环形缓冲区，立即返回
+- 后台写入线程按批量大小或时间间隔取出，一次事务 executemany 写入
+- 缓冲区满时丢弃最旧的记录（计入 dropped），不会阻塞调用方
+- 进程退出时 (atexit) 把剩余记录写完
+"""
+
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from .database import DatabaseManager
+from .models import UserAction, UserActionCreate
+
+
+class UserActionRecorder:
+    """用户行为 write-behind 记录器"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None, capacity: int = 4096,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        """
+        Args:
+            db: 数据库管理器，默认使用全局单例
+            capacity: 缓冲区最多保留的记录数
+            batch_size: 积累到多少条立即写入
+            flush_interval: 最长多少秒写入一次
+        """
+        self.db = db or DatabaseManager()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._buffer: deque = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_requested = False
+        self._closed = False
+
+        # 计数：每条记录最终要么写入要么被丢弃，flush 据此判断是否完成
+        self._recorded = 0
+        self._completed = 0
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+
+    # ================================
+    # 公共接口
+    # ================================
+
+    def record(self, action_data: UserActionCreate) -> None:
+        """记录一条用户行为（不做任何数据库操作，立即返回）"""
+        entry = (action_data, datetime.utcnow())  # 时间戳取操作发生的时刻，而不是写入时刻
+        with self._cond:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._dropped += 1
+                    self._completed += 1
+                self._buffer.append(entry)
+                self._recorded += 1
+                if self._thread is None:
+                    self._start_writer()
+                elif len(self._buffer) >= self.batch_size:
+                    self._cond.notify_all()
+
+        if closed:
+            # 关闭之后的零星记录直接同步写入
+            self._write_batch([entry])
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待此前记录的所有行为写入数据库，返回是否在超时前完成"""
+        with self._cond:
+            target = self._recorded
+            if self._completed >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._completed >= target, timeout)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        """写完剩余记录并停止写入线程"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, int]:
+        """记录器统计：已记录/已写入/已丢弃/写入失败/待写入"""
+        with self._cond:
+            return {
+                "recorded": self._recorded,
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed": self._failed,
+                "pending": len(self._buffer),
+            }
+
+    # ================================
+    # 写入线程
+    # ================================
+
+    def _start_writer(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="hibiki-action-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self._flush_requested or len(self._buffer) >= self.batch_size,
+                    self.flush_interval,
+                )
+                batch = list(self._buffer)
+                self._buffer.clear()
+                self._flush_requested = False
+                if not batch and self._closed:
+                    return
+
+            written = self._write_batch(batch) if batch else 0
+            with self._cond:
+                self._written += written
+                self._failed += len(batch) - written
+                self._completed += len(batch)
+                self._cond.notify_all()
+
+    def _write_batch(self, batch: List[Tuple[UserActionCreate, datetime]]) -> int:
+        """一个事务内批量插入；整批失败时逐条重试，跳过无法写入的记录。返回写入条数"""
+        rows = [self._to_row(action_data, timestamp) for action_data, timestamp in batch]
+        statement = insert(UserAction.__table__)
+        try:
+            with self.db._engine.begin() as conn:
+                conn.execute(statement, rows)
+            return len(rows)
+        except Exception as e:
+            print(f"⚠️ 批量写入用户行为失败，逐条重试: {e}")
+
+        written = 0
+        for row in rows:
+            try:
+                with self.db._engine.begin() as conn:
+                    conn.execute(statement, [row])
+                written += 1
+            except Exception as e:
+                print(f"❌ 丢弃无法写入的用户行为 {row.get('action_type')}: {e}")
+        return written
+
+    @staticmethod
+    def _to_row(action_data: UserActionCreate, timestamp: datetime) -> Dict[str, Any]:
+        row = action_data.model_dump()
+        row["timestamp"] = timestamp
+        return row
+
+
+_default_recorder: Optional[UserActionRecorder] = None
+_default_lock = threading.Lock()
+
+
+def get_action_recorder() -> UserActionRecorder:
+    """获取全局记录器，首次调用时创建并注册退出时写盘"""
+    global _default_recorder
+    with _default_lock:
+        if _default_recorder is None:
+            _default_recorder = UserActionRecorder()
+            atexit.register(_default_recorder.close)
+        return _default_recorder
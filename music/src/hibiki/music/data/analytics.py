@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+📊 Hibiki Music 播放数据分析
+
+把 user_actions / play_history 中的旧记录按月压缩成列式文件，SQLite 中只保留近期数据：
+
+    ~/.hibiki_music/analytics/<表名>/<YYYY-MM>/part-<首id>-<末id>.parquet   (安装了 pyarrow)
+    ~/.hibiki_music/analytics/<表名>/<YYYY-MM>/part-<首id>-<末id>/<列名>.npy (否则)
+
+归档包含表的所有列（字符串和 JSON 列存为 object 列，JSON 先序列化为文本），
+compact 前会检查列定义是否完整，不会因为新增列而丢失数据。
+
+分析查询把归档列和 SQLite 中的近期记录拼成 NumPy 数组后向量化计算，
+多年的播放记录也只是几次数组运算。
+"""
+
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select
+
+from .database import DatabaseManager
+from .models import (
+    ArchiveWatermark, PlayHistory, PlaySource, UserAction, UserActionType, ActionTrigger
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 没有 pyarrow 时使用 .npy 列文件
+    pa = pq = None
+
+# 枚举列按成员顺序编码为 int8，新增枚举值只能追加在末尾
+ENUM_CODES = {
+    enum: {member: code for code, member in enumerate(enum)}
+    for enum in (UserActionType, ActionTrigger, PlaySource)
+}
+# 完成度低于该值的中断播放计为跳过
+SKIP_COMPLETION_RATE = 0.5
+# 近期记录保留天数
+DEFAULT_KEEP_DAYS = 90
+
+_PENDING_SUFFIX = ".pending"
+_EPOCH = np.datetime64(0, "s")
+
+
+@dataclass(frozen=True)
+class _ArchiveTable:
+    """归档表结构：列名 -> 类型 (int / float / str / "json" / "time" / 枚举类)"""
+    model: type
+    time_column: str
+    columns: Dict[str, object]
+
+    @property
+    def name(self) -> str:
+        return self.model.__tablename__
+
+
+ARCHIVE_TABLES = {
+    table.name: table for table in (
+        _ArchiveTable(UserAction, "timestamp", {
+            "id": int,
+            "timestamp": "time",
+            "action_type": UserActionType,
+            "trigger": ActionTrigger,
+            "song_id": int,
+            "related_song_id": int,
+            "from_position": float,
+            "to_position": float,
+            "play_duration": float,
+            "completion_rate": float,
+            "session_id": str,
+            "playlist_id": int,
+            "play_source": PlaySource,
+            "extra_data": "json",
+            "notes": str,
+        }),
+        _ArchiveTable(PlayHistory, "played_at", {
+            "id": int,
+            "played_at": "time",
+            "song_id": int,
+            "playlist_id": int,
+            "play_source": PlaySource,
+            "play_duration": float,
+            "completion_rate": float,
+        }),
+    )
+}
+
+
+def _to_arrays(table: _ArchiveTable, rows: Sequence[tuple]) -> Dict[str, np.ndarray]:
+    """
+    数据库行 -> 列数组。时间存为 UTC 秒 (int64)，缺失的整数为 -1，缺失的浮点数为 NaN；
+    字符串和 JSON（序列化为文本）存为 object 数组，缺失值为 None
+    """
+    arrays = {}
+    for index, (name, kind) in enumerate(table.columns.items()):
+        values = [row[index] for row in rows]
+        if kind == "time":
+            arrays[name] = (np.array(values, dtype="datetime64[s]") - _EPOCH).astype(np.int64)
+        elif kind is int:
+            arrays[name] = np.array([-1 if v is None else v for v in values], dtype=np.int64)
+        elif kind is float:
+            arrays[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        elif kind is str:
+            arrays[name] = _object_array(values)
+        elif kind == "json":
+            arrays[name] = _object_array([
+                None if v is None else json.dumps(v, ensure_ascii=False) for v in values
+            ])
+        else:
+            codes = ENUM_CODES[kind]
+            arrays[name] = np.array([-1 if v is None else codes[kind(v)] for v in values], dtype=np.int8)
+    return arrays
+
+
+def _object_array(values: Sequence[object]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _missing_column(kind: object, length: int) -> np.ndarray:
+    """旧版本归档中没有的列：按类型填充缺失值"""
+    if kind == "time" or kind is int:
+        return np.full(length, -1, dtype=np.int64)
+    if kind is float:
+        return np.full(length, np.nan, dtype=np.float64)
+    if kind is str or kind == "json":
+        return np.full(length, None, dtype=object)
+    return np.full(length, -1, dtype=np.int8)
+
+
+def _empty_arrays(table: _ArchiveTable) -> Dict[str, np.ndarray]:
+    return _to_arrays(table, [])
+
+
+class HistoryArchive:
+    """
+    播放历史 / 用户行为的列式归档和向量化分析
+
+    compact() 把超过保留期的记录写入按月分区的列文件并从 SQLite 删除；
+    写入先落到带批次序号的 .pending 文件，删除事务同时提交该序号（ArchiveWatermark），
+    之后再改名。进程在任一步骤中断都不会重复或丢失记录。
+    """
+
+    def __init__(self, root: Optional[Path] = None, db: Optional[DatabaseManager] = None):
+        self.db = db or DatabaseManager()
+        self.root = Path(root) if root else Path.home() / ".hibiki_music" / "analytics"
+        self._cache: Dict[str, Tuple[Tuple[str, ...], Dict[str, np.ndarray]]] = {}
+        # 表名 -> (归档数组, history_revision, 已读取的最大 id, 合并后的数组)
+        self._live: Dict[str, Tuple[Dict[str, np.ndarray], int, int, Dict[str, np.ndarray]]] = {}
+
+    @property
+    def backend(self) -> str:
+        return "parquet" if pq is not None else "npy"
+
+    # ================================
+    # 压缩归档
+    # ================================
+
+    def compact(self, keep_days: int = DEFAULT_KEEP_DAYS,
+                now: Optional[datetime] = None) -> Dict[str, int]:
+        """归档 keep_days 天以前的记录，返回各表归档的行数"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=keep_days)
+        archived = {}
+        for table in ARCHIVE_TABLES.values():
+            self._recover_pending(table)
+            archived[table.name] = self._compact_table(table, cutoff)
+        return archived
+
+    def _compact_table(self, table: _ArchiveTable, cutoff: datetime) -> int:
+        model = table.model
+        missing = set(model.__table__.c.keys()) - set(table.columns)
+        if missing:
+            # 归档后 SQLite 中的行会被删除，缺少的列将永久丢失
+            raise RuntimeError(f"{table.name} 的归档列定义缺少: {', '.join(sorted(missing))}")
+        time_column = getattr(model, table.time_column)
+        with self.db.get_read_session() as session:
+            rows = session.exec(
+                select(*(getattr(model, name) for name in table.columns))
+                .where(time_column < cutoff)
+                .order_by(model.id)
+            ).all()
+        if not rows:
+            return 0
+
+        # 按月分组写入 .pending，文件名带本批次序号
+        sequence = self._committed_sequence(table) + 1
+        months: Dict[str, List[tuple]] = {}
+        time_index = list(table.columns).index(table.time_column)
+        for row in rows:
+            months.setdefault(row[time_index].strftime("%Y-%m"), []).append(row)
+        pending = [
+            self._write_part(table, month, _to_arrays(table, month_rows), sequence)
+            for month, month_rows in months.items()
+        ]
+
+        # 删除已归档的行（新写入的记录时间都晚于 cutoff，不会被误删），同一事务提交批次序号
+        watermarks = ArchiveWatermark.__table__
+        with self.db._engine.begin() as conn:
+            conn.execute(
+                model.__table__.delete()
+                .where(model.__table__.c[table.time_column] < cutoff)
+                .where(model.__table__.c.id <= rows[-1][0])
+            )
+            values = {"sequence": sequence, "archived_id": rows[-1][0]}
+            conn.execute(
+                sqlite_insert(watermarks)
+                .values(table_name=table.name, **values)
+                .on_conflict_do_update(index_elements=[watermarks.c.table_name], set_=values)
+            )
+
+        for path in pending:
+            self._finalize(path)
+        self._cache.pop(table.name, None)
+        self._live.pop(table.name, None)
+        print(f"📦 已归档 {table.name}: {len(rows)} 行，{len(months)} 个月份")
+        return len(rows)
+
+    def _write_part(self, table: _ArchiveTable, month: str, arrays: Dict[str, np.ndarray],
+                    sequence: int) -> Path:
+        ids = arrays["id"]
+        directory = self.root / table.name / month
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"part-{ids.min()}-{ids.max()}"
+
+        if pq is not None:
+            path = directory / f"{stem}.parquet.{sequence}{_PENDING_SUFFIX}"
+            # object 列显式声明为字符串，全为 None 的批次也保持同一 schema
+            pq.write_table(pa.table({
+                name: pa.array(values, type=pa.string()) if values.dtype == object else values
+                for name, values in arrays.items()
+            }), path)
+        else:
+            path = directory / f"{stem}.{sequence}{_PENDING_SUFFIX}"
+            path.mkdir(exist_ok=True)
+            for name, values in arrays.items():
+                np.save(path / f"{name}.npy", values)
+        return path
+
+    @staticmethod
+    def _finalize(path: Path) -> None:
+        """<名称>.<批次序号>.pending -> <名称>"""
+        os.replace(path, path.with_name(path.name.rsplit(".", 2)[0]))
+
+    def _committed_sequence(self, table: _ArchiveTable) -> int:
+        """已提交的最后一个归档批次序号"""
+        with self.db.get_read_session() as session:
+            watermark = session.get(ArchiveWatermark, table.name)
+        return watermark.sequence if watermark else 0
+
+    def _recover_pending(self, table: _ArchiveTable) -> None:
+        """处理上次中断留下的 .pending：批次的删除事务已提交则转正，否则丢弃（稍后会重新归档）"""
+        paths = list((self.root / table.name).glob(f"*/*{_PENDING_SUFFIX}"))
+        if not paths:
+            return
+        committed = self._committed_sequence(table)
+        for path in paths:
+            if int(path.name.rsplit(".", 2)[1]) <= committed:
+                self._finalize(path)
+            else:
+                shutil.rmtree(path) if path.is_dir() else path.unlink()
+
+    # ================================
+    # 读取
+    # ================================
+
+    def load(self, table_name: str, since: Optional[datetime] = None,
+             until: Optional[datetime] = None, include_live: bool = True,
+             columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """读取归档 + SQLite 近期记录的列数组，按 [since, until) 过滤；columns 为空时返回所有列"""
+        table = ARCHIVE_TABLES[table_name]
+        arrays = self._load_combined(table) if include_live else self._load_archive(table)
+        times = arrays[table.time_column]
+        arrays = {name: arrays[name] for name in (columns or table.columns)}
+
+        if since is not None or until is not None:
+            mask = np.ones(len(times), dtype=bool)
+            if since is not None:
+                mask &= times >= (np.datetime64(since, "s") - _EPOCH).astype(np.int64)
+            if until is not None:
+                mask &= times < (np.datetime64(until, "s") - _EPOCH).astype(np.int64)
+            arrays = {name: values[mask] for name, values in arrays.items()}
+        return arrays
+
+    def _part_paths(self, table: _ArchiveTable) -> List[Path]:
+        directory = self.root / table.name
+        if not directory.exists():
+            return []
+        return sorted(
+            path for path in directory.glob("*/part-*")
+            if not path.name.endswith(_PENDING_SUFFIX)
+        )
+
+    def _load_archive(self, table: _ArchiveTable) -> Dict[str, np.ndarray]:
+        """归档部分按分区文件列表缓存，compact 之后才会重新读取"""
+        paths = self._part_paths(table)
+        signature = tuple(str(path) for path in paths)
+        cached = self._cache.get(table.name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        parts = [self._read_part(table, path) for path in paths]
+        if parts:
+            arrays = {name: np.concatenate([part[name] for part in parts]) for name in table.columns}
+        else:
+            arrays = _empty_arrays(table)
+        self._cache[table.name] = (signature, arrays)
+        return arrays
+
+    @staticmethod
+    def _read_part(table: _ArchiveTable, path: Path) -> Dict[str, np.ndarray]:
+        if path.suffix == ".parquet":
+            if pq is None:
+                raise RuntimeError(f"读取 {path} 需要安装 pyarrow")
+            data = pq.read_table(path)
+            arrays = {
+                name: data.column(name).to_numpy(zero_copy_only=False)
+                for name in table.columns if name in data.column_names
+            }
+        else:
+            arrays = {}
+            for name, kind in table.columns.items():
+                file = path / f"{name}.npy"
+                if not file.exists():
+                    continue
+                if kind is str or kind == "json":
+                    # object 列由本模块写入，需要 pickle 才能还原
+                    arrays[name] = np.load(file, allow_pickle=True)
+                else:
+                    arrays[name] = np.load(file, mmap_mode="r")
+        length = len(arrays["id"])
+        for name, kind in table.columns.items():
+            if name not in arrays:
+                arrays[name] = _missing_column(kind, length)
+            elif kind is str or kind == "json":
+                arrays[name] = arrays[name].astype(object)
+        return arrays
+
+    def _load_combined(self, table: _ArchiveTable) -> Dict[str, np.ndarray]:
+        """
+        归档 + SQLite 记录。正常情况下表只追加，每次只读取新增的行；
+        compact 或删除歌曲（history_revision 变化）改写了已读取的行时重新读取全部近期记录
+        """
+        archive = self._load_archive(table)
+        revision = self.db.history_revision
+        cached = self._live.get(table.name)
+        if cached is None or cached[0] is not archive or cached[1] != revision:
+            last_id, arrays = -1, archive
+        else:
+            _, _, last_id, arrays = cached
+
+        columns = table.model.__table__.c
+        with self.db._read_engine.connect() as conn:
+            rows = conn.execute(
+                select(*(columns[name] for name in table.columns))
+                .where(columns.id > last_id)
+                .order_by(columns.id)
+            ).all()
+        if rows:
+            fresh = _to_arrays(table, rows)
+            arrays = {name: np.concatenate([arrays[name], fresh[name]]) for name in table.columns}
+            last_id = rows[-1][0]
+
+        self._live[table.name] = (archive, revision, last_id, arrays)
+        return arrays
+
+    # ================================
+    # 分析查询
+    # ================================
+
+    def completion_histogram(self, bins: int = 10, song_id: Optional[int] = None,
+                             since: Optional[datetime] = None,
+                             until: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """播放结束（完成或中断）时完成度的分布，返回 (counts, bin_edges)"""
+        actions = self._ended_plays(since, until, ("completion_rate", "song_id"))
+        rates = actions["completion_rate"]
+        mask = ~np.isnan(rates)
+        if song_id is not None:
+            mask &= actions["song_id"] == song_id
+        return np.histogram(rates[mask], bins=bins, range=(0.0, 1.0))
+
+    def skip_rates(self, threshold: float = SKIP_COMPLETION_RATE, min_plays: int = 1,
+                   since: Optional[datetime] = None,
+                   until: Optional[datetime] = None) -> Dict[int, float]:
+        """每首歌的跳过率：完成度低于 threshold 的中断次数 / 播放结束次数"""
+        actions = self._ended_plays(since, until, ("action_type", "song_id", "completion_rate"))
+        known = actions["song_id"] >= 0
+        song_ids = actions["song_id"][known]
+        if not len(song_ids):
+            return {}
+
+        skipped = (
+            (actions["action_type"][known] == ENUM_CODES[UserActionType][UserActionType.PLAY_INTERRUPT])
+            & (actions["completion_rate"][known] < threshold)
+        )
+        size = int(song_ids.max()) + 1
+        plays = np.bincount(song_ids, minlength=size)
+        skips = np.bincount(song_ids, weights=skipped.astype(np.float64), minlength=size)
+        eligible = np.flatnonzero(plays >= max(min_plays, 1))
+        return dict(zip(eligible.tolist(), (skips[eligible] / plays[eligible]).tolist()))
+
+    def listening_time_by_hour(self, since: Optional[datetime] = None,
+                               until: Optional[datetime] = None,
+                               utc_offset: Optional[timedelta] = None) -> np.ndarray:
+        """按一天中的小时统计收听时长（秒），返回长度 24 的数组；默认按本机时区"""
+        if utc_offset is None:
+            utc_offset = datetime.now().astimezone().utcoffset()
+        actions = self._ended_plays(since, until, ("timestamp", "play_duration"))
+        durations = np.nan_to_num(actions["play_duration"])
+        hours = (actions["timestamp"] + int(utc_offset.total_seconds())) // 3600 % 24
+        return np.bincount(hours, weights=durations, minlength=24)
+
+    def _ended_plays(self, since: Optional[datetime], until: Optional[datetime],
+                     columns: Sequence[str]) -> Dict[str, np.ndarray]:
+        """PLAY_COMPLETE / PLAY_INTERRUPT 记录的指定列"""
+        actions = self.load(UserAction.__tablename__, since, until,
+                            columns=tuple({"action_type", *columns}))
+        codes = ENUM_CODES[UserActionType]
+        action_types = actions["action_type"]
+        mask = (
+            (action_types == codes[UserActionType.PLAY_COMPLETE])
+            | (action_types == codes[UserActionType.PLAY_INTERRUPT])
+        )
+        return {name: actions[name][mask] for name in columns}
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+🖼️ Hibiki Music 专辑封面缓存
+
+扫描时从音频标签中取出内嵌封面（ID3 APIC、MP4 covr、FLAC/Vorbis 图片块），
+按图片内容哈希去重，只保存几种尺寸的缩略图：
+
+    ~/.hibiki_music/artwork/<哈希前两位>/<哈希>-<边长>.jpg
+
+同一张专辑的十几首歌共用一份缩略图，界面上只解码缩略图，不会解码原图。
+"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from PIL import Image
+
+# 缩略图边长（像素）：封面网格 / 列表与小封面 / 正在播放大图，均按 2x 屏幕计算
+THUMBNAIL_SIZES = (128, 256, 512)
+THUMBNAIL_QUALITY = 85
+
+# APIC / FLAC 图片类型：3 = 封面 (front cover)
+_FRONT_COVER = 3
+
+
+def artwork_hash(image_data: bytes) -> str:
+    """封面图片内容哈希，用作缓存键"""
+    return hashlib.blake2b(image_data, digest_size=16).hexdigest()
+
+
+class ArtworkCache:
+    """按内容寻址的封面缩略图缓存，多进程同时写入同一张封面是安全的"""
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        self.root = Path(root) if root else Path.home() / ".hibiki_music" / "artwork"
+
+    def path_for(self, art_hash: str, size: int) -> Path:
+        return self.root / art_hash[:2] / f"{art_hash}-{size}.jpg"
+
+    def has(self, art_hash: str) -> bool:
+        """所有尺寸的缩略图是否都已生成"""
+        return all(self.path_for(art_hash, size).exists() for size in THUMBNAIL_SIZES)
+
+    def thumbnail_path(self, art_hash: str, size: int) -> Optional[Path]:
+        """不小于 size 的最小缩略图，都比 size 小时返回最大的一张；未缓存时返回 None"""
+        candidates = [s for s in THUMBNAIL_SIZES if s >= size] or [THUMBNAIL_SIZES[-1]]
+        path = self.path_for(art_hash, candidates[0])
+        return path if path.exists() else None
+
+    def store(self, image_data: bytes) -> Optional[str]:
+        """
+        保存一张封面的缩略图，返回内容哈希
+
+        已缓存的封面直接返回哈希，不会再次解码；无法解码的图片返回 None。
+        """
+        if not image_data:
+            return None
+        art_hash = artwork_hash(image_data)
+        if self.has(art_hash):
+            return art_hash
+
+        try:
+            with Image.open(io.BytesIO(image_data)) as image:
+                # JPEG 可以在解码时直接按 1/2、1/4、1/8 缩小，大封面不必完整解码
+                image.draft("RGB", (THUMBNAIL_SIZES[-1], THUMBNAIL_SIZES[-1]))
+                image = image.convert("RGB")
+                directory = self.root / art_hash[:2]
+                directory.mkdir(parents=True, exist_ok=True)
+                # 从大到小依次缩放，每一级都在上一级的结果上继续缩小
+                for size in reversed(THUMBNAIL_SIZES):
+                    image.thumbnail((size, size), Image.LANCZOS)
+                    self._write(image, self.path_for(art_hash, size))
+        except Exception as e:
+            print(f"⚠️ 封面解码失败: {e}")
+            return None
+        return art_hash
+
+    def store_file(self, image_path: Union[str, Path]) -> Optional[str]:
+        """保存图片文件（如目录中的 cover.jpg）的缩略图，返回内容哈希"""
+        try:
+            image_data = Path(image_path).read_bytes()
+        except OSError as e:
+            print(f"⚠️ 无法读取封面文件: {image_path} - {e}")
+            return None
+        return self.store(image_data)
+
+    @staticmethod
+    def _write(image: Image.Image, path: Path) -> None:
+        """先写临时文件再改名，其他进程不会读到写了一半的缩略图"""
+        temp = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        image.save(temp, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+        os.replace(temp, path)
+
+
+def extract_embedded_artwork(audio_file) -> Optional[bytes]:
+    """
+    从 mutagen 文件对象中取出内嵌封面，优先返回封面 (front cover) 类型的图片
+
+    支持 ID3 (MP3/WAV/AIFF) 的 APIC、MP4 的 covr、FLAC 图片块和 Ogg 的 METADATA_BLOCK_PICTURE。
+    """
+    pictures = []  # (图片类型, 数据)
+
+    for picture in getattr(audio_file, "pictures", None) or ():  # FLAC
+        pictures.append((picture.type, picture.data))
+
+    tags = getattr(audio_file, "tags", None)
+    if tags:
+        if hasattr(tags, "getall"):  # ID3
+            pictures.extend((frame.type, frame.data) for frame in tags.getall("APIC"))
+        elif "covr" in tags:  # MP4
+            pictures.extend((_FRONT_COVER, bytes(cover)) for cover in tags["covr"])
+        elif "metadata_block_picture" in tags:  # Ogg Vorbis / Opus
+            from mutagen.flac import Picture
+            for encoded in tags["metadata_block_picture"]:
+                try:
+                    picture = Picture(base64.b64decode(encoded))
+                except Exception:
+                    continue
+                pictures.append((picture.type, picture.data))
+
+    if not pictures:
+        return None
+    for picture_type, data in pictures:
+        if picture_type == _FRONT_COVER:
+            return data
+    return pictures[0][1]
@@ -6,13 +6,16 @@
 """
 
 import os
+import functools
+import itertools
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Union, Tuple, Iterable, Iterator
 from datetime import datetime
 
 from sqlmodel import SQLModel, Session, create_engine, select, and_, or_, func
-from sqlalchemy import event
-from sqlalchemy.engine import Engine
+from sqlalchemy import event, table, column, literal, literal_column, null, text, tuple_, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.pool import QueuePool
 
 from .models import (
     Song, SongCreate, SongUpdate, SongPublic,
@@ -21,15 +24,157 @@ from .models import (
     PlayHistory, PlayHistoryCreate, PlayHistoryPublic,
     LanguageVersion, LanguageVersionCreate, LanguageVersionPublic,
     UserAction, UserActionCreate, UserActionPublic, UserActionType, ActionTrigger, PlaySource,
-    SongFilter, SearchQuery, LibraryStats,
-    SongTagLink, PlaylistSongLink
+    SongFilter, SongFilterResult, SearchQuery, LibraryStats,
+    SongTagLink, PlaylistSongLink, SongFacet, FacetKind,
+    LibrarySummary, LibraryCounter, MetadataCacheEntry
 )
 
+# ================================
+# 全文搜索 (SQLite FTS5)
+# ================================
+
+# 参与全文索引的列（歌词入库后追加 lyrics）
+FTS_COLUMNS = ("title", "artist", "album", "album_artist", "genre")
+# bm25 各列权重，顺序与 FTS_COLUMNS 一致
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 2.0, 1.0)
+# trigram 分词器按字符切分，不依赖空格分词，中日韩文本与英文同样支持子串匹配
+FTS_TOKENIZER = "trigram case_sensitive 0"
+# trigram 至少需要 3 个字符，更短的查询回退到 LIKE
+FTS_MIN_QUERY_LENGTH = 3
+
+_songs_fts = table("songs_fts", column("rowid"))
+_songs_fts_ref = literal_column("songs_fts")
+
+
+def _fts_phrase(text: str) -> str:
+    """把用户输入转成 FTS5 短语查询，避免特殊字符被解析为查询语法"""
+    return '"' + text.replace('"', '""') + '"'
+
+# ================================
+# 标签副表 (song_facets)
+# ================================
+
+# 维度 -> (songs 上的 JSON 列, JSON 类型)；emotions 是 {情感: 强度}，其余是字符串列表
+FACET_JSON_COLUMNS = {
+    FacetKind.EMOTION: ("emotions", "object"),
+    FacetKind.THEME: ("themes", "array"),
+    FacetKind.ERA: ("era_tags", "array"),
+    FacetKind.STYLE: ("style_tags", "array"),
+}
+# filter_songs 返回计数的维度
+FACET_COUNT_KINDS = (
+    FacetKind.LANGUAGE, FacetKind.EMOTION, FacetKind.THEME,
+    FacetKind.ERA, FacetKind.STYLE, FacetKind.TAG,
+)
+
+
+def _facet_rows_sql(ref: str, from_songs: bool = False) -> str:
+    """把 ref 行的 JSON 标签展开成 (facet, value, song_id, score) 的 SELECT 语句"""
+    selects = []
+    for facet, (name, json_type) in FACET_JSON_COLUMNS.items():
+        if json_type == "object":
+            value, score, item_types = "j.key", "j.value", "('real', 'integer')"
+        else:
+            value, score, item_types = "j.value", "NULL", "('text')"
+        source = f"songs AS {ref}, json_each({ref}.{name}) AS j" if from_songs else f"json_each({ref}.{name}) AS j"
+        selects.append(
+            f"SELECT '{facet.value}', {value}, {ref}.id, {score} FROM {source} "
+            f"WHERE json_type({ref}.{name}) = '{json_type}' AND j.type IN {item_types}"
+        )
+    return " UNION ALL ".join(selects)
+
+# ================================
+# 音乐库统计 (library_stats / library_counters)
+# ================================
+
+# 计数维度 -> (songs 列, library_stats 中的去重总数列；None 表示不需要)
+STATS_COUNTERS = {
+    "artist": ("artist", "total_artists"),
+    "album": ("album", "total_albums"),
+    "language": ("detected_language", None),
+}
+# 触发统计更新的列
+STATS_SOURCE_COLUMNS = ("artist", "album", "detected_language", "duration", "favorite")
+
+
+def _stats_delta_sql(ref: str, sign: int) -> str:
+    """把 ref 行计入 (sign=1) 或移出 (sign=-1) 汇总表的语句序列，用于触发器"""
+    op = "+" if sign > 0 else "-"
+    statements = [
+        f"UPDATE library_stats SET total_songs = total_songs {op} 1, "
+        f"total_duration = total_duration {op} {ref}.duration, "
+        f"favorite_count = favorite_count {op} {ref}.favorite WHERE id = 1"
+    ]
+    for kind, (name, total) in STATS_COUNTERS.items():
+        current = f"(SELECT song_count FROM library_counters WHERE kind = '{kind}' AND key = {ref}.{name})"
+        if sign > 0:
+            statements.append(
+                f"INSERT INTO library_counters (kind, key, song_count) "
+                f"SELECT '{kind}', {ref}.{name}, 1 WHERE {ref}.{name} IS NOT NULL "
+                f"ON CONFLICT (kind, key) DO UPDATE SET song_count = song_count + 1"
+            )
+            if total:
+                # 新出现的值：计数刚变为 1
+                statements.append(f"UPDATE library_stats SET {total} = {total} + 1 WHERE id = 1 AND {current} = 1")
+        else:
+            statements.append(
+                f"UPDATE library_counters SET song_count = song_count - 1 "
+                f"WHERE kind = '{kind}' AND key = {ref}.{name}"
+            )
+            if total:
+                statements.append(f"UPDATE library_stats SET {total} = {total} - 1 WHERE id = 1 AND {current} = 0")
+            statements.append(
+                f"DELETE FROM library_counters WHERE kind = '{kind}' AND key = {ref}.{name} AND song_count = 0"
+            )
+    return "; ".join(statements) + ";"
+
+# ================================
+# 连接池和 SQLite 配置
+# ================================
+
+# 只读连接池大小（另外允许同样数量的溢出连接）
+READER_POOL_SIZE = 4
+# 等待写连接的最长时间（秒）
+WRITER_POOL_TIMEOUT = 30
+# SQLite 驱动层缓存的预编译语句数，SQLAlchemy 层缓存的编译结果数
+STATEMENT_CACHE_SIZE = 256
+QUERY_CACHE_SIZE = 1200
+
+# 读写连接共用的 PRAGMA
+SQLITE_PRAGMAS = (
+    "foreign_keys=ON",          # 启用外键约束
+    "synchronous=NORMAL",       # WAL 下只在检查点时 fsync，平衡性能和数据安全
+    "cache_size=-32768",        # 每个连接 32 MiB 页缓存（负数单位为 KiB）
+    "mmap_size=268435456",      # 256 MiB 内存映射读取，减少 read() 系统调用和缓存拷贝
+    "temp_store=MEMORY",        # 临时数据存储在内存
+    "busy_timeout=5000",        # 与其它进程的锁冲突时等待而不是立即报错
+)
+WRITER_PRAGMAS = SQLITE_PRAGMAS + ("journal_mode=WAL",)  # WAL 模式下读写互不阻塞
+READER_PRAGMAS = SQLITE_PRAGMAS + ("query_only=ON",)     # 只读连接拒绝任何写入
+
+
+def _pragma_listener(pragmas: Tuple[str, ...]):
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+    return set_sqlite_pragma
+
 class DatabaseManager:
-    """数据库管理器 - 单例模式"""
+    """数据库管理器 - 单例模式
+    
+    - 写引擎只有一个连接：进程内的写入在连接池上排队，不会互相触发 SQLITE_BUSY
+    - 读引擎是只读连接池：WAL 模式下读取不等待写事务，后台扫描和 UI 查询可以并行
+    
+    get_session() 用于需要写入的操作，只读查询使用 get_read_session()。
+    """
     
     _instance: Optional['DatabaseManager'] = None
     _engine = None
+    _read_engine = None
+    # 播放历史/用户行为被删除或改写（而不是追加）的次数，增量读取这些表的缓存据此失效
+    history_revision = 0
     
     def __new__(cls) -> 'DatabaseManager':
         if cls._instance is None:
@@ -49,27 +194,43 @@ class DatabaseManager:
         db_dir.mkdir(exist_ok=True)
         db_path = db_dir / "music_library.db"
         
-        # 创建数据库引擎
+        # 创建数据库引擎：一个写连接 + 只读连接池
         database_url = f"sqlite:///{db_path}"
+        connect_args = {
+            "check_same_thread": False,  # 连接由连接池在线程间复用
+            "cached_statements": STATEMENT_CACHE_SIZE,
+        }
         self._engine = create_engine(
             database_url,
             echo=False,  # 设为 True 可查看 SQL 语句
-            connect_args={"check_same_thread": False}
+            poolclass=QueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=WRITER_POOL_TIMEOUT,
+            query_cache_size=QUERY_CACHE_SIZE,
+            connect_args=connect_args
+        )
+        self._read_engine = create_engine(
+            database_url,
+            echo=False,
+            poolclass=QueuePool,
+            pool_size=READER_POOL_SIZE,
+            max_overflow=READER_POOL_SIZE,
+            query_cache_size=QUERY_CACHE_SIZE,
+            connect_args=connect_args
         )
         
-        # SQLite 优化配置
-        @event.listens_for(Engine, "connect")
-        def set_sqlite_pragma(dbapi_connection, connection_record):
-            cursor = dbapi_connection.cursor()
-            cursor.execute("PRAGMA foreign_keys=ON")  # 启用外键约束
-            cursor.execute("PRAGMA journal_mode=WAL")  # WAL 模式提高并发性能
-            cursor.execute("PRAGMA synchronous=NORMAL")  # 平衡性能和数据安全
-            cursor.execute("PRAGMA cache_size=10000")  # 增加缓存大小
-            cursor.execute("PRAGMA temp_store=MEMORY")  # 临时数据存储在内存
-            cursor.close()
+        # SQLite 优化配置（只作用于本实例的引擎）
+        event.listen(self._engine, "connect", _pragma_listener(WRITER_PRAGMAS))
+        event.listen(self._read_engine, "connect", _pragma_listener(READER_PRAGMAS))
         
         # 创建所有表
         SQLModel.metadata.create_all(self._engine)
+        self._ensure_columns()
+        self._ensure_indexes()
+        self._init_fulltext_search()
+        self._init_facet_tables()
+        self._init_library_stats()
         
         # 初始化系统数据
         self._init_system_data()
@@ -77,9 +238,152 @@ class DatabaseManager:
         print(f"✅ 数据库初始化完成: {db_path}")
     
     def get_session(self) -> Session:
-        """获取数据库会话"""
+        """获取数据库会话（写连接）"""
         return Session(self._engine)
     
+    def get_read_session(self) -> Session:
+        """获取只读数据库会话（只读连接池）"""
+        return Session(self._read_engine)
+    
+    def dispose(self):
+        """关闭所有连接"""
+        self._engine.dispose()
+        self._read_engine.dispose()
+    
+    def _ensure_columns(self):
+        """create_all 不会给已存在的表补列，这里用 ALTER TABLE 补齐后来新增的可空列"""
+        with self._engine.begin() as conn:
+            for model in (Song,):
+                table = model.__table__
+                existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+                for column in table.columns:
+                    if column.name not in existing and column.nullable:
+                        column_type = column.type.compile(dialect=self._engine.dialect)
+                        conn.exec_driver_sql(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}")
+                        print(f"🔧 数据库补充列: {table.name}.{column.name}")
+    
+    def _ensure_indexes(self):
+        """create_all 不会给已存在的表补建索引，这里补齐后来新增的索引"""
+        for model in (Song, SongTagLink):
+            for index in model.__table__.indexes:
+                index.create(self._engine, checkfirst=True)
+    
+    def _init_facet_tables(self):
+        """创建 song_facets 同步触发器（幂等），首次创建时从已有歌曲回填"""
+        columns = ", ".join(name for name, _ in FACET_JSON_COLUMNS.values())
+        insert = "INSERT OR IGNORE INTO song_facets (facet, value, song_id, score) "
+        
+        with self._engine.begin() as conn:
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'song_facets_ai'"
+            ).first()
+            if exists:
+                return
+            
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER song_facets_ai AFTER INSERT ON songs BEGIN "
+                f"{insert}{_facet_rows_sql('new')}; END"
+            )
+            # 先删副表行，避免外键约束阻止删除歌曲
+            conn.exec_driver_sql(
+                "CREATE TRIGGER song_facets_bd BEFORE DELETE ON songs BEGIN "
+                "DELETE FROM song_facets WHERE song_id = old.id; END"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER song_facets_au AFTER UPDATE OF {columns} ON songs BEGIN "
+                f"DELETE FROM song_facets WHERE song_id = old.id; "
+                f"{insert}{_facet_rows_sql('new')}; END"
+            )
+            conn.exec_driver_sql("DELETE FROM song_facets")
+            conn.exec_driver_sql(insert + _facet_rows_sql("s", from_songs=True))
+        
+        print("✅ 标签副表初始化完成")
+    
+    def _init_fulltext_search(self):
+        """创建 FTS5 全文索引表和同步触发器（幂等）"""
+        columns = ", ".join(FTS_COLUMNS)
+        new_columns = ", ".join(f"new.{name}" for name in FTS_COLUMNS)
+        old_columns = ", ".join(f"old.{name}" for name in FTS_COLUMNS)
+        
+        with self._engine.begin() as conn:
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'songs_fts'"
+            ).first()
+            if exists:
+                return
+            
+            conn.exec_driver_sql(
+                f"CREATE VIRTUAL TABLE songs_fts USING fts5({columns}, "
+                f"content='songs', content_rowid='id', tokenize='{FTS_TOKENIZER}')"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER songs_fts_ai AFTER INSERT ON songs BEGIN "
+                f"INSERT INTO songs_fts(rowid, {columns}) VALUES (new.id, {new_columns}); END"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER songs_fts_ad AFTER DELETE ON songs BEGIN "
+                f"INSERT INTO songs_fts(songs_fts, rowid, {columns}) "
+                f"VALUES ('delete', old.id, {old_columns}); END"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER songs_fts_au AFTER UPDATE OF {columns} ON songs BEGIN "
+                f"INSERT INTO songs_fts(songs_fts, rowid, {columns}) "
+                f"VALUES ('delete', old.id, {old_columns}); "
+                f"INSERT INTO songs_fts(rowid, {columns}) VALUES (new.id, {new_columns}); END"
+            )
+            # 为已有数据建立索引
+            conn.exec_driver_sql("INSERT INTO songs_fts(songs_fts) VALUES ('rebuild')")
+        
+        print("✅ 全文索引初始化完成")
+    
+    def _init_library_stats(self):
+        """创建统计汇总的维护触发器（幂等），首次创建时全量统计一次"""
+        columns = ", ".join(STATS_SOURCE_COLUMNS)
+        
+        with self._engine.begin() as conn:
+            exists = conn.exec_driver_sql(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'library_stats_ai'"
+            ).first()
+            if exists:
+                return
+            
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER library_stats_ai AFTER INSERT ON songs BEGIN "
+                f"{_stats_delta_sql('new', 1)} END"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER library_stats_ad AFTER DELETE ON songs BEGIN "
+                f"{_stats_delta_sql('old', -1)} END"
+            )
+            conn.exec_driver_sql(
+                f"CREATE TRIGGER library_stats_au AFTER UPDATE OF {columns} ON songs BEGIN "
+                f"{_stats_delta_sql('old', -1)} {_stats_delta_sql('new', 1)} END"
+            )
+            self._rebuild_library_stats(conn)
+        
+        print("✅ 统计汇总初始化完成")
+    
+    def _rebuild_library_stats(self, conn):
+        """从 songs 表全量重算汇总（初始化和修复用）"""
+        conn.exec_driver_sql("DELETE FROM library_counters")
+        conn.exec_driver_sql("DELETE FROM library_stats")
+        conn.exec_driver_sql(
+            "INSERT INTO library_stats "
+            "(id, total_songs, total_artists, total_albums, total_duration, favorite_count) "
+            "SELECT 1, count(*), count(DISTINCT artist), count(DISTINCT album), "
+            "coalesce(sum(duration), 0.0), coalesce(sum(favorite), 0) FROM songs"
+        )
+        for kind, (name, _) in STATS_COUNTERS.items():
+            conn.exec_driver_sql(
+                f"INSERT INTO library_counters (kind, key, song_count) "
+                f"SELECT '{kind}', {name}, count(*) FROM songs WHERE {name} IS NOT NULL GROUP BY {name}"
+            )
+    
+    def rebuild_library_stats(self):
+        """重新统计音乐库汇总"""
+        with self._engine.begin() as conn:
+            self._rebuild_library_stats(conn)
+    
     def _init_system_data(self):
         """初始化系统数据（标签等）"""
         with self.get_session() as session:
@@ -137,6 +441,109 @@ class DatabaseManager:
             session.commit()
             print("✅ 系统标签初始化完成")
 
+_TAG_SEPARATOR = "\x1f"
+
+# 元数据缓存中的字段名（与 mutagen 提取结果一致） -> songs 表的列
+CACHED_METADATA_COLUMNS = {
+    "title": "title",
+    "artist": "artist",
+    "album": "album",
+    "albumartist": "album_artist",
+    "duration": "duration",
+    "year": "year",
+    "tracknumber": "track_number",
+    "discnumber": "disc_number",
+    "genre": "genre",
+    "bitrate": "bitrate",
+    "sample_rate": "sample_rate",
+    "artwork": "artwork_hash",
+}
+# 批量 IN 查询每次携带的参数个数
+_IN_CHUNK_SIZE = 500
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+# iter_songs 返回的列，以及支持 keyset 分页的排序列（均有索引）
+SONG_ROW_COLUMNS = ("id", "title", "artist", "album", "duration", "file_path", "added_at", "artwork_hash")
+SONG_ROW_ORDER_KEYS = ("added_at", "title", "artist", "id")
+
+
+def song_row_key(row, order_by: str = "added_at") -> Tuple[Any, int]:
+    """iter_songs 行的分页键，可作为下一次调用的 after_key"""
+    return (getattr(row, order_by), row.id)
+
+
+def _select_songs():
+    """
+    SongPublic 的列投影查询：只取需要的列，标签名用关联子查询聚合在同一行，
+    一次查询即可得到完整结果，不创建 ORM 对象，也不会逐首歌曲懒加载标签 (N+1)
+    """
+    songs = Song.__table__
+    tag_names = (
+        select(func.group_concat(Tag.name, _TAG_SEPARATOR))
+        .join(SongTagLink, SongTagLink.tag_id == Tag.id)
+        .where(SongTagLink.song_id == Song.id)
+        .scalar_subquery()
+    )
+    columns = [songs.c[name] for name in SongPublic.model_fields if name != "tags"]
+    return select(*columns, tag_names.label("tag_names"))
+
+
+def _rows_to_public(rows) -> List[SongPublic]:
+    """把 _select_songs() 的结果行转换为 SongPublic（数据来自本库，跳过校验）"""
+    result = []
+    for row in rows:
+        fields = dict(row._mapping)
+        tag_names = fields.pop("tag_names")
+        fields["tags"] = tag_names.split(_TAG_SEPARATOR) if tag_names else []
+        result.append(SongPublic.model_construct(**fields))
+    return result
+
+def _facet_count_statement(matched):
+    """命中集合 matched (CTE, 列 id) 在各分面维度上的计数：(facet, value, count)"""
+    return union_all(
+        select(literal(FacetKind.LANGUAGE.value), Song.detected_language, func.count())
+        .join(matched, matched.c.id == Song.id)
+        .where(Song.detected_language.is_not(None))
+        .group_by(Song.detected_language),
+        select(SongFacet.facet, SongFacet.value, func.count())
+        .join(matched, matched.c.id == SongFacet.song_id)
+        .group_by(SongFacet.facet, SongFacet.value),
+        select(literal(FacetKind.TAG.value), Tag.name, func.count())
+        .select_from(SongTagLink)
+        .join(matched, matched.c.id == SongTagLink.song_id)
+        .join(Tag, Tag.id == SongTagLink.tag_id)
+        .group_by(Tag.name),
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _song_upsert_statement(columns: Tuple[str, ...]):
+    """
+    songs 表的批量 upsert 语句：冲突时只覆盖 columns 中的字段
+    
+    columns 是调用方实际提供的（非空）字段，未提供的列（例如分析得到的
+    情感/主题标签、语言置信度）保持原值。
+    """
+    songs = Song.__table__
+    statement = sqlite_insert(songs)
+    set_ = {
+        name: statement.excluded[name]
+        for name in columns
+        if name != "file_path" and name in songs.c
+    }
+    set_["updated_at"] = statement.excluded.updated_at
+    return statement.on_conflict_do_update(
+        index_elements=[songs.c.file_path], set_=set_
+    ).returning(songs.c.id, songs.c.file_path)
+
 class SongService:
     """歌曲服务层 - 业务逻辑处理"""
     
@@ -168,25 +575,287 @@ class SongService:
             
             return self._song_to_public(song, session)
     
-    def get_all_songs(self, limit: int = 1000, offset: int = 0) -> List[SongPublic]:
-        """获取所有歌曲"""
+    def bulk_upsert_songs(self, songs_data: Iterable[Union[SongCreate, Dict[str, Any]]],
+                          batch_size: int = 1000) -> List[int]:
+        """
+        批量导入歌曲：INSERT ... ON CONFLICT(file_path) DO UPDATE
+        
+        流式读取 songs_data，每 batch_size 条一个事务。已存在的歌曲只覆盖记录中
+        显式提供且非空的字段（与 create_song 的 exclude_unset 语义一致），分析结果、
+        播放次数、收藏等其它数据保持不变。
+        
+        Returns:
+            与输入顺序一致的歌曲 id 列表
+        """
+        ids: List[int] = []
+        songs_iter = iter(songs_data)
+        while True:
+            batch = list(itertools.islice(songs_iter, batch_size))
+            if not batch:
+                return ids
+            ids.extend(self._upsert_batch(batch))
+    
+    def _upsert_batch(self, batch: List[Union[SongCreate, Dict[str, Any]]]) -> List[int]:
+        now = datetime.utcnow()
+        rows = {}  # file_path -> (更新的列, row)，同一批内重复的路径以最后一条为准
+        paths = []
+        for song_data in batch:
+            if not isinstance(song_data, SongCreate):
+                song_data = SongCreate.model_validate(song_data)
+            # 插入时写入完整记录；冲突时只更新调用方显式提供的非空字段
+            supplied = tuple(sorted(
+                name for name, value in song_data.model_dump(exclude_unset=True).items()
+                if value is not None
+            ))
+            row = song_data.model_dump()
+            row["updated_at"] = now
+            rows[row["file_path"]] = (supplied, row)
+            paths.append(row["file_path"])
+        
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for supplied, row in rows.values():
+            groups.setdefault(supplied, []).append(row)
+        
+        id_by_path = {}
         with self.db.get_session() as session:
-            songs = session.exec(
-                select(Song).order_by(Song.added_at.desc()).limit(limit).offset(offset)
-            ).all()
-            return [self._song_to_public(song, session) for song in songs]
+            for supplied, group in groups.items():
+                result = session.execute(_song_upsert_statement(supplied), group)
+                id_by_path.update((file_path, song_id) for song_id, file_path in result.all())
+            session.commit()
+        return [id_by_path[file_path] for file_path in paths]
+    
+    def get_file_fingerprints(self, path_prefix: Optional[str] = None,
+                              paths: Optional[Iterable[str]] = None) -> Dict[str, Tuple[int, Optional[datetime]]]:
+        """获取已入库文件的 (file_size, file_modified_at)，供增量扫描比对；可按目录前缀或指定路径过滤"""
+        statement = select(Song.file_path, Song.file_size, Song.file_modified_at)
+        if path_prefix:
+            statement = statement.where(Song.file_path.startswith(path_prefix, autoescape=True))
+        if paths is None:
+            chunks = [statement]
+        else:
+            chunks = [
+                statement.where(Song.file_path.in_(chunk))
+                for chunk in _chunked(set(paths), _IN_CHUNK_SIZE)
+            ]
+        with self.db.get_read_session() as session:
+            return {
+                file_path: (file_size, modified_at)
+                for chunk in chunks
+                for file_path, file_size, modified_at in session.exec(chunk).all()
+            }
+    
+    def get_song_rows(self, song_ids: Iterable[int]) -> List[Any]:
+        """按 id 批量读取轻量行元组（字段见 SONG_ROW_COLUMNS），顺序不保证"""
+        base = select(*(getattr(Song, name) for name in SONG_ROW_COLUMNS))
+        rows = []
+        with self.db.get_read_session() as session:
+            for chunk in _chunked(set(song_ids), _IN_CHUNK_SIZE):
+                rows.extend(session.exec(base.where(Song.id.in_(chunk))).all())
+        return rows
+    
+    def delete_songs_by_path(self, paths: Iterable[str] = (), path_prefixes: Iterable[str] = ()) -> List[int]:
+        """
+        删除文件已不存在的歌曲（一个事务）
+        
+        同时删除标签/歌单关联、语言版本关联和播放历史；用户行为记录保留，song_id 置空。
+        
+        Args:
+            paths: 文件路径
+            path_prefixes: 目录前缀，删除其下所有歌曲（目录被删除时）
+            
+        Returns:
+            被删除的歌曲 id 列表
+        """
+        conditions = [Song.file_path.in_(chunk) for chunk in _chunked(set(paths), _IN_CHUNK_SIZE)]
+        conditions += [
+            Song.file_path.startswith(prefix.rstrip(os.sep) + os.sep, autoescape=True)
+            for prefix in path_prefixes
+        ]
+        if not conditions:
+            return []
+        
+        with self.db.get_session() as session:
+            ids = list(session.exec(select(Song.id).where(or_(*conditions))).all())
+            for chunk in _chunked(ids, _IN_CHUNK_SIZE):
+                for link in (SongTagLink, PlaylistSongLink, PlayHistory):
+                    session.execute(link.__table__.delete().where(link.__table__.c.song_id.in_(chunk)))
+                versions = LanguageVersion.__table__
+                session.execute(versions.delete().where(
+                    or_(versions.c.song_id.in_(chunk), versions.c.related_song_id.in_(chunk))
+                ))
+                actions = UserAction.__table__
+                for name in ("song_id", "related_song_id"):
+                    session.execute(
+                        actions.update().where(actions.c[name].in_(chunk)).values({name: None})
+                    )
+                session.execute(Song.__table__.delete().where(Song.__table__.c.id.in_(chunk)))
+            session.commit()
+        if ids:
+            self.db.history_revision += 1
+        return ids
+    
+    # ================================
+    # 扫描元数据缓存 (metadata_cache)
+    # ================================
+    
+    def get_cached_metadata(self, content_hashes: Iterable[str]) -> Dict[str, Any]:
+        """按内容指纹批量查询元数据缓存，返回 content_hash -> 行 (file_path, file_size, metadata)"""
+        cache = MetadataCacheEntry.__table__
+        found = {}
+        with self.db.get_read_session() as session:
+            for chunk in _chunked(set(content_hashes), _IN_CHUNK_SIZE):
+                rows = session.execute(
+                    select(cache.c.content_hash, cache.c.file_path, cache.c.file_size, cache.c.metadata)
+                    .where(cache.c.content_hash.in_(chunk))
+                )
+                found.update((row.content_hash, row) for row in rows)
+        return found
+    
+    def get_cached_paths(self, path_prefix: Optional[str] = None) -> set:
+        """元数据缓存中已记录的文件路径"""
+        cache = MetadataCacheEntry.__table__
+        statement = select(cache.c.file_path)
+        if path_prefix:
+            statement = statement.where(cache.c.file_path.startswith(path_prefix, autoescape=True))
+        with self.db.get_read_session() as session:
+            return set(session.execute(statement).scalars())
+    
+    def cache_metadata(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """
+        写入元数据缓存：INSERT ... ON CONFLICT(content_hash) DO UPDATE
+        
+        每条包含 content_hash, file_path, file_size, metadata；同一内容以最后写入的路径为准。
+        """
+        now = datetime.utcnow()
+        rows = {entry["content_hash"]: dict(entry, updated_at=now) for entry in entries}
+        if not rows:
+            return
+        cache = MetadataCacheEntry.__table__
+        statement = sqlite_insert(cache)
+        statement = statement.on_conflict_do_update(
+            index_elements=[cache.c.content_hash],
+            set_={name: statement.excluded[name] for name in ("file_path", "file_size", "metadata", "updated_at")},
+        )
+        with self.db.get_session() as session:
+            session.execute(statement, list(rows.values()))
+            session.commit()
+    
+    def cache_song_metadata(self, hashes_by_path: Dict[str, str]) -> None:
+        """
+        用已入库歌曲的元数据回填缓存（不打开音频文件）
+        
+        升级后第一次扫描时，未变化的文件还没有缓存记录；回填之后它们被移动或改名也能直接识别。
+        """
+        if not hashes_by_path:
+            return
+        fields = ", ".join(f"'{key}', {name}" for key, name in CACHED_METADATA_COLUMNS.items())
+        statement = text(
+            "INSERT INTO metadata_cache (content_hash, file_path, file_size, metadata, updated_at) "
+            f"SELECT :content_hash, file_path, file_size, json_object({fields}), :now "
+            "FROM songs WHERE file_path = :file_path "
+            "ON CONFLICT(content_hash) DO NOTHING"
+        )
+        now = datetime.utcnow()
+        params = [
+            {"content_hash": content_hash, "file_path": file_path, "now": now}
+            for file_path, content_hash in hashes_by_path.items()
+        ]
+        with self.db.get_session() as session:
+            session.execute(statement, params)
+            session.commit()
+    
+    def relocate_songs(self, moves: Iterable[Tuple[str, str, int, Optional[datetime]]]) -> List[int]:
+        """
+        文件移动/改名：只更新路径和文件信息，歌曲 id、播放记录、标签等保持不变；
+        元数据缓存中的路径一并更新
+        
+        Args:
+            moves: (原路径, 新路径, 文件大小, 修改时间)
+            
+        Returns:
+            被更新的歌曲 id 列表
+        """
+        songs = Song.__table__
+        cache = MetadataCacheEntry.__table__
+        now = datetime.utcnow()
+        ids = []
+        with self.db.get_session() as session:
+            for old_path, new_path, file_size, modified_at in moves:
+                session.execute(
+                    cache.update().where(cache.c.file_path == old_path).values(file_path=new_path)
+                )
+                song_id = session.execute(
+                    songs.update()
+                    .where(songs.c.file_path == old_path)
+                    .values(file_path=new_path, file_size=file_size,
+                            file_modified_at=modified_at, updated_at=now)
+                    .returning(songs.c.id)
+                ).scalar()
+                if song_id is not None:
+                    ids.append(song_id)
+            session.commit()
+        return ids
+    
+    def iter_songs(self, order_by: str = "added_at", descending: bool = False,
+                   after_key: Optional[Tuple[Any, int]] = None,
+                   page_size: int = 500) -> Iterator[Any]:
+        """
+        流式遍历歌曲 - keyset 分页
+        
+        每页用 WHERE (order_by, id) > after_key 在索引上定位，而不是 OFFSET，
+        翻到多深的位置开销都一样。每页一个短会话，遍历期间不长期占用读事务。
+        
+        Args:
+            order_by: 排序列，可选 SONG_ROW_ORDER_KEYS 中的列
+            descending: 是否倒序（如最新添加的在前）
+            after_key: 从该键之后开始，取自上一行的 song_row_key(row, order_by)
+            page_size: 每次查询的行数
+            
+        Yields:
+            轻量的行元组，字段见 SONG_ROW_COLUMNS
+        """
+        if order_by not in SONG_ROW_ORDER_KEYS:
+            raise ValueError(f"不支持的排序列: {order_by}，可选 {SONG_ROW_ORDER_KEYS}")
+        
+        sort_column = getattr(Song, order_by)
+        keyset = tuple_(sort_column, Song.id)
+        base = select(*(getattr(Song, name) for name in SONG_ROW_COLUMNS))
+        if descending:
+            base = base.order_by(sort_column.desc(), Song.id.desc())
+        else:
+            base = base.order_by(sort_column, Song.id)
+        
+        while True:
+            statement = base
+            if after_key is not None:
+                after = tuple_(*after_key)
+                statement = statement.where(keyset < after if descending else keyset > after)
+            with self.db.get_read_session() as session:
+                rows = session.exec(statement.limit(page_size)).all()
+            
+            yield from rows
+            if len(rows) < page_size:
+                return
+            after_key = song_row_key(rows[-1], order_by)
+    
+    def get_all_songs(self, limit: int = 1000, offset: int = 0) -> List[SongPublic]:
+        """获取所有歌曲（大曲库请用 iter_songs 流式读取）"""
+        with self.db.get_read_session() as session:
+            return _rows_to_public(session.exec(
+                _select_songs().order_by(Song.added_at.desc()).limit(limit).offset(offset)
+            ))
     
     def get_song_by_id(self, song_id: int) -> Optional[SongPublic]:
         """根据ID获取歌曲"""
-        with self.db.get_session() as session:
-            song = session.get(Song, song_id)
-            return self._song_to_public(song, session) if song else None
+        with self.db.get_read_session() as session:
+            songs = _rows_to_public(session.exec(_select_songs().where(Song.id == song_id)))
+            return songs[0] if songs else None
     
     def get_song_by_path(self, file_path: str) -> Optional[SongPublic]:
         """根据文件路径获取歌曲"""
-        with self.db.get_session() as session:
-            song = session.exec(select(Song).where(Song.file_path == file_path)).first()
-            return self._song_to_public(song, session) if song else None
+        with self.db.get_read_session() as session:
+            songs = _rows_to_public(session.exec(_select_songs().where(Song.file_path == file_path)))
+            return songs[0] if songs else None
     
     def update_song(self, song_id: int, song_data: SongUpdate) -> Optional[SongPublic]:
         """更新歌曲信息"""
@@ -219,17 +888,25 @@ class SongService:
     
     def search_songs(self, query: SearchQuery) -> List[SongPublic]:
         """搜索歌曲"""
-        with self.db.get_session() as session:
+        with self.db.get_read_session() as session:
             # 基础查询
-            statement = select(Song)
+            statement = _select_songs()
+            
+            order_by = [Song.title]
             
             # 文本搜索
-            if query.text.strip():
-                text_filter = or_(
-                    Song.title.contains(query.text),
-                    Song.artist.contains(query.text),
-                    Song.album.contains(query.text)
+            text = query.text.strip()
+            if len(text) >= FTS_MIN_QUERY_LENGTH:
+                # FTS5 索引查询，ranked 模式按 bm25 相关度排序
+                statement = statement.join(_songs_fts, _songs_fts.c.rowid == Song.id).where(
+                    _songs_fts_ref.op("MATCH")(_fts_phrase(text))
                 )
+                if query.ranked:
+                    order_by = [func.bm25(_songs_fts_ref, *FTS_WEIGHTS), Song.title]
+            elif text:
+                text_filter = or_(*(
+                    getattr(Song, name).contains(text, autoescape=True) for name in FTS_COLUMNS
+                ))
                 statement = statement.where(text_filter)
             
             # 应用筛选器
@@ -237,20 +914,75 @@ class SongService:
                 statement = self._apply_filters(statement, query.filters)
             
             # 排序和分页
-            statement = statement.order_by(Song.title).limit(query.limit).offset(query.offset)
+            statement = statement.order_by(*order_by).limit(query.limit).offset(query.offset)
             
-            songs = session.exec(statement).all()
-            return [self._song_to_public(song, session) for song in songs]
+            return _rows_to_public(session.exec(statement))
     
     def get_songs_by_filter(self, filters: SongFilter) -> List[SongPublic]:
         """根据筛选条件获取歌曲"""
-        with self.db.get_session() as session:
-            statement = select(Song)
+        with self.db.get_read_session() as session:
+            statement = _select_songs()
             statement = self._apply_filters(statement, filters)
             statement = statement.order_by(Song.title)
             
-            songs = session.exec(statement).all()
-            return [self._song_to_public(song, session) for song in songs]
+            return _rows_to_public(session.exec(statement))
+    
+    def filter_songs(self, filters: SongFilter, with_facets: bool = True) -> SongFilterResult:
+        """
+        根据筛选条件获取歌曲，并在同一个读事务中统计命中集合的分面计数
+        
+        Args:
+            filters: 筛选条件
+            with_facets: 是否统计 FACET_COUNT_KINDS 各维度的命中数
+        """
+        with self.db.get_read_session() as session:
+            statement = self._apply_filters(_select_songs(), filters).order_by(Song.title)
+            songs = _rows_to_public(session.exec(statement))
+            
+            facet_counts = {}
+            if with_facets:
+                matched = self._apply_filters(select(Song.id), filters).cte("matched")
+                for facet, value, count in session.exec(_facet_count_statement(matched)):
+                    facet_counts.setdefault(facet, {})[value] = count
+            
+            return SongFilterResult(songs=songs, total=len(songs), facet_counts=facet_counts)
+    
+    def iter_facet_rows(self, song_ids: Optional[Iterable[int]] = None
+                        ) -> Iterator[Tuple[str, Optional[str], int, Optional[float]]]:
+        """
+        遍历歌曲的筛选维度，供内存位图索引使用
+        
+        Args:
+            song_ids: 只返回这些歌曲的维度（增量更新索引时使用），为空时返回所有歌曲
+        
+        Yields:
+            (facet, value, song_id, score)：year/rating 的数值放在 score 中，
+            favorite 只返回已收藏的歌曲
+        """
+        # (子查询, 歌曲 id 列)
+        queries = [
+            (select(literal(FacetKind.LANGUAGE.value), Song.detected_language, Song.id, null())
+             .where(Song.detected_language.is_not(None)), Song.id),
+            (select(SongFacet.facet, SongFacet.value, SongFacet.song_id, SongFacet.score),
+             SongFacet.song_id),
+            (select(literal(FacetKind.TAG.value), Tag.name, SongTagLink.song_id, null())
+             .join(Tag, Tag.id == SongTagLink.tag_id), SongTagLink.song_id),
+            (select(literal(FacetKind.YEAR.value), null(), Song.id, Song.year)
+             .where(Song.year.is_not(None)), Song.id),
+            (select(literal(FacetKind.RATING.value), null(), Song.id, Song.user_rating)
+             .where(Song.user_rating.is_not(None)), Song.id),
+            (select(literal(FacetKind.FAVORITE.value), null(), Song.id, null())
+             .where(Song.favorite == True), Song.id),
+        ]
+        with self.db.get_read_session() as session:
+            if song_ids is None:
+                yield from session.exec(union_all(*(query for query, _ in queries)))
+                return
+            # 每个子查询各带一份 id 参数
+            for chunk in _chunked(set(song_ids), _IN_CHUNK_SIZE // len(queries)):
+                yield from session.exec(union_all(*(
+                    query.where(id_column.in_(chunk)) for query, id_column in queries
+                )))
     
     def update_play_stats(self, song_id: int, play_duration: float = 0.0, 
                          completion_rate: float = 0.0) -> bool:
@@ -290,54 +1022,86 @@ class SongService:
             return song.favorite
     
     def get_library_stats(self) -> LibraryStats:
-        """获取音乐库统计信息"""
-        with self.db.get_session() as session:
+        """获取音乐库统计信息
+        
+        汇总数据由触发器维护在 library_stats / library_counters 中，这里只读不扫表；
+        最常播放和最近添加走 play_count / added_at 索引。
+        """
+        with self.db.get_read_session() as session:
             # 基础统计
-            total_songs = session.exec(select(func.count(Song.id))).first()
-            total_artists = session.exec(select(func.count(func.distinct(Song.artist)))).first()
-            total_albums = session.exec(select(func.count(func.distinct(Song.album)))).first()
-            total_duration = session.exec(select(func.sum(Song.duration))).first() or 0.0
-            favorite_count = session.exec(select(func.count(Song.id)).where(Song.favorite == True)).first()
+            summary = session.get(LibrarySummary, 1) or LibrarySummary()
             
             # 最常播放的歌曲
-            most_played = session.exec(
-                select(Song).order_by(Song.play_count.desc()).limit(1)
-            ).first()
+            most_played = _rows_to_public(session.exec(
+                _select_songs().order_by(Song.play_count.desc()).limit(1)
+            ))
             
             # 语言分布
-            language_dist = {}
-            lang_stats = session.exec(
-                select(Song.detected_language, func.count(Song.id))
-                .group_by(Song.detected_language)
-            ).all()
-            for lang, count in lang_stats:
-                if lang:
-                    language_dist[lang] = count
+            language_dist = dict(session.exec(
+                select(LibraryCounter.key, LibraryCounter.song_count)
+                .where(LibraryCounter.kind == "language")
+            ).all())
             
             # 最近添加的歌曲
-            recent_songs = session.exec(
-                select(Song).order_by(Song.added_at.desc()).limit(5)
-            ).all()
+            recent_songs = _rows_to_public(session.exec(
+                _select_songs().order_by(Song.added_at.desc()).limit(5)
+            ))
             
             return LibraryStats(
-                total_songs=total_songs or 0,
-                total_artists=total_artists or 0,
-                total_albums=total_albums or 0,
-                total_duration=total_duration,
-                favorite_count=favorite_count or 0,
-                most_played_song=self._song_to_public(most_played, session) if most_played else None,
+                total_songs=summary.total_songs,
+                total_artists=summary.total_artists,
+                total_albums=summary.total_albums,
+                total_duration=summary.total_duration,
+                favorite_count=summary.favorite_count,
+                most_played_song=most_played[0] if most_played else None,
                 language_distribution=language_dist,
-                recent_additions=[self._song_to_public(song, session) for song in recent_songs]
+                recent_additions=recent_songs
             )
     
     def _apply_filters(self, statement, filters: SongFilter):
-        """应用筛选条件到查询语句"""
+        """
+        应用筛选条件到查询语句
+        
+        每个字段是一个条件（列表内任一值命中即可），字段之间按 logic_operator 组合。
+        JSON 标签和用户标签走 song_facets / song_tags 上的索引，不解析 JSON。
+        """
         conditions = []
         
         # 语言筛选
         if filters.languages:
             conditions.append(Song.detected_language.in_(filters.languages))
         
+        # 情感筛选：任一情感强度达到阈值
+        if filters.emotions:
+            conditions.append(Song.id.in_(
+                select(SongFacet.song_id).where(
+                    SongFacet.facet == FacetKind.EMOTION.value,
+                    or_(*(
+                        and_(SongFacet.value == emotion, SongFacet.score >= threshold)
+                        for emotion, threshold in filters.emotions.items()
+                    ))
+                )
+            ))
+        
+        # 主题 / 年代 / 风格
+        for facet, values in ((FacetKind.THEME, filters.themes),
+                              (FacetKind.ERA, filters.eras),
+                              (FacetKind.STYLE, filters.styles)):
+            if values:
+                conditions.append(Song.id.in_(
+                    select(SongFacet.song_id).where(
+                        SongFacet.facet == facet.value, SongFacet.value.in_(values)
+                    )
+                ))
+        
+        # 用户标签
+        if filters.tags:
+            conditions.append(Song.id.in_(
+                select(SongTagLink.song_id)
+                .join(Tag, Tag.id == SongTagLink.tag_id)
+                .where(Tag.name.in_(filters.tags))
+            ))
+        
         # 收藏筛选
         if filters.favorite_only:
             conditions.append(Song.favorite == True)
@@ -362,7 +1126,10 @@ class SongService:
         return statement
     
     def _song_to_public(self, song: Song, session: Session) -> SongPublic:
-        """将数据库模型转换为公开模型"""
+        """将数据库模型转换为公开模型
+        
+        会懒加载 song.tags，只用于单个 ORM 对象；列表查询请使用 _select_songs() 投影。
+        """
         if not song:
             return None
             
@@ -394,6 +1161,7 @@ class SongService:
             favorite=song.favorite,
             last_played=song.last_played,
             added_at=song.added_at,
+            artwork_hash=song.artwork_hash,
             tags=tag_names
         )
 
@@ -405,7 +1173,7 @@ class TagService:
     
     def get_all_tags(self, category: Optional[TagCategory] = None) -> List[TagPublic]:
         """获取所有标签"""
-        with self.db.get_session() as session:
+        with self.db.get_read_session() as session:
             statement = select(Tag).order_by(Tag.name)
             
             if category:
@@ -426,7 +1194,7 @@ class TagService:
     
     def get_tags_by_category(self, category: TagCategory) -> List[TagPublic]:
         """根据类别获取标签"""
-        with self.db.get_session() as session:
+        with self.db.get_read_session() as session:
             tags = session.exec(
                 select(Tag).where(Tag.category == category).order_by(Tag.name)
             ).all()
@@ -435,11 +1203,21 @@ class TagService:
 class UserActionService:
     """用户行为记录服务层"""
     
-    def __init__(self):
+    def __init__(self, recorder=None):
+        """
+        Args:
+            recorder: 可选的 UserActionRecorder；设置后 record_* 只把记录交给它异步写入，
+                立即返回 None，适合在 UI 线程调用
+        """
         self.db = DatabaseManager()
+        self.recorder = recorder
     
-    def record_action(self, action_data: UserActionCreate) -> UserActionPublic:
-        """记录用户行为"""
+    def record_action(self, action_data: UserActionCreate) -> Optional[UserActionPublic]:
+        """记录用户行为（使用 recorder 时异步写入，返回 None）"""
+        if self.recorder is not None:
+            self.recorder.record(action_data)
+            return None
+        
         with self.db.get_session() as session:
             action = UserAction.model_validate(action_data)
             session.add(action)
@@ -451,8 +1229,8 @@ class UserActionService:
     def record_play_start(self, song_id: int, session_id: str, 
                          playlist_id: Optional[int] = None,
                          play_source: PlaySource = PlaySource.LIBRARY,
-                         trigger: ActionTrigger = ActionTrigger.MANUAL) -> UserActionPublic:
-        """记录播放开始"""
+                         trigger: ActionTrigger = ActionTrigger.MANUAL) -> Optional[UserActionPublic]:
+        """记录播放开始（使用 recorder 时异步写入，返回 None）"""
         action_data = UserActionCreate(
             action_type=UserActionType.PLAY_START,
             song_id=song_id,
@@ -468,8 +1246,8 @@ class UserActionService:
                            play_duration: float, completion_rate: float = 1.0,
                            playlist_id: Optional[int] = None,
                            play_source: PlaySource = PlaySource.LIBRARY,
-                           trigger: ActionTrigger = ActionTrigger.AUTOMATIC) -> UserActionPublic:
-        """记录完整播放"""
+                           trigger: ActionTrigger = ActionTrigger.AUTOMATIC) -> Optional[UserActionPublic]:
+        """记录完整播放（使用 recorder 时异步写入，返回 None）"""
         action_data = UserActionCreate(
             action_type=UserActionType.PLAY_COMPLETE,
             song_id=song_id,
@@ -487,8 +1265,8 @@ class UserActionService:
                             completion_rate: float,
                             playlist_id: Optional[int] = None,
                             play_source: PlaySource = PlaySource.LIBRARY,
-                            trigger: ActionTrigger = ActionTrigger.MANUAL) -> UserActionPublic:
-        """记录播放中断"""
+                            trigger: ActionTrigger = ActionTrigger.MANUAL) -> Optional[UserActionPublic]:
+        """记录播放中断（使用 recorder 时异步写入，返回 None）"""
         action_data = UserActionCreate(
             action_type=UserActionType.PLAY_INTERRUPT,
             song_id=song_id,
@@ -506,8 +1284,8 @@ class UserActionService:
                           session_id: str, from_position: float,
                           playlist_id: Optional[int] = None,
                           play_source: PlaySource = PlaySource.LIBRARY,
-                          trigger: ActionTrigger = ActionTrigger.MANUAL) -> UserActionPublic:
-        """记录歌曲切换"""
+                          trigger: ActionTrigger = ActionTrigger.MANUAL) -> Optional[UserActionPublic]:
+        """记录歌曲切换（使用 recorder 时异步写入，返回 None）"""
         action_data = UserActionCreate(
             action_type=UserActionType.SONG_SWITCH,
             song_id=from_song_id,
@@ -523,8 +1301,8 @@ class UserActionService:
     def record_seek_operation(self, song_id: int, session_id: str,
                             from_position: float, to_position: float,
                             playlist_id: Optional[int] = None,
-                            play_source: PlaySource = PlaySource.LIBRARY) -> UserActionPublic:
-        """记录拖拽跳转操作"""
+                            play_source: PlaySource = PlaySource.LIBRARY) -> Optional[UserActionPublic]:
+        """记录拖拽跳转操作（使用 recorder 时异步写入，返回 None）"""
         action_data = UserActionCreate(
             action_type=UserActionType.SEEK_OPERATION,
             song_id=song_id,
@@ -540,15 +1318,16 @@ class UserActionService:
     def record_play_pause(self, song_id: int, session_id: str,
                          from_position: float,
                          playlist_id: Optional[int] = None,
-                         play_source: PlaySource = PlaySource.LIBRARY) -> UserActionPublic:
-        """记录暂停操作"""
+                         play_source: PlaySource = PlaySource.LIBRARY,
+                         trigger: ActionTrigger = ActionTrigger.MANUAL) -> Optional[UserActionPublic]:
+        """记录暂停操作（使用 recorder 时异步写入，返回 None）"""
         action_data = UserActionCreate(
             action_type=UserActionType.PLAY_PAUSE,
             song_id=song_id,
             session_id=session_id,
             playlist_id=playlist_id,
             play_source=play_source,
-            trigger=ActionTrigger.MANUAL,
+            trigger=trigger,
             from_position=from_position
         )
         return self.record_action(action_data)
@@ -556,15 +1335,16 @@ class UserActionService:
     def record_play_resume(self, song_id: int, session_id: str,
                           from_position: float,
                           playlist_id: Optional[int] = None,
-                          play_source: PlaySource = PlaySource.LIBRARY) -> UserActionPublic:
-        """记录恢复播放"""
+                          play_source: PlaySource = PlaySource.LIBRARY,
+                          trigger: ActionTrigger = ActionTrigger.MANUAL) -> Optional[UserActionPublic]:
+        """记录恢复播放（使用 recorder 时异步写入，返回 None）"""
         action_data = UserActionCreate(
             action_type=UserActionType.PLAY_RESUME,
             song_id=song_id,
             session_id=session_id,
             playlist_id=playlist_id,
             play_source=play_source,
-            trigger=ActionTrigger.MANUAL,
+            trigger=trigger,
             from_position=from_position
         )
         return self.record_action(action_data)
@@ -573,8 +1353,13 @@ class UserActionService:
                         session_id: Optional[str] = None,
                         action_type: Optional[UserActionType] = None,
                         limit: int = 100, offset: int = 0) -> List[UserActionPublic]:
-        """获取用户行为记录"""
-        with self.db.get_session() as session:
+        """
+        获取用户行为记录
+
+        只查询 SQLite 中的记录。HistoryArchive.compact 归档过的旧记录已从表中删除，
+        不会出现在结果里；需要完整历史时用 HistoryArchive.load("user_actions")
+        """
+        with self.db.get_read_session() as session:
             statement = select(UserAction).order_by(UserAction.timestamp.desc())
             
             if song_id:
@@ -51,6 +51,18 @@ class ActionTrigger(str, Enum):
     MANUAL = "manual"       # 用户手动操作
     AUTOMATIC = "automatic" # 系统自动操作
 
+class FacetKind(str, Enum):
+    """筛选维度"""
+    LANGUAGE = "language"   # songs.detected_language
+    EMOTION = "emotion"     # songs.emotions 的键，带强度分数
+    THEME = "theme"         # songs.themes
+    ERA = "era"             # songs.era_tags
+    STYLE = "style"         # songs.style_tags
+    TAG = "tag"             # song_tags 关联的标签名
+    YEAR = "year"
+    RATING = "rating"
+    FAVORITE = "favorite"
+
 # ================================
 # 关联表模型 (多对多关系)
 # ================================
@@ -61,6 +73,27 @@ class SongTagLink(SQLModel, table=True):
     
     song_id: Optional[int] = Field(default=None, foreign_key="songs.id", primary_key=True)
     tag_id: Optional[int] = Field(default=None, foreign_key="tags.id", primary_key=True)
+    
+    __table_args__ = (
+        Index('idx_song_tags_tag', 'tag_id', 'song_id'),  # 按标签反查歌曲
+    )
+
+class SongFacet(SQLModel, table=True):
+    """歌曲 JSON 标签的规范化副表 - 由 songs 表上的触发器维护，不要直接写入
+    
+    emotions/themes/era_tags/style_tags 每个值一行，主键 (facet, value, song_id)
+    即倒排索引，按标签值筛选不需要逐行解析 JSON。
+    """
+    __tablename__ = "song_facets"
+    
+    facet: str = Field(primary_key=True, max_length=20)  # FacetKind 的值
+    value: str = Field(primary_key=True, max_length=100)
+    song_id: int = Field(foreign_key="songs.id", primary_key=True)
+    score: Optional[float] = Field(default=None)  # 情感强度，其它维度为空
+    
+    __table_args__ = (
+        Index('idx_song_facet_song', 'song_id'),
+    )
 
 class PlaylistSongLink(SQLModel, table=True):
     """播放列表-歌曲关联表"""
@@ -97,16 +130,17 @@ class SongBase(SQLModel):
     # 智能标签 ⭐ 核心功能
     detected_language: Optional[str] = Field(default=None, max_length=10)  # zh-CN, zh-HK, ja, en
     language_confidence: float = Field(default=0.0, ge=0.0, le=1.0)
-    emotions: Optional[Dict[str, float]] = Field(default=None, sa_column=Column(JSON))
-    themes: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
-    era_tags: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
-    style_tags: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
+    emotions: Optional[Dict[str, float]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
+    themes: Optional[List[str]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
+    era_tags: Optional[List[str]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
+    style_tags: Optional[List[str]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
 
 class SongCreate(SongBase):
     """创建歌曲时的数据模型"""
     file_path: str = Field(unique=True, max_length=1000)
     file_size: int = Field(default=0, ge=0)
     file_modified_at: Optional[datetime] = Field(default=None)
+    artwork_hash: Optional[str] = Field(default=None, max_length=64)
 
 class SongUpdate(SongBase):
     """更新歌曲时的数据模型 - 所有字段可选"""
@@ -126,6 +160,7 @@ class Song(SongBase, table=True):
     file_path: str = Field(unique=True, max_length=1000, index=True)
     file_size: int = Field(default=0, ge=0)
     file_modified_at: Optional[datetime] = Field(default=None)
+    artwork_hash: Optional[str] = Field(default=None, max_length=64)  # 封面缩略图缓存键，见 data/artwork.py
     
     # 用户数据
     play_count: int = Field(default=0, ge=0)
@@ -152,6 +187,8 @@ class Song(SongBase, table=True):
         Index('idx_song_search', 'title', 'artist', 'album'),
         Index('idx_song_language', 'detected_language'),
         Index('idx_song_favorite', 'favorite'),
+        Index('idx_song_added_at', 'added_at'),  # iter_songs 按添加时间分页
+        Index('idx_song_play_count', 'play_count'),  # 最常播放
     )
 
 class SongPublic(SongBase):
@@ -162,6 +199,7 @@ class SongPublic(SongBase):
     favorite: bool = False
     last_played: Optional[datetime] = None
     added_at: datetime
+    artwork_hash: Optional[str] = None
     tags: List[str] = []  # 标签名称列表
 
 # ================================
@@ -208,7 +246,7 @@ class PlaylistBase(SQLModel):
     name: str = Field(max_length=200, index=True)
     description: Optional[str] = Field(default=None, max_length=1000)
     is_smart: bool = Field(default=False)
-    smart_criteria: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    smart_criteria: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
 
 class PlaylistCreate(PlaylistBase):
     """创建播放列表数据模型"""
@@ -362,7 +400,7 @@ class UserActionBase(SQLModel):
     play_source: Optional[PlaySource] = Field(default=PlaySource.LIBRARY)
     
     # 元数据 (重命名避免与SQLModel父类冲突)
-    extra_data: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    extra_data: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON(none_as_null=True)))
     notes: Optional[str] = Field(default=None, max_length=500)
 
 class UserActionCreate(UserActionBase):
@@ -421,17 +459,65 @@ class SongFilter(SQLModel):
     year_end: Optional[int] = Field(default=None, ge=1900, le=2100)
     logic_operator: str = Field(default="AND", regex=r"^(AND|OR)$")
 
+class SongFilterResult(SQLModel):
+    """筛选结果及同一次查询得到的分面计数"""
+    songs: List[SongPublic] = []
+    total: int = 0
+    facet_counts: Dict[str, Dict[str, int]] = {}  # 维度 -> 值 -> 命中歌曲数
+
 class SearchQuery(SQLModel):
     """搜索查询模型"""
     text: str = Field(max_length=200)
     filters: Optional[SongFilter] = Field(default=None)
+    ranked: bool = Field(default=False)  # 按 bm25 相关度排序，否则按标题
     limit: int = Field(default=50, ge=1, le=1000)
     offset: int = Field(default=0, ge=0)
 
+# ================================
+# 扫描缓存模型
+# ================================
+
+class MetadataCacheEntry(SQLModel, table=True):
+    """按文件内容指纹缓存提取出的元数据 - 文件移动/改名后无需重新解析"""
+    __tablename__ = "metadata_cache"
+
+    content_hash: str = Field(primary_key=True, max_length=64)  # 见 scanner.file_content_hash
+    file_path: str = Field(max_length=1000, index=True)  # 最后一次见到该内容的路径
+    file_size: int = Field(default=0, ge=0)
+    metadata_: Dict[str, Any] = Field(default_factory=dict, sa_column=Column("metadata", JSON))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ArchiveWatermark(SQLModel, table=True):
+    """播放数据归档水位 - 每次 compact 在删除已归档行的同一事务中递增 sequence，见 data/analytics.py"""
+    __tablename__ = "archive_watermarks"
+
+    table_name: str = Field(primary_key=True, max_length=50)
+    sequence: int = Field(default=0)  # 已提交的归档批次序号
+    archived_id: int = Field(default=0)  # 已归档的最大 id
+
 # ================================
 # 统计模型
 # ================================
 
+class LibrarySummary(SQLModel, table=True):
+    """音乐库汇总 - 单行表，由 songs 表上的触发器增量维护，不要直接写入"""
+    __tablename__ = "library_stats"
+    
+    id: int = Field(default=1, primary_key=True)
+    total_songs: int = Field(default=0)
+    total_artists: int = Field(default=0)
+    total_albums: int = Field(default=0)
+    total_duration: float = Field(default=0.0)
+    favorite_count: int = Field(default=0)
+
+class LibraryCounter(SQLModel, table=True):
+    """按艺术家/专辑/语言分组的歌曲数 - 由触发器维护，计数归零的行会被删除"""
+    __tablename__ = "library_counters"
+    
+    kind: str = Field(primary_key=True, max_length=20)  # artist | album | language
+    key: str = Field(primary_key=True, max_length=500)
+    song_count: int = Field(default=0)
+
 class LibraryStats(SQLModel):
     """音乐库统计数据"""
     total_songs: int = 0
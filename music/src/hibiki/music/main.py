@@ -9,12 +9,15 @@
 - 专业音乐应用级别的用户体验
 """
 
-from hibiki.ui import ManagerFactory
+from hibiki.ui import ManagerFactory, run_on_ui_thread
 from hibiki.music.core.app_state import MusicAppState
-from hibiki.music.core.scanner import scan_music_library
-from hibiki.music.data.database import SongService
+from hibiki.music.core.facet_index import FacetBitmapIndex
+from hibiki.music.core.scanner import MusicLibraryScanner, scan_music_library
+from hibiki.music.data.database import SongService, song_row_key
 from hibiki.music.ui.simple_modern_window import SimpleModernWindow
 from pathlib import Path
+import itertools
+import threading
 from typing import List, Optional
 
 class HibikiMusicApp:
@@ -29,6 +32,17 @@ class HibikiMusicApp:
     - 响应式状态管理
     """
     
+    # 首屏同步加载的歌曲数，其余的按页在后台加载
+    FIRST_SCREEN_SIZE = 200
+    STREAM_PAGE_SIZE = 1000
+    
+    # 设为天数后，启动时把更早的播放记录归档为列式文件并从 SQLite 删除；
+    # 归档后的记录只能通过 HistoryArchive 读取，默认不归档
+    HISTORY_ARCHIVE_KEEP_DAYS: Optional[int] = None
+    
+    # 音乐目录（使用绝对路径，避免不同启动方式的路径问题）
+    MUSIC_DIR = Path("/Users/david/david/app/hibiki-ui/music/data")
+    
     def __init__(self):
         from hibiki.music.core.logging import get_logger
         self.logger = get_logger("main")
@@ -43,52 +57,47 @@ class HibikiMusicApp:
         
         # 现代化主窗口
         self.main_window = None
+        
+        # 首屏之后待后台加载的分页键
+        self._pending_stream_key = None
+        # 首屏已加载的歌曲 id，后台扫描据此区分新增和更新
+        self._first_screen_ids = set()
+        
+        # 音乐目录监听器
+        self._watcher = None
+        # 后台线程最近构建的标签位图索引；跨线程写入状态要排队，增量更新不能读 state 中的旧值
+        self._facet_index = None
+        self._facet_lock = threading.Lock()
     
     def _load_music_library(self):
-        """加载音乐库"""
+        """加载音乐库：只从数据库读取首屏，目录扫描和其余歌曲都在后台进行"""
         self.logger.info("🔍 加载音乐库...")
         
-        # 使用绝对路径，避免不同启动方式的路径问题
-        data_dir = Path("/Users/david/david/app/hibiki-ui/music/data")
-        
-        # 首次扫描 - 如果data目录存在就扫描
-        if data_dir.exists():
-            self.logger.info(f"📁 扫描目录: {data_dir}")
-            try:
-                scan_music_library(str(data_dir))
-                self.logger.info("✅ 音乐库扫描完成")
-            except Exception as e:
-                self.logger.warning(f"⚠️ 扫描失败: {e}")
-        
-        # 从数据库加载所有歌曲
+        # 从数据库加载第一屏歌曲，其余的在后台流式加载
         try:
             song_service = SongService()
-            db_songs = song_service.get_all_songs()
+            rows = song_service.iter_songs(
+                order_by="added_at", descending=True, page_size=self.FIRST_SCREEN_SIZE
+            )
+            first_rows = list(itertools.islice(rows, self.FIRST_SCREEN_SIZE))
+            app_songs = [self._to_app_song(row) for row in first_rows]
             
-            if db_songs:
-                # 转换为应用状态使用的Song对象
-                from hibiki.music.core.app_state import Song
-                app_songs = [
-                    Song(
-                        id=str(song.id),
-                        title=song.title,
-                        artist=song.artist,
-                        album=song.album,
-                        duration=song.duration,
-                        file_path=song.file_path
-                    )
-                    for song in db_songs
-                ]
-                
+            if app_songs:
                 self.state.add_songs(app_songs)
                 self.state.set_playlist(app_songs)
-                self.logger.info(f"✅ 从数据库加载了 {len(app_songs)} 首歌曲")
+                self._first_screen_ids = {row.id for row in first_rows}
+                self.logger.info(f"✅ 从数据库加载了首屏 {len(app_songs)} 首歌曲")
+                
+                if len(app_songs) == self.FIRST_SCREEN_SIZE:
+                    self._pending_stream_key = song_row_key(first_rows[-1], "added_at")
                 
                 # 设置当前播放歌曲用于演示
                 if app_songs:
                     self.logger.info(f"🎵 设置当前播放: {app_songs[0].title}")
                     self.state.current_song.value = app_songs[0]
                     
+            elif self.MUSIC_DIR.exists():
+                self.logger.info("📋 数据库中暂无歌曲，等待后台扫描音乐目录")
             else:
                 self.logger.info("📋 数据库中暂无歌曲")
                 self._add_fallback_songs()
@@ -97,6 +106,120 @@ class HibikiMusicApp:
             self.logger.error(f"❌ 加载音乐库失败: {e}")
             self._add_fallback_songs()
     
+    @staticmethod
+    def _to_app_song(row):
+        """把 iter_songs 的行元组转换为应用状态使用的Song对象"""
+        from hibiki.music.core.app_state import Song
+        return Song(
+            id=str(row.id),
+            title=row.title,
+            artist=row.artist,
+            album=row.album,
+            duration=row.duration,
+            file_path=row.file_path,
+            artwork_hash=row.artwork_hash
+        )
+    
+    def _start_library_stream(self):
+        """
+        后台线程继续读取首屏之后的歌曲，分批追加到音乐库；随后增量扫描音乐目录，
+        扫描结果经 apply_library_changes 推送到音乐库；最后读取统计、构建标签位图索引，
+        并在启用了 HISTORY_ARCHIVE_KEEP_DAYS 时归档旧播放记录
+        """
+        after_key = self._pending_stream_key
+        self._pending_stream_key = None
+        loaded_ids = self._first_screen_ids
+        self._first_screen_ids = set()
+        
+        def stream():
+            if after_key is not None:
+                loaded_ids.update(self._stream_remaining_songs(after_key))
+            self._scan_music_dir(loaded_ids)
+            # 与追加操作按顺序在主线程执行；播放列表是音乐库的快照，不共用 ListSignal 的内部列表
+            run_on_ui_thread(lambda: self.state.set_playlist(list(self.state.all_songs.value)))
+            try:
+                song_service = SongService()
+                self.state.set_library_stats(song_service.get_library_stats())
+                with self._facet_lock:
+                    self._facet_index = FacetBitmapIndex.load(song_service)
+                    self.state.set_facet_index(self._facet_index)
+            except Exception as e:
+                self.logger.error(f"❌ 构建标签索引失败: {e}")
+            if self.HISTORY_ARCHIVE_KEEP_DAYS is not None:
+                try:
+                    # 把过期的播放记录归档为列式文件，保持 SQLite 表精简
+                    from hibiki.music.data.analytics import HistoryArchive
+                    HistoryArchive().compact(keep_days=self.HISTORY_ARCHIVE_KEEP_DAYS)
+                except Exception as e:
+                    self.logger.error(f"❌ 归档播放记录失败: {e}")
+        
+        threading.Thread(target=stream, name="hibiki-library-stream", daemon=True).start()
+    
+    def _stream_remaining_songs(self, after_key) -> set:
+        """按页读取 after_key 之后的歌曲并追加到音乐库，返回追加的歌曲 id"""
+        loaded_ids = set()
+        try:
+            rows = SongService().iter_songs(
+                order_by="added_at", descending=True,
+                after_key=after_key, page_size=self.STREAM_PAGE_SIZE
+            )
+            loaded = 0
+            while True:
+                page = list(itertools.islice(rows, self.STREAM_PAGE_SIZE))
+                if not page:
+                    break
+                # ListSignal 的跨线程写入会被转交到主线程执行
+                self.state.add_songs([self._to_app_song(row) for row in page])
+                loaded_ids.update(row.id for row in page)
+                loaded += len(page)
+            self.logger.info(f"✅ 后台加载完成，追加了 {loaded} 首歌曲")
+        except Exception as e:
+            self.logger.error(f"❌ 后台加载音乐库失败: {e}")
+        return loaded_ids
+    
+    def _scan_music_dir(self, loaded_ids: set):
+        """（后台线程）增量扫描音乐目录，导入或更新的歌曲按是否已在音乐库中分为新增/更新推送"""
+        if not self.MUSIC_DIR.exists():
+            return
+        self.logger.info(f"📁 扫描目录: {self.MUSIC_DIR}")
+        try:
+            song_ids = scan_music_library(str(self.MUSIC_DIR))
+            rows = SongService().get_song_rows(song_ids)
+            self.state.apply_library_changes(
+                added=[self._to_app_song(row) for row in rows if row.id not in loaded_ids],
+                updated=[self._to_app_song(row) for row in rows if row.id in loaded_ids],
+            )
+            self.logger.info(f"✅ 音乐库扫描完成，导入或更新 {len(rows)} 首歌曲")
+        except Exception as e:
+            self.logger.warning(f"⚠️ 扫描失败: {e}")
+    
+    def _start_library_watch(self):
+        """监听音乐目录，文件的新增/修改/移动/删除增量同步到数据库和音乐库"""
+        if not self.MUSIC_DIR.exists():
+            return
+        try:
+            self._watcher = MusicLibraryScanner().watch(str(self.MUSIC_DIR), self._on_library_changed)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 目录监听启动失败: {e}")
+    
+    def _on_library_changed(self, delta):
+        """目录监听回调（监听线程）：推送变更到音乐库，再刷新统计并增量更新标签索引"""
+        self.state.apply_library_changes(
+            added=[self._to_app_song(row) for row in delta.added],
+            updated=[self._to_app_song(row) for row in delta.updated],
+            removed_ids=[str(song_id) for song_id in delta.removed],
+        )
+        try:
+            song_service = SongService()
+            self.state.set_library_stats(song_service.get_library_stats())
+            with self._facet_lock:
+                # 首次构建前的变更已写入数据库，之后的 load 会包含它们
+                if self._facet_index is not None:
+                    self._facet_index = self._facet_index.apply(delta, song_service)
+                    self.state.set_facet_index(self._facet_index)
+        except Exception as e:
+            self.logger.error(f"❌ 刷新音乐库统计失败: {e}")
+    
     def _add_fallback_songs(self):
         """添加备用测试歌曲"""
         from hibiki.music.core.app_state import Song
@@ -146,6 +269,10 @@ class HibikiMusicApp:
             # 创建应用管理器
             self.app_manager = ManagerFactory.get_app_manager()
             
+            # 主线程调度器已就绪，开始后台流式加载剩余歌曲，并监听目录变化
+            self._start_library_stream()
+            self._start_library_watch()
+            
             # 创建主窗口
             self.window = self.app_manager.create_window(
                 title="🎵 Hibiki Music v0.4 - 现代化音乐播放器",
@@ -5,7 +5,6 @@
 基于 Hibiki UI 框架的音乐播放器专用组件
 """
 
-import os
 from typing import Optional, Callable, List
 from hibiki.ui import (
     UIComponent,
@@ -22,11 +21,28 @@ from hibiki.ui import (
 )
 from AppKit import NSView, NSMakeRect, NSColor, NSFont
 from Foundation import NSMakePoint
+from ..core.artwork_loader import ArtworkLoader
 from ..core.logging import get_logger
 
 logger = get_logger("ui.components")
 logger.setLevel("INFO")  # INFO level
 
+_artwork_loader: Optional[ArtworkLoader] = None
+
+
+def _decode_nsimage(path: str):
+    """后台线程中把缩略图文件解码为 NSImage"""
+    from AppKit import NSImage
+    return NSImage.alloc().initWithContentsOfFile_(path)
+
+
+def get_artwork_loader() -> ArtworkLoader:
+    """所有封面视图共用的加载器（共享已解码图片的 LRU）"""
+    global _artwork_loader
+    if _artwork_loader is None:
+        _artwork_loader = ArtworkLoader(_decode_nsimage)
+    return _artwork_loader
+
 
 class MusicProgressBar(UIComponent):
     """
@@ -137,19 +153,27 @@ class AlbumArtView(UIComponent):
     - 加载占位图
     - 淡入动画
     - 点击放大
+    - 只加载与显示尺寸匹配的缩略图，解码在后台线程进行
     """
 
     def __init__(
         self,
-        image_path: Signal[Optional[str]],
+        image_path: Optional[Signal[Optional[str]]] = None,
         size: int = 200,
         corner_radius: float = 12.0,
         on_click: Optional[Callable] = None,
         style: Optional[ComponentStyle] = None,
+        artwork_hash: Optional[Signal[Optional[str]]] = None,
     ):
+        """
+        Args:
+            image_path: 图片文件路径（如目录中的 cover.jpg）
+            artwork_hash: 扫描时提取的内嵌封面缓存键（Song.artwork_hash），优先于 image_path
+        """
         super().__init__(style or ComponentStyle(width=px(size), height=px(size)))
 
         self.image_path = image_path
+        self.artwork_hash = artwork_hash
         self.size = size
         self.corner_radius = corner_radius
         self.on_click = on_click
@@ -157,6 +181,9 @@ class AlbumArtView(UIComponent):
         # 图片加载状态
         self.is_loading = Signal(False)
         self.loaded_image = Signal(None)
+        # 后台解码结果 (请求键, 图片)，由 UI 线程上的 Effect 核对后再显示
+        self._arrived = Signal(None)
+        self._requested = None
 
     def _create_nsview(self):
         """创建专辑封面视图"""
@@ -196,27 +223,50 @@ class AlbumArtView(UIComponent):
             style=self.style, on_draw=draw_album_art, on_mouse_up=on_click_handler
         )
 
-        # 监听图片路径变化
+        # 监听封面变化：缓存命中直接显示，否则交给后台线程解码
         def load_image():
-            path = self.image_path.value
-            if path and os.path.exists(path):
-                try:
-                    self.is_loading.value = True
-                    # 使用 NSImage 加载图片
-                    from AppKit import NSImage
-                    ns_image = NSImage.alloc().initWithContentsOfFile_(path)
-                    if ns_image:
-                        self.loaded_image.value = ns_image
-                        logger.info(f"✅ 成功加载图片: {path}")
-                    else:
-                        logger.warning(f"⚠️ 图片加载失败: {path}")
-                except Exception as e:
-                    logger.error(f"❌ 图片加载错误: {path} - {e}")
-                finally:
-                    self.is_loading.value = False
-
+            art_hash = self.artwork_hash.value if self.artwork_hash is not None else None
+            path = self.image_path.value if self.image_path is not None else None
+            key = art_hash or path
+            self._requested = key
+            if not key:
+                self.loaded_image.value = None
+                self.is_loading.value = False
+                return
+
+            def on_decoded(image, key=key):
+                self._arrived.value = (key, image)  # 跨线程写入，由 Signal 转交到 UI 线程
+
+            loader = get_artwork_loader()
+            pixel_size = self.size * 2  # Retina
+            if art_hash:
+                image = loader.request(art_hash, pixel_size, on_decoded)
+            else:
+                image = loader.request_file(path, pixel_size, on_decoded)
+            if image is not None:
+                self.loaded_image.value = image
+                self.is_loading.value = False
+            else:
+                self.is_loading.value = True
+
+        def show_decoded():
+            arrived = self._arrived.value
+            if arrived is None:
+                return
+            key, image = arrived
+            if key != self._requested:
+                return  # 快速切换时过期的解码结果直接丢弃
+            if image is None:
+                logger.warning(f"⚠️ 封面加载失败: {key}")
+            self.loaded_image.value = image
+            self.is_loading.value = False
+
+        # 在挂载作用域内创建，AlbumArtView.cleanup 时自动释放
         Effect(load_image)
+        Effect(show_decoded)
         custom_view.setup_auto_redraw(self.loaded_image, self.is_loading)
+        # 内部 CustomView 的重绘 Effect 随本组件一起清理
+        self.add_child(custom_view)
 
         return custom_view.mount()
 
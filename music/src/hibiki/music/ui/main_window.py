@@ -247,13 +247,25 @@ class MusicMainWindow:
             font_size=14
         )
         
+        def library_summary() -> str:
+            stats = self.app_state.library_stats.value
+            if stats is None:
+                return "🎤 艺术家: - | 💿 专辑: - | ❤️ 收藏: -"
+            return f"🎤 艺术家: {stats.total_artists} | 💿 专辑: {stats.total_albums} | ❤️ 收藏: {stats.favorite_count}"
+        
+        library_stat = Label(
+            library_summary,
+            style=ComponentStyle(margin_bottom=px(5)),
+            font_size=14
+        )
+        
         playing_status = Label(
             lambda: f"🎵 状态: {'播放中' if self.app_state.is_playing.value else '已暂停'}",
             font_size=14
         )
         
         return Container(
-            children=[total_songs_stat, total_duration_stat, playing_status],
+            children=[total_songs_stat, total_duration_stat, library_stat, playing_status],
             style=ComponentStyle(
                 padding=px(15),
                 background_color="#e9ecef",
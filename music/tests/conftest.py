@@ -0,0 +1,81 @@
+"""
+Pytest Configuration and Fixtures
+=================================
+
+Shared fixtures for the Hibiki Music tests.
+"""
+
+import pytest
+import sys
+import os
+
+# Add the music/src directory to the path so we can import hibiki.music
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from sqlalchemy import event
+
+from hibiki.music.data.database import DatabaseManager, SongService
+
+
+@pytest.fixture
+def song_service(tmp_path, monkeypatch):
+    """SongService backed by a fresh SQLite database under a temporary HOME."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(DatabaseManager, "_instance", None)
+    service = SongService()
+    yield service
+    service.db.dispose()
+
+
+@pytest.fixture
+def write_wav():
+    """Write a short silent mono WAV with an ID3 title; `frames` varies the content and its fingerprint."""
+    import wave
+    
+    from mutagen.id3 import TIT2
+    from mutagen.wave import WAVE
+    
+    def write(path, frames=8000):
+        with wave.open(str(path), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(b"\x00\x00" * frames)
+        audio = WAVE(str(path))
+        audio.add_tags()
+        audio.tags.add(TIT2(encoding=3, text=[path.stem]))
+        audio.save()
+        return path
+    
+    return write
+
+
+@pytest.fixture
+def count_queries(song_service):
+    """Count the SQL statements executed on the service's read and write engines.
+    
+    Usage::
+    
+        with count_queries() as queries:
+            ...
+        assert len(queries) == 2
+    """
+    from contextlib import contextmanager
+    
+    @contextmanager
+    def counter():
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        engines = (song_service.db._engine, song_service.db._read_engine)
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", record)
+    
+    return counter
@@ -0,0 +1,55 @@
+"""
+Tests for the Music App State
+=============================
+
+Library changes from background threads must land on the right rows.
+"""
+
+import threading
+
+import pytest
+
+from hibiki.ui.core.reactive import drain_pending_writes
+from hibiki.music.core.app_state import MusicAppState, Song
+
+
+def _song(song_id, title="Song"):
+    return Song(id=song_id, title=title, artist="Artist")
+
+
+@pytest.fixture
+def state():
+    state = MusicAppState()
+    state.add_songs([_song(str(i)) for i in range(4)])
+    return state
+
+
+def _run_in_thread(fn):
+    thread = threading.Thread(target=fn)
+    thread.start()
+    thread.join()
+
+
+class TestApplyLibraryChanges:
+    """Test that watcher deltas resolve song ids to positions on the UI thread."""
+
+    def test_positions_resolved_after_earlier_queued_writes(self, state):
+        """Test that an undrained removal ahead of the delta does not shift its targets."""
+        def worker():
+            state.all_songs.splice(0, 1)
+            state.apply_library_changes(
+                added=[_song("4")], updated=[_song("3", "Updated")], removed_ids=["2"]
+            )
+
+        _run_in_thread(worker)
+        assert [song.id for song in state.all_songs.value] == ["0", "1", "2", "3"]
+
+        drain_pending_writes()
+        assert [(song.id, song.title) for song in state.all_songs.value] == [
+            ("1", "Song"), ("3", "Updated"), ("4", "Song")
+        ]
+
+    def test_applies_immediately_on_ui_thread(self, state):
+        """Test that calls from the UI thread are not deferred."""
+        state.apply_library_changes(removed_ids=["0", "3"])
+        assert [song.id for song in state.all_songs.value] == ["1", "2"]
@@ -0,0 +1,119 @@
+"""
+Tests for the Artwork Loader
+============================
+
+Off-thread thumbnail decoding behind an LRU.
+"""
+
+import io
+import threading
+
+import pytest
+from PIL import Image
+
+from hibiki.music.core.artwork_loader import ArtworkLoader
+from hibiki.music.data.artwork import THUMBNAIL_SIZES, ArtworkCache
+
+
+class RecordingDecoder:
+    """Decoder stand-in that records which files were decoded and on which thread."""
+
+    def __init__(self):
+        self.paths = []
+        self.threads = set()
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, path):
+        self.release.wait(5)
+        self.paths.append(path)
+        self.threads.add(threading.current_thread().name)
+        return ("image", path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArtworkCache(tmp_path / "artwork")
+
+
+def _store_albums(cache, count):
+    hashes = []
+    for i in range(count):
+        buffer = io.BytesIO()
+        Image.new("RGB", (700, 700), (i % 256, i // 256, 0)).save(buffer, "JPEG")
+        hashes.append(cache.store(buffer.getvalue()))
+    return hashes
+
+
+def _request_and_wait(loader, art_hash, size):
+    done = threading.Event()
+    result = []
+    image = loader.request(art_hash, size, lambda image: (result.append(image), done.set()))
+    if image is not None:
+        return image
+    assert done.wait(5)
+    return result[0]
+
+
+class TestArtworkLoader:
+    """Test the decoded-image cache in front of the thumbnail cache."""
+
+    def test_decodes_off_the_calling_thread_and_caches(self, cache):
+        """Test that the first request decodes in a worker and the second is a synchronous hit."""
+        decoder = RecordingDecoder()
+        loader = ArtworkLoader(decoder, cache)
+        (art_hash,) = _store_albums(cache, 1)
+
+        image = _request_and_wait(loader, art_hash, 200)
+        again = loader.request(art_hash, 180, lambda image: pytest.fail("cache hit should not call back"))
+
+        assert again == image
+        assert all(name.startswith("hibiki-artwork") for name in decoder.threads)
+        assert decoder.paths == [str(cache.path_for(art_hash, 256))]
+
+    def test_concurrent_requests_decode_once(self, cache):
+        """Test that requests for an in-flight thumbnail share the decode."""
+        decoder = RecordingDecoder()
+        decoder.release.clear()
+        loader = ArtworkLoader(decoder, cache)
+        (art_hash,) = _store_albums(cache, 1)
+        results = []
+        done = threading.Event()
+
+        def callback(image):
+            results.append(image)
+            if len(results) == 3:
+                done.set()
+
+        for _ in range(3):
+            assert loader.request(art_hash, 100, callback) is None
+        decoder.release.set()
+
+        assert done.wait(5)
+        assert len(decoder.paths) == 1
+
+    def test_grid_scroll_never_decodes_full_size_images(self, cache):
+        """Test that scrolling many albums only touches small thumbnails and stays within the LRU bound."""
+        decoder = RecordingDecoder()
+        loader = ArtworkLoader(decoder, cache, capacity=50)
+        hashes = _store_albums(cache, 120)
+
+        for art_hash in hashes:
+            _request_and_wait(loader, art_hash, 96)
+
+        assert all(path.endswith(f"-{THUMBNAIL_SIZES[0]}.jpg") for path in decoder.paths)
+        assert len(loader._images) == 50
+
+    def test_image_file_is_thumbnailed_before_decoding(self, cache, tmp_path):
+        """Test that request_file hands the decoder a thumbnail, not the original file."""
+        decoder = RecordingDecoder()
+        loader = ArtworkLoader(decoder, cache)
+        cover = tmp_path / "cover.jpg"
+        Image.new("RGB", (2000, 2000), "white").save(cover, "JPEG")
+        done = threading.Event()
+
+        loader.request_file(str(cover), 500, lambda image: done.set())
+
+        assert done.wait(5)
+        assert decoder.paths[0].startswith(str(cache.root))
+        assert decoder.paths[0].endswith("-512.jpg")
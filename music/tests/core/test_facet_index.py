@@ -0,0 +1,102 @@
+"""
+Tests for the Facet Bitmap Index
+================================
+
+The in-memory bitmap index must agree with the SQL filter engine.
+"""
+
+import pytest
+
+from hibiki.music.core.facet_index import FacetBitmapIndex
+from hibiki.music.core.scanner import LibraryDelta
+from hibiki.music.data.models import Song, SongCreate, SongFilter, Tag
+
+
+@pytest.fixture
+def library(song_service):
+    """Forty songs spread over every facet, plus one user tag."""
+    ids = song_service.bulk_upsert_songs(
+        SongCreate(
+            title=f"Song {i}",
+            artist="Artist",
+            file_path=f"/library/{i}.flac",
+            detected_language=["ja", "en", "zh-HK"][i % 3],
+            emotions={"happy": (i % 10) / 10} if i % 4 else None,
+            themes=["love"] if i % 2 else ["road", "night"],
+            style_tags=["jazz"] if i % 5 == 0 else None,
+            year=1990 + i % 20,
+        )
+        for i in range(40)
+    )
+    with song_service.db.get_session() as session:
+        tag = Tag(name="收藏夹")
+        session.add(tag)
+        for song_id in ids[::7]:
+            song = session.get(Song, song_id)
+            song.tags.append(tag)
+            song.favorite = song_id % 2 == 0
+            song.user_rating = 8
+        session.commit()
+    return song_service
+
+
+FILTERS = [
+    SongFilter(),
+    SongFilter(languages=["ja", "en"]),
+    SongFilter(emotions={"happy": 0.5}, themes=["road"]),
+    SongFilter(styles=["jazz"], tags=["收藏夹"], logic_operator="OR"),
+    SongFilter(year_start=1995, year_end=2000, languages=["zh-HK"]),
+    SongFilter(year_start=2005, year_end=1992, logic_operator="OR"),
+    SongFilter(favorite_only=True, min_rating=5),
+    SongFilter(themes=["unknown"]),
+]
+
+
+class TestFacetBitmapIndex:
+    """Test that bitmap evaluation matches SongService.filter_songs."""
+    
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_matches_sql(self, library, filters):
+        """Test ids and facet counts against the SQL engine."""
+        index = FacetBitmapIndex.load(library)
+        expected = library.filter_songs(filters)
+        
+        bitmap = index.match(filters)
+        
+        assert index.ids(bitmap) == sorted(song.id for song in expected.songs)
+        assert index.count(bitmap) == expected.total
+        assert index.facet_counts(bitmap) == expected.facet_counts
+    
+    @pytest.mark.parametrize("filters", FILTERS)
+    def test_apply_matches_rebuild(self, library, filters, monkeypatch):
+        """Test that applying a delta gives the same answers as reloading the whole index."""
+        index = FacetBitmapIndex.load(library)
+        index.match(SongFilter(emotions={"happy": 0.5}))  # 填充阈值缓存
+        updated = library.bulk_upsert_songs([
+            SongCreate(title="Song 1", artist="Artist", file_path="/library/1.flac",
+                       detected_language="zh-HK", emotions={"happy": 0.9}, themes=["road"], year=1996),
+            SongCreate(title="Song 4", artist="Artist", file_path="/library/4.flac"),
+        ])
+        added = library.bulk_upsert_songs([
+            SongCreate(title="New", artist="Artist", file_path="/library/new.flac",
+                       detected_language="ja", style_tags=["jazz"], year=2004),
+        ])
+        removed = library.delete_songs_by_path(["/library/0.flac", "/library/5.flac"])
+        delta = LibraryDelta(
+            added=library.get_song_rows(added), updated=library.get_song_rows(updated), removed=removed
+        )
+        iter_facet_rows = library.iter_facet_rows
+        
+        def only_changed(song_ids=None):
+            assert sorted(song_ids) == sorted(added + updated)
+            return iter_facet_rows(song_ids)
+        monkeypatch.setattr(library, "iter_facet_rows", only_changed)
+        
+        applied = index.apply(delta, library)
+        monkeypatch.undo()
+        
+        rebuilt = FacetBitmapIndex.load(library)
+        bitmap = applied.match(filters)
+        assert bitmap == rebuilt.match(filters)
+        assert applied.facet_counts(bitmap) == rebuilt.facet_counts(bitmap)
+        assert set(removed) <= set(index.ids(index.match(SongFilter())))  # 原索引不变
@@ -0,0 +1,174 @@
+"""
+Tests for the Library Watcher
+=============================
+
+Watch mode: event coalescing, minimal DB deltas, and end-to-end sync.
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("watchdog")
+from watchdog.events import DirCreatedEvent, FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent
+
+from hibiki.music.core.library_watcher import LibraryWatcher
+from hibiki.music.core.scanner import MusicLibraryScanner
+
+
+@pytest.fixture
+def scanner(song_service):
+    return MusicLibraryScanner()
+
+
+@pytest.fixture
+def library_dir(tmp_path, write_wav, scanner):
+    music = tmp_path / "music"
+    music.mkdir()
+    for i in range(3):
+        write_wav(music / f"track{i}.wav", 8000 + i * 100)
+    scanner.scan_directory(str(music), max_workers=1)
+    return music
+
+
+@pytest.fixture
+def watcher(scanner, library_dir):
+    """A watcher that is fed events by hand and flushed explicitly."""
+    deltas = []
+    watcher = LibraryWatcher(scanner, str(library_dir), deltas.append)
+    watcher.deltas = deltas
+    return watcher
+
+
+class TestApplyChanges:
+    """Test that filesystem changes become minimal DB deltas."""
+
+    def test_new_album_is_added_without_rescan(self, scanner, library_dir, write_wav, monkeypatch):
+        """Test that only the new files are looked at."""
+        album = library_dir / "album"
+        album.mkdir()
+        paths = [str(write_wav(album / f"{i:02d}.wav", 9000 + i)) for i in range(4)]
+        monkeypatch.setattr(scanner, "_find_audio_files", None)  # no directory walk
+
+        delta = scanner.apply_changes(upserts=paths)
+
+        assert sorted(row.file_path for row in delta.added) == paths
+        assert delta.updated == [] and delta.removed == []
+
+    def test_move_keeps_song_id(self, scanner, library_dir, song_service):
+        """Test that a move updates the existing row."""
+        original = song_service.get_song_by_path(str(library_dir / "track0.wav"))
+        dest = library_dir / "renamed.wav"
+        (library_dir / "track0.wav").rename(dest)
+
+        delta = scanner.apply_changes(moves={str(dest): str(library_dir / "track0.wav")})
+
+        assert [(row.id, row.file_path) for row in delta.updated] == [(original.id, str(dest))]
+        assert delta.added == [] and delta.removed == []
+
+    def test_delete_removes_song_and_its_history(self, scanner, library_dir, song_service):
+        """Test that deleted files drop their rows, including play history."""
+        from hibiki.music.data.models import PlayHistory
+        song = song_service.get_song_by_path(str(library_dir / "track1.wav"))
+        with song_service.db.get_session() as session:
+            session.add(PlayHistory(song_id=song.id))
+            session.commit()
+        (library_dir / "track1.wav").unlink()
+
+        delta = scanner.apply_changes(deletes=[str(library_dir / "track1.wav")])
+
+        assert delta.removed == [song.id]
+        assert song_service.get_song_by_id(song.id) is None
+
+    def test_deleted_directory_removes_everything_under_it(self, scanner, library_dir, write_wav):
+        """Test that a directory delete drops every song under the prefix."""
+        album = library_dir / "album"
+        album.mkdir()
+        paths = [str(write_wav(album / f"{i}.wav", 9000 + i)) for i in range(2)]
+        scanner.apply_changes(upserts=paths)
+        for path in paths:
+            (album / path.rsplit("/", 1)[1]).unlink()
+        album.rmdir()
+
+        delta = scanner.apply_changes(deleted_dirs=[str(album)])
+
+        assert len(delta.removed) == 2
+
+
+class TestEventCoalescing:
+    """Test that raw events are merged per path before touching the DB."""
+
+    def test_repeated_modifications_are_applied_once(self, watcher, library_dir, write_wav):
+        """Test that create + modify + modify becomes one upsert."""
+        path = str(write_wav(library_dir / "new.wav", 12345))
+        for event in (FileCreatedEvent(path), FileModifiedEvent(path), FileModifiedEvent(path)):
+            watcher._on_event(event)
+
+        watcher.flush()
+
+        assert len(watcher.deltas) == 1
+        assert [row.file_path for row in watcher.deltas[0].added] == [path]
+
+    def test_move_chain_collapses(self, watcher, library_dir, song_service):
+        """Test that a -> b -> c is applied as a single a -> c relocation."""
+        a, b, c = (str(library_dir / name) for name in ("track2.wav", "b.wav", "c.wav"))
+        original = song_service.get_song_by_path(a)
+        (library_dir / "track2.wav").rename(c)
+        watcher._on_event(FileMovedEvent(a, b))
+        watcher._on_event(FileMovedEvent(b, c))
+
+        watcher.flush()
+
+        assert [(row.id, row.file_path) for row in watcher.deltas[0].updated] == [(original.id, c)]
+
+    def test_non_audio_files_are_ignored(self, watcher, library_dir):
+        """Test that cover art and temp files do not trigger a sync."""
+        watcher._on_event(FileCreatedEvent(str(library_dir / "cover.jpg")))
+        watcher._on_event(FileDeletedEvent(str(library_dir / "notes.txt")))
+
+        watcher.flush()
+
+        assert watcher.deltas == []
+
+    def test_new_directory_picks_up_existing_files(self, watcher, library_dir, write_wav):
+        """Test that files written before the directory event arrived are still imported."""
+        album = library_dir / "album"
+        album.mkdir()
+        write_wav(album / "01.wav", 7777)
+        watcher._on_event(DirCreatedEvent(str(album)))
+
+        watcher.flush()
+
+        assert [row.file_path for row in watcher.deltas[0].added] == [str(album / "01.wav")]
+
+
+class TestWatchMode:
+    """End-to-end: real observer, debounce, callback."""
+
+    @pytest.mark.parametrize("polling", [False, True])
+    def test_album_copy_reaches_callback(self, scanner, library_dir, write_wav, polling):
+        """Test that adding an album is synced without a rescan."""
+        received = []
+        done = threading.Event()
+
+        def on_change(delta):
+            received.extend(delta.added)
+            if len(received) >= 3:
+                done.set()
+
+        watcher = scanner.watch(str(library_dir), on_change, debounce=0.1, polling=polling)
+        try:
+            album = library_dir / "album"
+            album.mkdir()
+            started = time.monotonic()
+            for i in range(3):
+                write_wav(album / f"{i:02d}.wav", 5000 + i)
+            assert done.wait(10)
+            elapsed = time.monotonic() - started
+        finally:
+            watcher.stop()
+
+        assert sorted(row.file_path for row in received) == [str(album / f"{i:02d}.wav") for i in range(3)]
+        if not polling:
+            assert elapsed < 1.0
@@ -0,0 +1,155 @@
+"""
+Tests for the Music Library Scanner
+===================================
+
+Incremental scanning with the content-fingerprint metadata cache.
+"""
+
+import shutil
+
+import pytest
+
+from hibiki.music.core.scanner import MusicLibraryScanner, file_content_hash
+
+
+@pytest.fixture
+def library_dir(tmp_path, write_wav):
+    music = tmp_path / "music"
+    music.mkdir()
+    for i in range(3):
+        write_wav(music / f"track{i}.wav", 8000 + i * 100)
+    return music
+
+
+@pytest.fixture
+def scanner(song_service):
+    return MusicLibraryScanner()
+
+
+def _forbid_extraction(monkeypatch):
+    def fail(cls, file_path):
+        raise AssertionError(f"metadata extracted for {file_path}")
+    monkeypatch.setattr(MusicLibraryScanner, "_extract_metadata", classmethod(fail))
+
+
+class TestFileContentHash:
+    """Test the size + head/tail fingerprint."""
+
+    def test_same_content_same_hash_regardless_of_path(self, tmp_path, write_wav):
+        """Test that copies share a fingerprint and different content does not."""
+        write_wav(tmp_path / "a.wav", 50000)
+        shutil.copy(tmp_path / "a.wav", tmp_path / "b.wav")
+        write_wav(tmp_path / "c.wav", 50001)
+        size = (tmp_path / "a.wav").stat().st_size
+
+        assert file_content_hash(str(tmp_path / "a.wav"), size) == file_content_hash(str(tmp_path / "b.wav"), size)
+        assert file_content_hash(str(tmp_path / "a.wav"), size) != file_content_hash(
+            str(tmp_path / "c.wav"), (tmp_path / "c.wav").stat().st_size
+        )
+
+
+class TestIncrementalScan:
+    """Test that rescans only touch files whose size or mtime changed."""
+
+    def test_unchanged_files_are_skipped(self, scanner, library_dir, song_service, monkeypatch):
+        """Test that a rescan of an untouched library extracts and writes nothing."""
+        first = scanner.scan_directory(str(library_dir), max_workers=1)
+        assert len(first) == 3
+
+        written = []
+
+        def record(self, songs, batch_size=1000):
+            written.extend(songs)
+            return []
+
+        _forbid_extraction(monkeypatch)
+        monkeypatch.setattr(type(song_service), "bulk_upsert_songs", record)
+        assert scanner.scan_directory(str(library_dir), max_workers=1) == []
+        assert written == []
+        assert scanner.last_stats.found == 3
+        assert scanner.last_stats.unchanged == 3
+
+    def test_modified_file_is_reimported(self, scanner, library_dir, song_service, write_wav):
+        """Test that only the changed file is re-read and keeps its song id."""
+        scanner.scan_directory(str(library_dir), max_workers=1)
+        original = song_service.get_song_by_path(str(library_dir / "track1.wav"))
+
+        write_wav(library_dir / "track1.wav", 20000)
+        ids = scanner.scan_directory(str(library_dir), max_workers=1)
+
+        assert ids == [original.id]
+        assert scanner.last_stats.unchanged == 2
+        path = str(library_dir / "track1.wav")
+        file_size, _ = song_service.get_file_fingerprints(paths=[path])[path]
+        assert file_size == (library_dir / "track1.wav").stat().st_size
+
+
+class TestMetadataCache:
+    """Test move/rename detection and duplicate reporting."""
+
+    def test_rename_updates_path_without_reading_tags(self, scanner, library_dir, song_service, monkeypatch):
+        """Test that a renamed file keeps its song id and is not re-parsed."""
+        scanner.scan_directory(str(library_dir), max_workers=1)
+        original = song_service.get_song_by_path(str(library_dir / "track0.wav"))
+
+        subdir = library_dir / "moved"
+        subdir.mkdir()
+        (library_dir / "track0.wav").rename(subdir / "renamed.wav")
+        _forbid_extraction(monkeypatch)
+        ids = scanner.scan_directory(str(library_dir), max_workers=1)
+
+        moved = song_service.get_song_by_path(str(subdir / "renamed.wav"))
+        assert ids == [original.id]
+        assert moved.id == original.id
+        assert moved.title == "track0"
+        assert song_service.get_song_by_path(str(library_dir / "track0.wav")) is None
+        assert scanner.last_stats.moved == 1
+
+    def test_copy_is_reported_as_duplicate_and_uses_cache(self, scanner, library_dir, song_service, monkeypatch):
+        """Test that a copied file is imported from the cache and reported as a duplicate."""
+        scanner.scan_directory(str(library_dir), max_workers=1)
+
+        shutil.copy(library_dir / "track1.wav", library_dir / "copy.wav")
+        _forbid_extraction(monkeypatch)
+        ids = scanner.scan_directory(str(library_dir), max_workers=1)
+
+        assert len(ids) == 1
+        assert scanner.last_stats.cached == 1
+        assert scanner.last_stats.duplicates == 1
+        assert list(scanner.last_duplicates.values()) == [
+            sorted([str(library_dir / "copy.wav"), str(library_dir / "track1.wav")])
+        ]
+
+    def test_cache_is_backfilled_for_songs_scanned_before_upgrade(self, scanner, library_dir, song_service, monkeypatch):
+        """Test that unchanged songs without cache rows are fingerprinted so later moves are detected."""
+        scanner.scan_directory(str(library_dir), max_workers=1)
+        with song_service.db.get_session() as session:
+            session.connection().exec_driver_sql("DELETE FROM metadata_cache")
+            session.commit()
+
+        assert scanner.scan_directory(str(library_dir), max_workers=1) == []
+        (library_dir / "track2.wav").rename(library_dir / "renamed.wav")
+        _forbid_extraction(monkeypatch)
+        scanner.scan_directory(str(library_dir), max_workers=1)
+
+        assert scanner.last_stats.moved == 1
+
+    def test_copy_from_sibling_directory_is_not_a_move(self, scanner, tmp_path, song_service, write_wav,
+                                                       monkeypatch):
+        """Test that a directory's prefix does not match a sibling sharing its name prefix."""
+        library = tmp_path / "music"
+        sibling = tmp_path / "music2"
+        library.mkdir()
+        sibling.mkdir()
+        write_wav(sibling / "song.wav")
+        scanner.scan_directory(str(sibling), max_workers=1)
+        original = song_service.get_song_by_path(str(sibling / "song.wav"))
+
+        shutil.copy(sibling / "song.wav", library / "song.wav")
+        (sibling / "song.wav").unlink()
+        _forbid_extraction(monkeypatch)
+        scanner.scan_directory(str(library), max_workers=1)
+
+        assert scanner.last_stats.moved == 0
+        assert song_service.get_song_by_path(str(sibling / "song.wav")).id == original.id
+        assert song_service.get_song_by_path(str(library / "song.wav")).id != original.id
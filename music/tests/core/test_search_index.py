@@ -0,0 +1,92 @@
+"""
+Tests for the Song Search Index
+===============================
+
+The incremental index must return exactly what a linear substring filter
+over all_songs returns, in the same order.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from hibiki.ui import ListSignal
+from hibiki.music.core.search_index import SongSearchIndex, normalize_text
+
+
+QUERIES = ["", "周", "杰伦", "晴天", "ＡＢＣ", "abc", "song 1", "Song 12", "love", "no match here"]
+
+
+def _song(i, title=None):
+    return SimpleNamespace(
+        title=title or f"Song {i}",
+        artist=["周杰伦", "ABC Band", "Aimer"][i % 3],
+        album=["晴天", "Love Songs", None][i % 3],
+    )
+
+
+def _linear(songs, query):
+    q = normalize_text(query)
+    return [
+        song for song in songs
+        if any(q in normalize_text(getattr(song, name)) for name in ("title", "artist", "album"))
+    ]
+
+
+@pytest.fixture
+def songs():
+    return ListSignal([_song(i) for i in range(30)])
+
+
+@pytest.fixture
+def index(songs):
+    index = SongSearchIndex()
+    index.sync(songs)
+    return index
+
+
+def _assert_matches_linear(index, songs):
+    index.sync(songs)
+    for query in QUERIES:
+        assert index.search(query) == _linear(songs.value, query), query
+
+
+class TestSongSearchIndex:
+    """Test incremental maintenance against a linear scan."""
+
+    def test_initial_build(self, index, songs):
+        """Test that a fresh index agrees with the linear filter."""
+        _assert_matches_linear(index, songs)
+        assert len(index) == 30
+
+    def test_append_remove_and_replace(self, index, songs, monkeypatch):
+        """Test appends, removals and in-place replacements applied from change records."""
+        monkeypatch.setattr(index, "rebuild", lambda songs: pytest.fail("index rebuilt"))
+        songs.extend([_song(i) for i in range(30, 40)])
+        _assert_matches_linear(index, songs)
+
+        songs.splice(3, 5)
+        songs.pop(0)
+        _assert_matches_linear(index, songs)
+
+        songs.set_item(2, _song(99, title="晴天 (Live)"))
+        songs.insert(0, _song(100, title="abc song"))
+        _assert_matches_linear(index, songs)
+
+    def test_narrowing_query_after_update(self, index, songs):
+        """Test that the narrowing cache is invalidated when the list changes."""
+        assert index.search("Song 1") == _linear(songs.value, "Song 1")
+        songs.append(_song(200, title="Song 1000"))
+        index.sync(songs)
+        assert index.search("Song 10") == _linear(songs.value, "Song 10")
+
+    def test_compaction_after_mass_removal(self, index, songs):
+        """Test that removing most songs still leaves correct results."""
+        songs.splice(0, 25)
+        _assert_matches_linear(index, songs)
+        assert len(index) == 5
+
+    def test_wholesale_replacement_rebuilds(self, index, songs):
+        """Test that assigning a new list rebuilds the index."""
+        songs.value = [_song(i, title=f"Track {i}") for i in range(5)]
+        _assert_matches_linear(index, songs)
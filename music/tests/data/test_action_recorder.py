@@ -0,0 +1,92 @@
+"""
+Tests for the User Action Recorder
+==================================
+
+Recording must never touch SQLite on the caller's thread; the background
+writer persists batches in order and survives rows that cannot be written.
+"""
+
+import pytest
+from sqlmodel import select
+
+from hibiki.music.data.action_recorder import UserActionRecorder
+from hibiki.music.data.database import UserActionService
+from hibiki.music.data.models import (
+    SongCreate, UserAction, UserActionCreate, UserActionType, ActionTrigger
+)
+
+
+@pytest.fixture
+def recorder(song_service):
+    recorder = UserActionRecorder(song_service.db, capacity=100, batch_size=10, flush_interval=60)
+    yield recorder
+    recorder.close()
+
+
+@pytest.fixture
+def song_id(song_service):
+    return song_service.bulk_upsert_songs([SongCreate(title="Song", artist="Artist", file_path="/a.flac")])[0]
+
+
+def _seek(song_id, position):
+    return UserActionCreate(
+        action_type=UserActionType.SEEK_OPERATION, song_id=song_id,
+        from_position=0.0, to_position=position,
+    )
+
+
+def _stored_actions(song_service):
+    with song_service.db.get_session() as session:
+        return session.exec(select(UserAction).order_by(UserAction.id)).all()
+
+
+class TestUserActionRecorder:
+    """Test write-behind recording of user actions."""
+    
+    def test_record_does_not_query(self, song_service, recorder, song_id, count_queries):
+        """Test that recording only buffers; flush writes one batch."""
+        with count_queries() as queries:
+            for position in range(5):
+                recorder.record(_seek(song_id, float(position)))
+        assert queries == []
+        
+        assert recorder.flush(timeout=5)
+        actions = _stored_actions(song_service)
+        assert [action.to_position for action in actions] == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert [action.timestamp for action in actions] == sorted(action.timestamp for action in actions)
+        assert recorder.get_stats()["written"] == 5
+    
+    def test_service_uses_recorder(self, song_service, recorder, song_id):
+        """Test that UserActionService.record_* hand off to the recorder."""
+        service = UserActionService(recorder=recorder)
+        
+        result = service.record_play_pause(song_id, "session", from_position=3.0,
+                                           trigger=ActionTrigger.AUTOMATIC)
+        
+        assert result is None
+        assert recorder.flush(timeout=5)
+        [action] = _stored_actions(song_service)
+        assert action.action_type == UserActionType.PLAY_PAUSE
+        assert action.trigger == ActionTrigger.AUTOMATIC
+    
+    def test_bad_row_does_not_block_batch(self, song_service, recorder, song_id):
+        """Test that a row violating a foreign key is dropped, not retried forever."""
+        recorder.record(_seek(song_id, 1.0))
+        recorder.record(_seek(404, 2.0))
+        recorder.record(_seek(song_id, 3.0))
+        
+        assert recorder.flush(timeout=5)
+        
+        assert [action.to_position for action in _stored_actions(song_service)] == [1.0, 3.0]
+        assert recorder.get_stats()["failed"] == 1
+    
+    def test_overflow_drops_oldest(self, song_service, song_id):
+        """Test that a full buffer discards the oldest records instead of blocking."""
+        recorder = UserActionRecorder(song_service.db, capacity=3, batch_size=100, flush_interval=60)
+        for position in range(5):
+            recorder.record(_seek(song_id, float(position)))
+        
+        recorder.close()
+        
+        assert [action.to_position for action in _stored_actions(song_service)] == [2.0, 3.0, 4.0]
+        assert recorder.get_stats()["dropped"] == 2
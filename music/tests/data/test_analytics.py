@@ -0,0 +1,200 @@
+"""
+Tests for the History Archive
+=============================
+
+Compaction moves old rows into monthly columnar partitions; analytics
+queries see archived and live rows alike.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlmodel import select
+
+from hibiki.music.data import analytics
+from hibiki.music.data.analytics import HistoryArchive
+from hibiki.music.data.models import (
+    PlayHistory, Playlist, PlaySource, SongCreate, UserAction, UserActionType
+)
+
+NOW = datetime(2026, 6, 15, 12, 0)
+
+
+@pytest.fixture(params=["npy", "parquet"])
+def archive(request, song_service, tmp_path, monkeypatch):
+    if request.param == "parquet":
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(analytics, "pq", None)
+    return HistoryArchive(root=tmp_path / "analytics", db=song_service.db)
+
+
+@pytest.fixture
+def plays(song_service):
+    """Ended plays of two songs spread over the last ten months.
+    
+    Song A is completed every time; song B is interrupted at 20% every
+    other time. Every play lasts 60 seconds at 12:00 UTC.
+    """
+    song_a, song_b = song_service.bulk_upsert_songs([
+        SongCreate(title="A", artist="Artist", file_path="/a.flac"),
+        SongCreate(title="B", artist="Artist", file_path="/b.flac"),
+    ])
+    with song_service.db.get_session() as session:
+        for day in range(0, 300, 5):
+            timestamp = NOW - timedelta(days=day)
+            session.add(UserAction(action_type=UserActionType.PLAY_COMPLETE, song_id=song_a,
+                                   timestamp=timestamp, play_duration=60.0, completion_rate=1.0))
+            interrupted = day % 10 == 0
+            session.add(UserAction(
+                action_type=UserActionType.PLAY_INTERRUPT if interrupted else UserActionType.PLAY_COMPLETE,
+                song_id=song_b, timestamp=timestamp, play_duration=60.0,
+                completion_rate=0.2 if interrupted else 1.0,
+            ))
+            session.add(UserAction(action_type=UserActionType.SEEK_OPERATION, song_id=song_b,
+                                   timestamp=timestamp, from_position=1.0, to_position=2.0))
+        session.commit()
+    return song_a, song_b
+
+
+class TestHistoryArchive:
+    """Test compaction into columnar partitions and vectorized queries."""
+    
+    def test_compact_keeps_recent_rows_live(self, archive, plays, song_service):
+        """Test that only rows older than keep_days leave SQLite, partitioned by month."""
+        archived = archive.compact(keep_days=90, now=NOW)
+        
+        with song_service.db.get_session() as session:
+            live = len(session.exec(select(UserAction.id)).all())
+        assert archived["user_actions"] == 180 - live
+        assert live == 19 * 3  # 恰好在截止时刻的记录保留
+        assert len(list((archive.root / "user_actions").iterdir())) >= 6
+        assert archive.compact(keep_days=90, now=NOW)["user_actions"] == 0
+    
+    def test_queries_identical_before_and_after_compaction(self, archive, plays):
+        """Test that archived rows are still visible to every query."""
+        song_a, song_b = plays
+        before = (archive.completion_histogram(), archive.skip_rates(),
+                  archive.listening_time_by_hour(utc_offset=timedelta(hours=8)))
+        
+        archive.compact(keep_days=30, now=NOW)
+        after = (archive.completion_histogram(), archive.skip_rates(),
+                 archive.listening_time_by_hour(utc_offset=timedelta(hours=8)))
+        
+        assert np.array_equal(before[0][0], after[0][0])
+        assert before[1] == after[1] == {song_a: 0.0, song_b: 0.5}
+        assert np.array_equal(before[2], after[2])
+        assert after[2][20] == 120 * 60.0
+        assert after[2].sum() == after[2][20]
+    
+    def test_time_range_and_song_filters(self, archive, plays):
+        """Test since/until filtering across archive and live rows."""
+        song_a, song_b = plays
+        archive.compact(keep_days=30, now=NOW)
+        
+        counts, edges = archive.completion_histogram(
+            bins=5, song_id=song_b, since=NOW - timedelta(days=100), until=NOW
+        )
+        
+        assert edges[0] == 0.0 and edges[-1] == 1.0
+        assert counts.tolist() == [0, 10, 0, 0, 10]
+    
+    def test_interrupted_compaction_recovers(self, archive, plays, monkeypatch):
+        """Test that a crash between writing and deleting does not duplicate rows."""
+        def crash(path):
+            raise RuntimeError("crash")
+        monkeypatch.setattr(HistoryArchive, "_finalize", staticmethod(crash))
+        
+        with pytest.raises(RuntimeError):
+            archive.compact(keep_days=30, now=NOW)
+        monkeypatch.undo()
+        archive.compact(keep_days=30, now=NOW)
+        
+        actions = archive.load("user_actions")
+        assert len(actions["id"]) == len(np.unique(actions["id"])) == 180
+    
+    def test_recovery_ignores_rows_deleted_elsewhere(self, archive, plays, song_service, monkeypatch):
+        """Test that an uncommitted batch is discarded even if its first row was deleted meanwhile."""
+        song_a, song_b = plays
+        with song_service.db.get_session() as session:
+            for day in range(0, 300, 5):
+                for song_id in (song_a, song_b):
+                    session.add(PlayHistory(song_id=song_id, played_at=NOW - timedelta(days=day)))
+            session.commit()
+        write_part = HistoryArchive._write_part
+        
+        def crash_after_write(self, table, *args):
+            path = write_part(self, table, *args)
+            if table.model is PlayHistory:
+                raise RuntimeError("crash")
+            return path
+        monkeypatch.setattr(HistoryArchive, "_write_part", crash_after_write)
+        
+        with pytest.raises(RuntimeError):
+            archive.compact(keep_days=30, now=NOW)
+        monkeypatch.undo()
+        song_service.delete_songs_by_path(["/a.flac"])  # 删除了 .pending 分区的首行
+        archive.compact(keep_days=30, now=NOW)
+        
+        history = archive.load("play_history")
+        assert len(history["id"]) == len(np.unique(history["id"])) == 60
+        assert (history["song_id"] == song_b).all()
+    
+    def test_live_rows_follow_song_deletion(self, archive, plays, song_service):
+        """Test that cached live rows are re-read after songs and their history are deleted."""
+        song_a, song_b = plays
+        archive.compact(keep_days=30, now=NOW)
+        assert archive.skip_rates() == {song_a: 0.0, song_b: 0.5}
+        with song_service.db.get_session() as session:
+            session.add(PlayHistory(song_id=song_b, played_at=NOW))
+            session.commit()
+        assert (archive.load("play_history")["song_id"] == song_b).sum() == 1
+        
+        song_service.delete_songs_by_path(["/b.flac"])
+        
+        live = archive.load("user_actions", since=NOW - timedelta(days=30))
+        assert song_b not in live["song_id"]
+        assert (archive.load("play_history")["song_id"] == song_b).sum() == 0
+    
+    def test_every_column_survives_compaction(self, archive, plays, song_service):
+        """Test that string, JSON and id columns are archived along with the numeric ones."""
+        song_a, _ = plays
+        old = NOW - timedelta(days=200)
+        with song_service.db.get_session() as session:
+            playlist = Playlist(name="Favorites")
+            session.add(playlist)
+            session.flush()
+            session.add(UserAction(
+                action_type=UserActionType.PLAY_START, song_id=song_a, timestamp=old,
+                session_id="session-1", playlist_id=playlist.id, play_source=PlaySource.PLAYLIST,
+                extra_data={"volume": 0.5, "设备": "AirPods"}, notes="备注",
+            ))
+            session.add(PlayHistory(song_id=song_a, played_at=old, playlist_id=playlist.id))
+            session.commit()
+            playlist_id = playlist.id
+        before = {name: archive.load(name) for name in analytics.ARCHIVE_TABLES}
+        
+        archive.compact(keep_days=30, now=NOW)
+        
+        for name, arrays in before.items():
+            after = archive.load(name, include_live=False)
+            assert set(after) == set(analytics.ARCHIVE_TABLES[name].columns)
+            archived = np.isin(arrays["id"], after["id"])
+            expected = np.argsort(arrays["id"][archived])
+            actual = np.argsort(after["id"])
+            for column, values in after.items():
+                np.testing.assert_array_equal(
+                    values[actual], arrays[column][archived][expected], err_msg=f"{name}.{column}"
+                )
+        actions = archive.load("user_actions", include_live=False)
+        row = actions["session_id"] == "session-1"
+        assert actions["notes"][row].tolist() == ["备注"]
+        assert actions["extra_data"][row].tolist() == ['{"volume": 0.5, "设备": "AirPods"}']
+        assert actions["playlist_id"][row].tolist() == [playlist_id]
+        assert archive.load("play_history", include_live=False)["playlist_id"].tolist() == [playlist_id]
+    
+    def test_archive_columns_cover_every_table_column(self):
+        """Test that no table column would be dropped by compaction."""
+        for table in analytics.ARCHIVE_TABLES.values():
+            assert set(table.model.__table__.c.keys()) == set(table.columns), table.name
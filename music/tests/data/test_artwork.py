@@ -0,0 +1,85 @@
+"""
+Tests for the Album Art Cache
+=============================
+
+Embedded artwork extraction and the content-addressed thumbnail cache.
+"""
+
+import io
+
+from mutagen.id3 import APIC
+from mutagen.wave import WAVE
+from PIL import Image
+
+from hibiki.music.core.scanner import MusicLibraryScanner
+from hibiki.music.data import artwork as artwork_module
+from hibiki.music.data.artwork import THUMBNAIL_SIZES, ArtworkCache, extract_embedded_artwork
+
+
+def _jpeg(color, size=1200):
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def _embed(path, *pictures):
+    """Attach (picture type, data) APIC frames to a WAV written by write_wav."""
+    audio = WAVE(str(path))
+    for index, (picture_type, data) in enumerate(pictures):
+        audio.tags.add(APIC(encoding=3, mime="image/jpeg", type=picture_type, desc=str(index), data=data))
+    audio.save()
+    return path
+
+
+class TestArtworkCache:
+    """Test thumbnail generation and content addressing."""
+
+    def test_store_writes_every_thumbnail_size(self, tmp_path):
+        """Test that one store produces all sizes, none larger than requested."""
+        cache = ArtworkCache(tmp_path)
+
+        art_hash = cache.store(_jpeg("red"))
+
+        for size in THUMBNAIL_SIZES:
+            with Image.open(cache.path_for(art_hash, size)) as thumbnail:
+                assert thumbnail.size == (size, size)
+        assert cache.thumbnail_path(art_hash, 200) == cache.path_for(art_hash, 256)
+        assert cache.thumbnail_path(art_hash, 4000) == cache.path_for(art_hash, THUMBNAIL_SIZES[-1])
+
+    def test_same_image_is_decoded_once(self, tmp_path, monkeypatch):
+        """Test that storing known artwork again skips decoding."""
+        cache = ArtworkCache(tmp_path)
+        data = _jpeg("blue")
+        first = cache.store(data)
+        monkeypatch.setattr(artwork_module.Image, "open", None)
+
+        assert cache.store(data) == first
+
+    def test_undecodable_data_returns_none(self, tmp_path):
+        """Test that garbage bytes are rejected without raising."""
+        assert ArtworkCache(tmp_path).store(b"not an image") is None
+
+
+class TestEmbeddedArtwork:
+    """Test extraction from tags and scanner integration."""
+
+    def test_front_cover_is_preferred(self, tmp_path, write_wav):
+        """Test that the front cover wins over other picture types."""
+        back, front = _jpeg("black", 16), _jpeg("white", 16)
+        path = _embed(write_wav(tmp_path / "a.wav"), (4, back), (3, front))
+
+        assert extract_embedded_artwork(WAVE(str(path))) == front
+
+    def test_album_shares_one_thumbnail_set(self, song_service, tmp_path, write_wav):
+        """Test that tracks with identical embedded art point at one cache entry."""
+        music = tmp_path / "music"
+        music.mkdir()
+        cover = _jpeg("green")
+        for i in range(3):
+            _embed(write_wav(music / f"{i}.wav", 8000 + i), (3, cover))
+
+        ids = MusicLibraryScanner().scan_directory(str(music), max_workers=1)
+
+        hashes = {song_service.get_song_by_id(song_id).artwork_hash for song_id in ids}
+        assert len(hashes) == 1 and None not in hashes
+        assert len(list((tmp_path / ".hibiki_music" / "artwork").rglob("*.jpg"))) == len(THUMBNAIL_SIZES)
@@ -0,0 +1,391 @@
+"""
+Tests for the Song Service
+==========================
+
+Read paths must issue a constant number of SQL statements regardless of
+how many songs they return.
+"""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from hibiki.music.data.database import song_row_key
+from hibiki.music.data.models import Song, SongCreate, SearchQuery, SongFilter, Tag
+
+
+def _import_songs(song_service, count):
+    return song_service.bulk_upsert_songs(
+        SongCreate(
+            title=f"Song {i}",
+            artist=f"Artist {i % 10}",
+            album=f"Album {i % 50}",
+            year=2000 + i % 20,
+            file_path=f"/library/{i}.flac",
+        )
+        for i in range(count)
+    )
+
+
+def _tag_songs(song_service, song_ids):
+    with song_service.db.get_session() as session:
+        tag = Tag(name="测试标签")
+        session.add(tag)
+        for song_id in song_ids:
+            song = session.get(Song, song_id)
+            song.tags.append(tag)
+        session.commit()
+
+
+class TestSongReadQueryCount:
+    """Test that listing songs does not lazy-load tags per row (N+1)."""
+    
+    def test_get_all_songs_constant_queries(self, song_service, count_queries):
+        """Test that a 1000-row listing costs a constant number of statements."""
+        ids = _import_songs(song_service, 1000)
+        _tag_songs(song_service, ids[:3])
+        
+        with count_queries() as queries:
+            songs = song_service.get_all_songs(limit=1000)
+        
+        assert len(songs) == 1000
+        assert len(queries) == 1  # 标签名在同一条查询中聚合
+        assert sorted(song.tags for song in songs if song.tags) == [["测试标签"]] * 3
+    
+    def test_search_songs_constant_queries(self, song_service, count_queries):
+        """Test that search results do not load tags one song at a time."""
+        _import_songs(song_service, 500)
+        
+        with count_queries() as queries:
+            songs = song_service.search_songs(SearchQuery(text="Artist 3", limit=1000))
+        
+        assert len(songs) == 50
+        assert len(queries) == 1
+    
+    def test_get_songs_by_filter_constant_queries(self, song_service, count_queries):
+        """Test that filtered listings do not load tags one song at a time."""
+        _import_songs(song_service, 500)
+        
+        with count_queries() as queries:
+            songs = song_service.get_songs_by_filter(SongFilter(year_start=2010))
+        
+        assert len(songs) == 250
+        assert len(queries) == 1
+    
+    def test_single_song_lookup_includes_tags(self, song_service, count_queries):
+        """Test that lookups by id/path return tag names from one statement."""
+        ids = _import_songs(song_service, 3)
+        _tag_songs(song_service, ids[1:2])
+        
+        with count_queries() as queries:
+            song = song_service.get_song_by_id(ids[1])
+            missing = song_service.get_song_by_path("/library/404.flac")
+        
+        assert song.tags == ["测试标签"]
+        assert song.file_path == "/library/1.flac"
+        assert missing is None
+        assert len(queries) == 2
+
+
+class TestIterSongs:
+    """Test keyset-paginated streaming over the song table."""
+    
+    def test_streams_every_song_once_in_order(self, song_service, count_queries):
+        """Test that pages chain on (title, id) without gaps or duplicates."""
+        _import_songs(song_service, 250)
+        
+        with count_queries() as queries:
+            rows = list(song_service.iter_songs(order_by="title", page_size=100))
+        
+        assert len(rows) == 250
+        assert len({row.id for row in rows}) == 250
+        assert rows == sorted(rows, key=lambda row: (row.title, row.id))
+        assert len(queries) == 3
+        assert all("(songs.title, songs.id) >" in query for query in queries[1:])
+    
+    def test_resume_after_key_descending(self, song_service):
+        """Test that after_key resumes exactly after the last row seen."""
+        _import_songs(song_service, 50)
+        
+        rows = list(song_service.iter_songs(descending=True, page_size=7))
+        resumed = list(song_service.iter_songs(
+            descending=True, after_key=song_row_key(rows[19]), page_size=7
+        ))
+        
+        assert resumed == rows[20:]
+    
+    def test_rejects_unindexed_order_column(self, song_service):
+        """Test that only indexed sort columns are accepted."""
+        with pytest.raises(ValueError):
+            next(song_service.iter_songs(order_by="duration"))
+
+
+class TestBulkUpsert:
+    """Test INSERT ... ON CONFLICT imports of scanner records."""
+    
+    def test_reupsert_preserves_analysis_columns(self, song_service):
+        """Test that a rescan record only overwrites the fields it supplies."""
+        song_id, = song_service.bulk_upsert_songs([SongCreate(
+            title="旧标题",
+            artist="Artist",
+            file_path="/library/song.flac",
+            emotions={"怀旧": 0.8},
+            themes=["love"],
+            detected_language="zh-CN",
+            language_confidence=0.9,
+        )])
+        
+        ids = song_service.bulk_upsert_songs([SongCreate(
+            title="新标题", artist="Artist", file_path="/library/song.flac", file_size=42
+        )])
+        
+        assert ids == [song_id]
+        with song_service.db.get_read_session() as session:
+            song = session.get(Song, song_id)
+            assert (song.title, song.file_size) == ("新标题", 42)
+            assert song.emotions == {"怀旧": 0.8}
+            assert song.themes == ["love"]
+            assert (song.detected_language, song.language_confidence) == ("zh-CN", 0.9)
+        assert [song.id for song in song_service.get_songs_by_filter(SongFilter(themes=["love"]))] == [song_id]
+    
+    def test_unset_json_columns_are_stored_as_sql_null(self, song_service):
+        """Test that missing JSON values are NULL rather than the JSON text 'null'."""
+        _import_songs(song_service, 1)
+        with song_service.db.get_read_session() as session:
+            rows = session.connection().exec_driver_sql(
+                "SELECT emotions IS NULL, themes IS NULL FROM songs"
+            ).all()
+        assert rows == [(1, 1)]
+
+
+    def test_ids_follow_input_order_with_duplicate_paths(self, song_service):
+        """Test that every input record gets its song id, last record winning per path."""
+        existing, = _import_songs(song_service, 1)
+        
+        ids = song_service.bulk_upsert_songs([
+            SongCreate(title="A", artist="X", file_path="/library/a.flac"),
+            SongCreate(title="Song 0", artist="X", file_path="/library/0.flac", genre="rock"),
+            SongCreate(title="A2", artist="X", file_path="/library/a.flac"),
+        ])
+        
+        assert ids[1] == existing
+        assert ids[0] == ids[2]  # 同一批内重复的路径只写入一次
+        assert song_service.get_song_by_path("/library/a.flac").title == "A2"
+        assert song_service.get_song_by_path("/library/0.flac").genre == "rock"
+
+
+class TestFullTextSearch:
+    """Test SearchQuery text matching through FTS5 and the short-query LIKE fallback."""
+    
+    @pytest.fixture
+    def library(self, song_service):
+        song_service.bulk_upsert_songs([
+            SongCreate(title="晴天", artist="周杰伦", album="叶惠美", file_path="/library/1.flac"),
+            SongCreate(title="七里香", artist="周杰伦", album="七里香", file_path="/library/2.flac"),
+            SongCreate(title="Sunny Day", artist="Band", album="Jay Covers", file_path="/library/3.flac"),
+            SongCreate(title="Road", artist="Jay_Walker", genre="jazz", file_path="/library/4.flac"),
+        ])
+        return song_service
+    
+    @staticmethod
+    def _titles(song_service, text, **kwargs):
+        return [song.title for song in song_service.search_songs(SearchQuery(text=text, **kwargs))]
+    
+    def test_substring_match_through_fts(self, library):
+        """Test that 3+ character queries match substrings in any indexed column, case-insensitively."""
+        assert self._titles(library, "周杰伦") == ["七里香", "晴天"]
+        assert self._titles(library, "sunny") == ["Sunny Day"]
+        assert self._titles(library, "azz") == ["Road"]
+    
+    def test_short_query_falls_back_to_like(self, library):
+        """Test that 1-2 character queries, below the trigram minimum, still match substrings."""
+        assert self._titles(library, "晴") == ["晴天"]
+        assert self._titles(library, "里香") == ["七里香"]
+        assert self._titles(library, "_") == ["Road"]  # LIKE 通配符被转义
+    
+    def test_fts_and_fallback_agree(self, library):
+        """Test that both paths give the same result for equivalent queries."""
+        assert self._titles(library, "周杰") == self._titles(library, "周杰伦")
+    
+    def test_quotes_in_query_are_literal(self, library):
+        """Test that FTS query syntax in user input is treated as text."""
+        assert self._titles(library, 'Jay"') == []
+        assert self._titles(library, "Jay OR x") == []
+    
+    def test_ranked_orders_title_hits_first(self, library):
+        """Test that ranked results weight title matches above album matches."""
+        assert self._titles(library, "七里香", ranked=True) == ["七里香"]
+        assert self._titles(library, "jay", ranked=True)[0] == "Road"
+    
+    def test_index_follows_updates_and_deletes(self, library):
+        """Test that triggers keep the FTS index in sync with the songs table."""
+        song = library.get_song_by_path("/library/3.flac")
+        library.bulk_upsert_songs([SongCreate(title="Rainy Day", artist="Band", file_path="/library/3.flac")])
+        assert self._titles(library, "sunny") == []
+        assert self._titles(library, "rainy") == ["Rainy Day"]
+        
+        library.delete_songs_by_path(["/library/3.flac"])
+        assert self._titles(library, "rainy") == []
+        assert library.get_song_by_path("/library/3.flac") is None
+        assert song.id not in [s.id for s in library.search_songs(SearchQuery(text="Day"))]
+
+
+def _import_tagged_songs(song_service):
+    """Ten songs with JSON tags; song i is "happy" with intensity i / 10."""
+    return song_service.bulk_upsert_songs(
+        SongCreate(
+            title=f"Song {i}",
+            artist="Artist",
+            file_path=f"/library/{i}.flac",
+            detected_language=["ja", "en"][i % 2],
+            emotions={"happy": i / 10, "calm": 0.5} if i % 3 else None,
+            themes=["love", "love"] if i % 2 else ["road"],
+            era_tags=["90s"] if i < 5 else ["2000s"],
+            year=1995 + i,
+        )
+        for i in range(10)
+    )
+
+
+class TestSongFilterEngine:
+    """Test that every SongFilter field compiles to SQL."""
+    
+    def test_json_facets_and_tags(self, song_service):
+        """Test emotion thresholds, list facets and tags combined with AND."""
+        ids = _import_tagged_songs(song_service)
+        _tag_songs(song_service, ids[5:8])
+        
+        songs = song_service.get_songs_by_filter(SongFilter(
+            emotions={"happy": 0.5}, themes=["love"], tags=["测试标签"]
+        ))
+        
+        assert [song.title for song in songs] == ["Song 5", "Song 7"]
+    
+    def test_or_operator(self, song_service):
+        """Test that fields are alternatives under logic_operator OR."""
+        _import_tagged_songs(song_service)
+        
+        songs = song_service.get_songs_by_filter(SongFilter(
+            eras=["90s"], styles=["jazz"], year_start=2003, logic_operator="OR"
+        ))
+        
+        assert sorted(song.title for song in songs) == [
+            "Song 0", "Song 1", "Song 2", "Song 3", "Song 4", "Song 8", "Song 9"
+        ]
+    
+    def test_facet_side_table_follows_updates(self, song_service):
+        """Test that the triggers keep song_facets in sync with the JSON columns."""
+        ids = _import_tagged_songs(song_service)
+        with song_service.db.get_session() as session:
+            song = session.get(Song, ids[1])
+            song.themes = ["road"]
+            session.add(song)
+            session.commit()
+        
+        assert len(song_service.get_songs_by_filter(SongFilter(themes=["road"]))) == 6
+        assert len(song_service.get_songs_by_filter(SongFilter(themes=["love"]))) == 4
+    
+    def test_facet_counts_in_same_session(self, song_service, count_queries):
+        """Test that filter_songs returns facet counts of the matched set."""
+        _import_tagged_songs(song_service)
+        
+        with count_queries() as queries:
+            result = song_service.filter_songs(SongFilter(languages=["en"]))
+        
+        assert result.total == 5
+        assert result.facet_counts["language"] == {"en": 5}
+        assert result.facet_counts["theme"] == {"love": 5}
+        assert result.facet_counts["emotion"] == {"happy": 3, "calm": 3}
+        assert len(queries) == 2
+
+
+class TestLibraryStats:
+    """Test the trigger-maintained library summary."""
+    
+    @staticmethod
+    def _summary(song_service):
+        return song_service.get_library_stats().model_dump(
+            include={"total_songs", "total_artists", "total_albums",
+                     "total_duration", "favorite_count", "language_distribution"}
+        )
+    
+    def test_incremental_matches_rebuild(self, song_service):
+        """Test that inserts, updates and deletes keep the summary exact."""
+        ids = _import_tagged_songs(song_service)
+        song_service.toggle_favorite(ids[0])
+        with song_service.db.get_session() as session:
+            song = session.get(Song, ids[1])
+            song.artist = "Another Artist"
+            song.album = "Album"
+            song.detected_language = None
+            session.add(song)
+            session.delete(session.get(Song, ids[2]))
+            session.commit()
+        
+        incremental = self._summary(song_service)
+        song_service.db.rebuild_library_stats()
+        
+        assert incremental == self._summary(song_service)
+        assert incremental["total_songs"] == 9
+        assert incremental["total_artists"] == 2
+        assert incremental["total_albums"] == 1
+        assert incremental["favorite_count"] == 1
+        assert incremental["language_distribution"] == {"ja": 4, "en": 4}
+    
+    def test_constant_queries(self, song_service, count_queries):
+        """Test that reading stats does not depend on library size."""
+        _import_songs(song_service, 500)
+        
+        with count_queries() as queries:
+            stats = song_service.get_library_stats()
+        
+        assert stats.total_songs == 500
+        assert stats.total_artists == 10
+        assert len(queries) == 4
+
+
+class TestConnectionPools:
+    """Test the single-writer / read-only-pool engine setup."""
+    
+    def test_reads_do_not_wait_for_open_write_transaction(self, song_service):
+        """Test that WAL readers see committed data while a write is in flight."""
+        _import_songs(song_service, 10)
+        
+        with song_service.db.get_session() as writer:
+            writer.add(Song(title="Uncommitted", artist="Artist", file_path="/library/new.flac"))
+            writer.flush()  # 持有写锁，尚未提交
+            
+            songs = song_service.get_all_songs()
+            
+            assert len(songs) == 10
+            writer.rollback()
+    
+    def test_read_connections_are_read_only_and_tuned(self, song_service):
+        """Test engine-scoped PRAGMAs on the reader pool."""
+        with song_service.db._read_engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+            assert conn.exec_driver_sql("PRAGMA mmap_size").scalar() == 268435456
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            with pytest.raises(OperationalError, match="readonly"):
+                conn.exec_driver_sql("DELETE FROM songs")
+
+
+class TestSchemaUpgrade:
+    """Test that databases created by older versions gain new columns."""
+    
+    def test_missing_nullable_column_is_added(self, song_service, monkeypatch):
+        """Test _ensure_columns on a songs table without artwork_hash."""
+        from hibiki.music.data.database import DatabaseManager
+        
+        _import_songs(song_service, 2)
+        with song_service.db._engine.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE songs DROP COLUMN artwork_hash")
+        song_service.db.dispose()
+        monkeypatch.setattr(DatabaseManager, "_instance", None)
+        
+        db = DatabaseManager()
+        try:
+            with db._engine.connect() as conn:
+                columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(songs)")}
+            assert "artwork_hash" in columns
+        finally:
+            db.dispose()
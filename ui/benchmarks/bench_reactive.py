@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+响应式核心微基准
+================
+
+测量 Signal.get / Signal.set / Effect 重新执行的单次开销：
+10k 个 Signal（每个挂一个 Effect），共 100k 次更新。
+
+每个场景跑两遍：
+- traced:  打开追踪开关但保持日志等级为 INFO —— 与改动前一致，每次访问都格式化日志再丢弃
+- fast:    默认生产模式，热路径不做任何日志格式化
+
+用法:
+    python benchmarks/bench_reactive.py [--signals 10000] [--updates 100000]
+"""
+
+import argparse
+import gc
+import time
+
+from hibiki.ui.core import reactive
+from hibiki.ui.core.reactive import Effect, Signal
+
+
+def _timeit(fn) -> float:
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def run_scenarios(n_signals: int, n_updates: int) -> dict:
+    signals = [Signal(0) for _ in range(n_signals)]
+    sink = []
+    effects = [Effect(lambda s=s: sink.append(s.value)) for s in signals]
+    sink.clear()
+
+    def bench_get():
+        for i in range(n_updates):
+            signals[i % n_signals].get()
+
+    def bench_set_no_observer():
+        bare = [Signal(0) for _ in range(n_signals)]
+        for i in range(n_updates):
+            bare[i % n_signals].set(i)
+
+    def bench_set_with_effect():
+        for i in range(n_updates):
+            signals[i % n_signals].set(i + 1)
+
+    results = {
+        "get": _timeit(bench_get),
+        "set (no observer)": _timeit(bench_set_no_observer),
+        "set + effect rerun": _timeit(bench_set_with_effect),
+    }
+
+    for effect in effects:
+        effect.cleanup()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hibiki reactive core microbenchmark")
+    parser.add_argument("--signals", type=int, default=10_000)
+    parser.add_argument("--updates", type=int, default=100_000)
+    args = parser.parse_args()
+
+    modes = {}
+    for mode, trace in (("traced", True), ("fast", False)):
+        # 直接切换模块开关而不调整日志等级，复现改动前“格式化后丢弃”的开销
+        reactive._trace = trace
+        modes[mode] = run_scenarios(args.signals, args.updates)
+    reactive._trace = False
+
+    print(f"signals={args.signals} updates={args.updates}")
+    print(f"{'scenario':<22}{'traced ns/op':>14}{'fast ns/op':>14}{'speedup':>10}")
+    for scenario in modes["fast"]:
+        traced = modes["traced"][scenario] / args.updates * 1e9
+        fast = modes["fast"][scenario] / args.updates * 1e9
+        print(f"{scenario:<22}{traced:>14.0f}{fast:>14.0f}{traced / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+响应式原语内存基准
+==================
+
+用 tracemalloc 统计每个 Signal / Computed / Effect 实际占用的字节数。
+依赖关系按大型列表视图的常见形态构造：每个 Effect 订阅一个 Signal，
+每个 Computed 依赖一个 Signal 并被一个 Effect 读取。
+
+用法:
+    python benchmarks/bench_reactive_memory.py [--count 20000]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from hibiki.ui.core.reactive import Computed, Effect, Signal
+
+
+def _bytes_per_item(factory, count: int):
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    items = factory(count)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / count, items
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hibiki reactive memory benchmark")
+    parser.add_argument("--count", type=int, default=20_000)
+    args = parser.parse_args()
+    count = args.count
+
+    # 值统一用 0，排除整数对象本身的开销
+    signal_bytes, _ = _bytes_per_item(lambda n: [Signal(0) for _ in range(n)], count)
+
+    sources = [Signal(0) for _ in range(count)]
+    callbacks = [lambda s=s: s.value for s in sources]
+    effect_bytes, effects = _bytes_per_item(
+        lambda n: [Effect(callbacks[i]) for i in range(n)], count
+    )
+
+    sources2 = [Signal(0) for _ in range(count)]
+    fns = [lambda s=s: s.value for s in sources2]
+    computed_bytes, computeds = _bytes_per_item(
+        lambda n: [Computed(fns[i]) for i in range(n)], count
+    )
+    readers = [lambda c=c: c.value for c in computeds]
+    subscribed_bytes, readers_effects = _bytes_per_item(
+        lambda n: [Effect(readers[i]) for i in range(n)], count
+    )
+
+    print(f"count={count}")
+    print(f"{'primitive':<36}{'bytes/node':>12}")
+    print(f"{'Signal (no observers)':<36}{signal_bytes:>12.0f}")
+    print(f"{'Effect (1 dependency, incl. link)':<36}{effect_bytes:>12.0f}")
+    print(f"{'Computed (unevaluated)':<36}{computed_bytes:>12.0f}")
+    print(f"{'Effect reading a Computed':<36}{subscribed_bytes:>12.0f}")
+
+    for effect in effects + readers_effects:
+        effect.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -193,11 +193,12 @@ For complete documentation, examples, and guides, see the project repository.
 from .core import (
     Component, UIComponent, Container,
     Signal, Computed, Effect, create_signal, create_computed, create_effect,
+    Owner, create_root, get_reactive_stats, run_on_ui_thread, ListSignal, DictSignal,
     ComponentStyle, StylePresets, px, percent, auto, vw, vh,
     Display, FlexDirection, JustifyContent, AlignItems, LengthUnit,
     ReactiveBinding, FormDataBinding,
     TextProps, TextStyles, text_props,
-    get_layout_engine, LayoutNode, LayoutEngine,
+    get_layout_engine, flush_layout, LayoutNode, LayoutEngine,
     ManagerFactory,
     Animation, AnimationGroup, AnimationManager,
     AnimationCurve, AnimationProperty, AnimationState,
@@ -253,11 +254,12 @@ __all__ = [
     # 核心系统
     'Component', 'UIComponent', 'Container',
     'Signal', 'Computed', 'Effect', 'create_signal', 'create_computed', 'create_effect',
+    'Owner', 'create_root', 'get_reactive_stats', 'run_on_ui_thread', 'ListSignal', 'DictSignal',
     'ComponentStyle', 'StylePresets', 'px', 'percent', 'auto', 'vw', 'vh',
     'Display', 'FlexDirection', 'JustifyContent', 'AlignItems', 'LengthUnit',
     'ReactiveBinding', 'FormDataBinding',
     'TextProps', 'TextStyles', 'text_props',
-    'get_layout_engine', 'LayoutNode', 'LayoutEngine',
+    'get_layout_engine', 'flush_layout', 'LayoutNode', 'LayoutEngine',
     'ManagerFactory',
     'Animation', 'AnimationGroup', 'AnimationManager',
     'AnimationCurve', 'AnimationProperty', 'AnimationState',
@@ -309,7 +309,9 @@ class CustomView(UIComponent):
 
                     return Effect(redraw_on_change)
 
-                effect = create_redraw_effect(signal)
+                # 归组件作用域所有，组件 cleanup 时自动停止重绘
+                with self._owner:
+                    effect = create_redraw_effect(signal)
                 logger.info(f"📡 已设置信号 {signal} 的自动重绘")
 
     def _wrap_mouse_callback(self, callback):
@@ -14,12 +14,12 @@ from AppKit import (
     NSMakeRect,
     NSTableViewColumnAutoresizingStyle,
 )
-from Foundation import NSObject
+from Foundation import NSObject, NSIndexSet, NSMakeRange
 
 # 导入核心架构
 from ..core.component import UIComponent
 from ..core.styles import ComponentStyle
-from ..core.reactive import Signal, Computed, Effect
+from ..core.reactive import Signal, Computed, Effect, ListSignal
 from ..core.logging import get_logger
 
 # 导入objc
@@ -317,6 +317,7 @@ class TableView(UIComponent):
         self._data_source = None
         self._delegate = None
         self._bindings = []
+        self._rows_version = None  # ListSignal 数据上次同步到表格的版本
         
         logger.debug(
             f"📊 TableView创建: rows={len(self.data) if not self._is_reactive_data else '响应式'}, "
@@ -435,13 +436,25 @@ class TableView(UIComponent):
         
         def update_data():
             if self._table_view and self._data_source:
+                rows = self.data.value  # 建立依赖
                 self._update_data_source()
                 
                 # 如果列结构发生变化，重新生成列
-                if not self.columns or (hasattr(self.data, "value") and self.data.value):
+                columns_changed = False
+                if not self.columns or rows:
                     new_columns = self._auto_generate_columns()
                     if len(new_columns) != len(self.columns):
                         self._rebuild_columns(new_columns)
+                        columns_changed = True
+                
+                # ListSignal 数据优先按变更记录局部刷新；列结构变化时仍整表刷新
+                if isinstance(self.data, ListSignal):
+                    last_version, self._rows_version = self._rows_version, self.data.version
+                    if last_version is not None and not columns_changed:
+                        changes = self.data.changes_since(last_version)
+                        if changes is not None:
+                            self._apply_row_changes(changes)
+                            return
                 
                 # 刷新表格显示
                 self._table_view.reloadData()
@@ -451,6 +464,42 @@ class TableView(UIComponent):
         effect = Effect(update_data)
         self._bindings.append(effect)
     
+    def _apply_row_changes(self, changes):
+        """按 ListChange 记录局部更新行，而不是 reloadData 整表刷新"""
+        table_view = self._table_view
+        all_columns = NSIndexSet.indexSetWithIndexesInRange_(
+            NSMakeRange(0, len(self.columns))
+        )
+
+        table_view.beginUpdates()
+        try:
+            for change in changes:
+                removed, inserted = len(change.removed), len(change.inserted)
+                common = min(removed, inserted)
+                if common:
+                    table_view.reloadDataForRowIndexes_columnIndexes_(
+                        NSIndexSet.indexSetWithIndexesInRange_(NSMakeRange(change.index, common)),
+                        all_columns,
+                    )
+                if removed > common:
+                    table_view.removeRowsAtIndexes_withAnimation_(
+                        NSIndexSet.indexSetWithIndexesInRange_(
+                            NSMakeRange(change.index + common, removed - common)
+                        ),
+                        0,  # NSTableViewAnimationEffectNone
+                    )
+                elif inserted > common:
+                    table_view.insertRowsAtIndexes_withAnimation_(
+                        NSIndexSet.indexSetWithIndexesInRange_(
+                            NSMakeRange(change.index + common, inserted - common)
+                        ),
+                        0,
+                    )
+        finally:
+            table_view.endUpdates()
+
+        logger.debug(f"📊 TableView增量更新: {len(changes)}处变更, {len(self._data_source.data)}行")
+
     def _rebuild_columns(self, new_columns: List[TableColumn]):
         """重建表格列"""
         if not self._table_view:
@@ -513,6 +562,7 @@ class TableView(UIComponent):
         """
         self.data = data
         self._is_reactive_data = isinstance(data, (Signal, Computed))
+        self._rows_version = None
         
         if self._table_view:
             self._update_data_source()
@@ -534,7 +584,9 @@ class TableView(UIComponent):
         Args:
             row_data: 行数据
         """
-        if self._is_reactive_data:
+        if isinstance(self.data, ListSignal):
+            self.data.append(row_data)
+        elif self._is_reactive_data:
             if hasattr(self.data, "value"):
                 current_data = list(self.data.value)
                 current_data.append(row_data)
@@ -555,7 +607,11 @@ class TableView(UIComponent):
         Args:
             row_index: 要删除的行索引
         """
-        if self._is_reactive_data:
+        if isinstance(self.data, ListSignal):
+            if 0 <= row_index < len(self.data.value):
+                removed = self.data.pop(row_index)
+                logger.debug(f"📊 TableView删除行: {row_index} -> {removed}")
+        elif self._is_reactive_data:
             if hasattr(self.data, "value") and 0 <= row_index < len(self.data.value):
                 current_data = list(self.data.value)
                 removed = current_data.pop(row_index)
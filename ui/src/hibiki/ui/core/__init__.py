@@ -8,7 +8,10 @@ Hibiki UI v4 Core Module
 from .component import Component, UIComponent, Container
 
 # 响应式系统
-from .reactive import Signal, Computed, Effect, create_signal, create_computed, create_effect
+from .reactive import (
+    Signal, Computed, Effect, create_signal, create_computed, create_effect,
+    Owner, create_root, get_reactive_stats, run_on_ui_thread, ListSignal, DictSignal
+)
 
 # 样式系统
 from .styles import (
@@ -23,7 +26,7 @@ from .binding import ReactiveBinding, FormDataBinding
 from .text_props import TextProps, TextStyles, text_props
 
 # 布局系统
-from .layout import get_layout_engine, LayoutNode, LayoutEngine
+from .layout import get_layout_engine, flush_layout, LayoutNode, LayoutEngine
 
 # 管理器系统
 from .managers import ManagerFactory
@@ -48,6 +51,12 @@ __all__ = [
     'create_signal',
     'create_computed', 
     'create_effect',
+    'Owner',
+    'create_root',
+    'get_reactive_stats',
+    'run_on_ui_thread',
+    'ListSignal',
+    'DictSignal',
     
     # 样式系统
     'ComponentStyle',
@@ -74,6 +83,7 @@ __all__ = [
     
     # 布局系统
     'get_layout_engine',
+    'flush_layout',
     'LayoutNode',
     'LayoutEngine',
     
@@ -4,10 +4,11 @@ Hibiki UI v4.0 组件核心架构
 双层组件架构：Component (抽象基类) + UIComponent (具体基类)
 """
 
+import bisect
 from abc import ABC, abstractmethod
-from typing import Optional, List, Union, Callable, Any, TypeVar, Tuple
+from typing import Optional, List, Union, Callable, Any, TypeVar, Tuple, Dict
 
-from AppKit import NSView, NSColor
+from AppKit import NSView, NSColor, NSWindowAbove, NSWindowBelow
 from Foundation import NSMakeRect
 
 # HibikiContainerView不再需要 - 使用最小化Flip策略
@@ -21,7 +22,15 @@ from .managers import (
     Position,
     OverflowBehavior,
 )
-from .reactive import Signal, Computed, Effect, create_signal, create_computed, create_effect
+from .reactive import (
+    Signal,
+    Computed,
+    Effect,
+    Owner,
+    create_signal,
+    create_computed,
+    create_effect,
+)
 from .styles import ComponentStyle, Length, px
 
 T = TypeVar("T")
@@ -43,6 +52,8 @@ class Component(ABC):
         self._mounted = False
         self._cleanup_callbacks: List[Callable[[], None]] = []
         self._children: List["Component"] = []
+        # 组件的响应式作用域：挂载期间创建的 Effect/Computed 都归它所有
+        self._owner = Owner()
 
     @abstractmethod
     def mount(self) -> NSView:
@@ -53,21 +64,23 @@ class Component(ABC):
             "All Hibiki UI components must implement this core method."
         )
 
-    def create_signal(self, initial_value: T) -> Signal[T]:
+    def create_signal(self, initial_value: T, equals=None) -> Signal[T]:
         """创建组件作用域的Signal"""
-        signal = create_signal(initial_value)
+        signal = create_signal(initial_value, equals)
         self._signals.append(signal)
         return signal
 
-    def create_computed(self, fn: Callable[[], T]) -> Computed[T]:
+    def create_computed(self, fn: Callable[[], T], equals=None) -> Computed[T]:
         """创建计算属性"""
-        computed = create_computed(fn)
+        with self._owner:
+            computed = create_computed(fn, equals)
         self._computed.append(computed)
         return computed
 
     def create_effect(self, fn: Callable[[], None]) -> Effect:
         """创建副作用"""
-        effect = create_effect(fn)
+        with self._owner:
+            effect = create_effect(fn)
         self._effects.append(effect)
         return effect
 
@@ -132,6 +145,9 @@ class Component(ABC):
                 logger.error(f"Effect清理错误: {e}")
         self._effects.clear()
 
+        # 释放作用域内其余的 Effect/Computed（例如 ReactiveBinding 在挂载时创建的）
+        self._owner.dispose()
+
         for child in self._children:
             try:
                 child.cleanup()
@@ -212,7 +228,8 @@ class UIComponent(Component):
     def mount(self) -> NSView:
         """挂载UI组件"""
         if self._nsview is None:
-            self._nsview = self._create_nsview()
+            with self._owner:
+                self._nsview = self._create_nsview()
             self.layer_manager.register_component(self, self.style.z_index)
             self._apply_positioning_and_layout()
             self.transform_manager.apply_transforms(self._nsview, self.style)
@@ -231,11 +248,12 @@ class UIComponent(Component):
                 # NSScrollView的frame将在_apply_layout_result中正确设置
                 # 这里只需要创建ScrollView结构即可
 
-            for configurator in self._raw_configurators:
-                try:
-                    configurator(self._nsview)
-                except Exception as e:
-                    logger.error(f"原始配置器执行失败: {e}")
+            with self._owner:
+                for configurator in self._raw_configurators:
+                    try:
+                        configurator(self._nsview)
+                    except Exception as e:
+                        logger.error(f"原始配置器执行失败: {e}")
 
             self._apply_basic_style()
 
@@ -472,41 +490,35 @@ class UIComponent(Component):
                 y += h + 15  # 15px间距
 
     def _apply_children_layout(self, engine):
-        """递归应用子组件的布局"""
+        """应用子组件的布局 - 只更新最近一次布局计算中位置或尺寸变化的后代"""
         if not hasattr(self, "children"):
             return
 
-        for child in self.children:
-            if hasattr(child, "_nsview") and child._nsview:
-                # 获取子组件的布局节点
-                child_node = engine.get_node_for_component(child)
-                if child_node:
-                    try:
-
-                        # 获取子组件的布局结果
-                        box = child_node._stretchable_node.get_box()
-                        x, y, width, height = box.x, box.y, box.width, box.height
-
-                        # 应用到子组件的NSView
-                        child._apply_layout_result(
-                            type(
-                                "LayoutResult",
-                                (),
-                                {"x": x, "y": y, "width": width, "height": height},
-                            )()
-                        )
-
-                        # 递归处理子组件的子组件
-                        if hasattr(child, "_apply_children_layout"):
-                            child._apply_children_layout(engine)
+        for child_node in engine.take_layout_changes(self):
+            child = child_node.component
+            if not (hasattr(child, "_nsview") and child._nsview):
+                continue
+            try:
+                # 获取子组件的布局结果
+                box = child_node._stretchable_node.get_box()
+                x, y, width, height = box.x, box.y, box.width, box.height
+
+                # 应用到子组件的NSView
+                child._apply_layout_result(
+                    type(
+                        "LayoutResult",
+                        (),
+                        {"x": x, "y": y, "width": width, "height": height},
+                    )()
+                )
 
-                    except Exception as e:
-                        import traceback
+            except Exception as e:
+                import traceback
 
-                        logger.error(f"子组件布局应用失败: {child.__class__.__name__} - {e}")
-                        logger.error(f"异常详情: {type(e).__name__}: {str(e)}")
-                        traceback.print_exc()
-                        child._apply_fallback_frame()
+                logger.error(f"子组件布局应用失败: {child.__class__.__name__} - {e}")
+                logger.error(f"异常详情: {type(e).__name__}: {str(e)}")
+                traceback.print_exc()
+                child._apply_fallback_frame()
 
     def _resolve_size_value(self, length_value, default: float) -> float:
         """解析尺寸值为像素"""
@@ -837,56 +849,176 @@ class Container(UIComponent):
         except Exception as e:
             logger.error(f"批量设置子组件失败: {e}")
 
+    def move_child_component(self, child: UIComponent, index: int):
+        """把子组件移动到 index 位置，视图和布局节点保留，不重新挂载"""
+        if child not in self.children:
+            logger.warning(f"要移动的子组件不存在: {child.__class__.__name__}")
+            return
+
+        try:
+            self.children.remove(child)
+            index = max(0, min(index, len(self.children)))
+            self.children.insert(index, child)
+
+            if self._nsview:
+                engine = get_layout_engine()
+                engine.move_child_relationship(self, child, index)
+                self._position_child_view(child, self.children[index - 1] if index else None)
+                self._update_layout()
+
+        except Exception as e:
+            logger.error(f"移动子组件失败: {e}")
+
+    def reconcile_children(
+        self,
+        new_children: List[UIComponent],
+        key: Optional[Callable[[UIComponent], Any]] = None,
+    ) -> Dict[str, int]:
+        """按 key 把子组件更新为 new_children，只做最少的插入、删除和移动
+
+        key 相同的子组件视为同一项：保留已挂载的旧组件（new_children 中对应的
+        新组件被丢弃），只移动其视图和布局节点，不销毁重建。key 默认为组件本身。
+
+        保留的子组件中，相对顺序不变的最长一组（最长递增子序列）留在原处，
+        只有其余的才需要移动，例如排序后的歌曲列表只移动位置变化的行。
+
+        Args:
+            new_children: 新的子组件列表
+            key: 子组件 -> 可哈希的标识，例如 ``lambda row: row.song.id``
+
+        Returns:
+            {"inserted": 新挂载数, "removed": 移除数, "moved": 移动数, "kept": 原位保留数}
+        """
+        key = key or (lambda child: child)
+        old_children = list(self.children)
+        old_keys = [key(child) for child in old_children]
+        new_keys = [key(child) for child in new_children]
+        old_positions = {k: i for i, k in enumerate(old_keys)}
+
+        if len(old_positions) != len(old_keys) or len(set(new_keys)) != len(new_keys):
+            logger.warning("子组件 key 重复，无法按 key 对比，改为整体替换")
+            self.set_children(list(new_children))
+            return {"inserted": len(new_children), "removed": len(old_children), "moved": 0, "kept": 0}
+
+        final_children: List[UIComponent] = []
+        inserted: List[UIComponent] = []
+        retained_positions: List[int] = []  # 保留的子组件按新顺序排列时的旧位置
+        for child, k in zip(new_children, new_keys):
+            position = old_positions.get(k)
+            if position is None:
+                final_children.append(child)
+                inserted.append(child)
+            else:
+                final_children.append(old_children[position])
+                retained_positions.append(position)
+
+        new_key_set = set(new_keys)
+        removed = [child for child, k in zip(old_children, old_keys) if k not in new_key_set]
+        stable = _longest_increasing_subsequence(retained_positions)
+        moved = [old_children[i] for i in retained_positions if i not in stable]
+
+        try:
+            engine = get_layout_engine()
+
+            # 删除：从视图和布局树移除并清理
+            for child in removed:
+                if self._nsview and getattr(child, "_nsview", None):
+                    child._nsview.removeFromSuperview()
+                if self._nsview:
+                    engine.remove_child_relationship(self, child)
+                child.cleanup()
+            removed_ids = {id(child) for child in removed}
+            self._children = [child for child in self._children if id(child) not in removed_ids]
+            self._children.extend(inserted)
+            self.children = final_children
+            # 未挂载时也记录父容器，与 children 保持一致
+            for child in inserted:
+                child._parent_container = self
+
+            if self._nsview:
+                # 插入：先追加到布局树末尾并挂载，再一次性重排到最终顺序
+                for child in inserted:
+                    engine.add_child_relationship(self, child)
+                    child.mount()
+                engine.reorder_child_relationships(self, final_children)
+
+                # 视图层级：只重新放置插入和移动的视图，以前一个兄弟视图为锚点
+                reposition = {id(child) for child in inserted}
+                reposition.update(id(child) for child in moved)
+                previous = None
+                for child in final_children:
+                    if id(child) in reposition:
+                        self._position_child_view(child, previous)
+                    previous = child
+
+                self._update_layout()
+
+        except Exception as e:
+            logger.error(f"按 key 更新子组件失败: {e}")
+
+        return {
+            "inserted": len(inserted),
+            "removed": len(removed),
+            "moved": len(moved),
+            "kept": len(retained_positions) - len(moved),
+        }
+
+    def _position_child_view(self, child: UIComponent, previous: Optional[UIComponent]):
+        """把子组件的视图放到 previous 的视图之上；previous 为 None 时放到最底层"""
+        if previous is None:
+            self._nsview.addSubview_positioned_relativeTo_(child._nsview, NSWindowBelow, None)
+        else:
+            self._nsview.addSubview_positioned_relativeTo_(
+                child._nsview, NSWindowAbove, previous._nsview
+            )
+
     def _update_layout(self):
-        """更新布局（在子组件变化后调用）"""
+        """更新布局（在子组件变化后调用）- 同一帧内的多次变化只布局一次"""
         if self._nsview:
             try:
 
                 engine = get_layout_engine()
 
-                # 重新计算布局 - 使用正确的方法
                 # 检查布局引擎中是否有该组件的节点
                 layout_node = engine.get_node_for_component(self)
-                if layout_node:
-                    # 获取当前容器的可用尺寸
-                    available_size = self._get_available_size_from_parent()
-
-                    # 重新计算布局
-                    layout_result = engine.compute_layout_for_component(self, available_size)
-                    if layout_result:
-                        # 应用容器本身的布局
-                        self._apply_layout_result(layout_result)
-
-                        # 应用子组件布局
-                        self._apply_children_layout(engine)
-
-                    else:
-                        logger.error(f"容器布局计算失败: {self.__class__.__name__}")
-                else:
+                if not layout_node:
                     logger.warning(
                         f"容器在布局引擎中没有节点，需要重新创建: {self.__class__.__name__}"
                     )
-                    # 如果容器节点不存在，重新创建
-                    try:
-                        layout_node = engine.create_node_for_component(self)
-                        if layout_node:
-                            # 重新建立所有子组件的布局关系
-                            for i, child in enumerate(self.children):
-                                engine.add_child_relationship(self, child, i)
-
-                            # 重新计算布局
-                            available_size = self._get_available_size_from_parent()
-                            layout_result = engine.compute_layout_for_component(
-                                self, available_size
-                            )
-                            if layout_result:
-                                self._apply_layout_result(layout_result)
-                                self._apply_children_layout(engine)
-                    except Exception as rebuild_e:
-                        logger.error(f"重建容器布局节点失败: {rebuild_e}")
+                    # 如果容器节点不存在，重新创建并重新建立所有子组件的布局关系
+                    engine.create_node_for_component(self)
+                    for i, child in enumerate(self.children):
+                        engine.add_child_relationship(self, child, i)
+
+                # 增量布局：请求从布局树的根重新计算，只有变化节点的祖先是脏的，
+                # 其余子树使用Taffy缓存，且只更新frame变化的NSView
+                engine.request_layout(self)
 
             except Exception as e:
                 logger.error(f"更新布局失败: {e}")
                 import traceback
 
                 traceback.print_exc()
+
+
+def _longest_increasing_subsequence(sequence: List[int]) -> set:
+    """最长递增子序列中的值（O(n log n)），用于找出相对顺序不变、无需移动的子组件"""
+    tail_values: List[int] = []  # 长度为 i+1 的递增子序列的最小结尾值
+    tail_positions: List[int] = []
+    previous: List[int] = [-1] * len(sequence)
+    for position, value in enumerate(sequence):
+        i = bisect.bisect_left(tail_values, value)
+        if i == len(tail_values):
+            tail_values.append(value)
+            tail_positions.append(position)
+        else:
+            tail_values[i] = value
+            tail_positions[i] = position
+        previous[position] = tail_positions[i - 1] if i else -1
+
+    result = set()
+    position = tail_positions[-1] if tail_positions else -1
+    while position != -1:
+        result.add(sequence[position])
+        position = previous[position]
+    return result
@@ -55,6 +55,7 @@ Stretchable 是一个提供基于 CSS 布局操作的 Python 库，使用：
 
 3. **性能优化**:
    - 布局缓存和批处理支持
+   - 增量布局：只读回有变化的子树，只更新 frame 变化的 NSView
    - 最小化 PyObjC 到 Rust 桥接调用
    - 高效的父子关系管理
 
@@ -80,7 +81,8 @@ Stretchable 是一个提供基于 CSS 布局操作的 Python 库，使用：
 
 **动态内容更新**::
 
-    engine.update_component_style(component)
+    engine.update_component_style(component)  # 布局在本帧绘制前合并执行
+    flush_layout()  # 需要立即拿到结果时
     engine.cleanup_orphaned_nodes()  # 维护
 
 **调试和监控**::
@@ -172,8 +174,10 @@ Stretchable 是一个提供基于 CSS 布局操作的 Python 库，使用：
 以提高灵活性和标准合规性。
 """
 
-from typing import Optional, Tuple, Dict, Any, List
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple, Dict, Any, List
 from dataclasses import dataclass
+import functools
 import time
 import logging
 import logging.handlers
@@ -183,6 +187,8 @@ from datetime import datetime
 
 # 直接导入Stretchable - 这是外部依赖，不是旧版本代码
 import stretchable as st
+from stretchable import taffylib as _taffylib
+from stretchable.context import taffy as _taffy
 from stretchable.style import (
     Display as StDisplay,
     FlexDirection as StFlexDirection,
@@ -208,10 +214,13 @@ from .styles import (
 from .managers import Position as HibikiPosition
 
 from .logging import get_logger
+from .reactive import call_after_batch
 
 logger = get_logger("layout")
 logger.setLevel("INFO")
 
+_MAX_LAYOUT_FLUSH_ROUNDS = 10
+
 
 @dataclass
 class LayoutResult:
@@ -671,6 +680,12 @@ class StyleConverter:
     LayoutEngine : 高级布局接口
     """
 
+    # ComponentStyle.layout_key() -> st.Style 的 LRU
+    _cache: "OrderedDict[tuple, st.Style]" = OrderedDict()
+    cache_capacity = 1024
+    _conversions = 0
+    _cache_hits = 0
+
     @staticmethod
     def convert_to_stretchable_style(style: ComponentStyle) -> st.Style:
         """
@@ -706,7 +721,56 @@ class StyleConverter:
 
         转换过程处理所有主要的 CSS 布局属性，具有正确的单位转换和错误处理。
         不支持或无效的属性被记录并跳过。
+
+        转换结果按 ``style.layout_key()`` 缓存：布局属性相同的样式共享同一个
+        （不可变的）Stretchable Style，列表中成千上万个同样式的行只转换一次。
+        样式被修改后键随之改变，不会命中旧的转换结果。
         """
+        key = style.layout_key() if hasattr(style, "layout_key") else None
+        if key is None:
+            return StyleConverter._convert(style)
+
+        cache = StyleConverter._cache
+        try:
+            stretchable_style = cache.get(key)
+        except TypeError:  # 属性中有不可哈希的值
+            return StyleConverter._convert(style)
+
+        if stretchable_style is not None:
+            cache.move_to_end(key)
+            StyleConverter._cache_hits += 1
+            return stretchable_style
+
+        stretchable_style = StyleConverter._convert(style)
+        cache[key] = stretchable_style
+        while len(cache) > StyleConverter.cache_capacity:
+            cache.popitem(last=False)
+        return stretchable_style
+
+    @staticmethod
+    def get_cache_stats() -> Dict[str, int]:
+        """样式转换缓存统计"""
+        grid_info = StyleConverter._parse_grid_template.cache_info()
+        return {
+            "conversions": StyleConverter._conversions,
+            "hits": StyleConverter._cache_hits,
+            "cached": len(StyleConverter._cache),
+            "grid_template_parses": grid_info.misses,
+            "grid_template_hits": grid_info.hits,
+        }
+
+    @staticmethod
+    def clear_cache():
+        """清空样式转换缓存及统计"""
+        StyleConverter._cache.clear()
+        StyleConverter._conversions = 0
+        StyleConverter._cache_hits = 0
+        StyleConverter._parse_grid_template.cache_clear()
+
+    @staticmethod
+    def _convert(style: ComponentStyle) -> st.Style:
+        """不经缓存地转换样式"""
+        StyleConverter._conversions += 1
         kwargs = {}
 
         # Display转换
@@ -948,6 +1012,13 @@ class StyleConverter:
         if not template_value or not isinstance(template_value, str):
             return None
 
+        tracks = StyleConverter._parse_grid_template(template_value)
+        return list(tracks) if tracks is not None else None
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _parse_grid_template(template_value: str):
+        """解析 Grid 模板字符串，结果按字符串缓存（返回元组，避免共享可变列表）"""
         try:
             from stretchable.style import GridTrackSizing
 
@@ -970,7 +1041,7 @@ class StyleConverter:
                         logger.debug(
                             f"🎯 解析repeat(): {template_value} -> {count}列 x {track_pattern}"
                         )
-                        return tracks
+                        return tuple(tracks)
                     else:
                         logger.warning(f"⚠️ repeat()语法解析失败: {template_value}")
                         return None
@@ -985,11 +1056,11 @@ class StyleConverter:
                     if track_str:
                         track = GridTrackSizing.from_any(track_str)
                         tracks.append(track)
-                return tracks
+                return tuple(tracks)
             else:
                 # 单个值
                 track = GridTrackSizing.from_any(template_value)
-                return [track]
+                return (track,)
 
         except Exception as e:
             logger.warning(f"⚠️ Grid模板转换失败: {template_value} - {e}")
@@ -1062,6 +1133,107 @@ class StyleConverter:
             return None, None
 
 
+class _IncrementalNode(st.Node):
+    """
+    支持增量布局的 Stretchable 节点
+
+    stretchable 在 Taffy 计算完成后会把整棵树的结果逐个读回 Python，
+    子节点增删和样式修改时 Taffy 只把变化节点及其祖先标记为脏，其余子树使用缓存。
+    这里让读回也只走变化的部分：
+
+    - 结构或样式变化时沿父节点向上标记 _layout_stale，开销为 O(深度)
+    - 读回时，干净且尺寸未变的节点不再进入其子树（子树结果不会变化）
+    - 位置、尺寸发生变化或子树有变化的节点记入 changes，组件只更新这些 NSView 的 frame
+
+    依赖 stretchable 的私有实现（_update_layout、_box、_node_id、_taffy_layout、
+    taffylib.node_get_layout），pyproject.toml 固定了版本范围，
+    tests/core/test_layout.py 的 TestStretchableInternals 在这些属性变化时失败。
+    """
+
+    __slots__ = ("owner", "_layout_stale", "_previous_box")
+
+    # 当前布局计算中发生变化的 LayoutNode，由 LayoutEngine 在计算期间设置
+    changes: Optional[List["LayoutNode"]] = None
+
+    def __init__(self, *args, **kwargs):
+        self.owner: Optional["LayoutNode"] = None
+        self._layout_stale = True
+        self._previous_box = None
+        super().__init__(*args, **kwargs)
+
+    # st.Node 继承自 list，默认按内容比较：list.remove / in 会把子节点相同的兄弟当成同一个节点，
+    # Python 侧的子节点列表与 Taffy 不一致。节点只按身份比较。
+    __eq__ = object.__eq__
+    __ne__ = object.__ne__
+    __hash__ = st.Node.__hash__
+
+    def invalidate(self) -> None:
+        """标记本节点及其祖先需要重新读回布局"""
+        node = self
+        while isinstance(node, _IncrementalNode) and not node._layout_stale:
+            node._layout_stale = True
+            node = node.parent
+
+    def append(self, node):
+        super().append(node)
+        self.invalidate()
+
+    def remove(self, node):
+        super().remove(node)
+        self.invalidate()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.invalidate()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.invalidate()
+
+    @st.Node.style.setter
+    def style(self, style):
+        st.Node.style.fset(self, style)
+        self.invalidate()
+
+    def mark_dirty(self):
+        super().mark_dirty()
+        self.invalidate()
+
+    def _needs_relayout(self) -> bool:
+        """子节点是否需要重新读回：子树有变化、首次布局或本节点尺寸改变"""
+        if self._layout_stale or self._previous_box is None:
+            return True
+        box = self._box[st.Edge.BORDER]
+        previous = self._previous_box
+        return box.width != previous.width or box.height != previous.height
+
+    def _update_layout(self) -> None:
+        parent = self.parent
+        if isinstance(parent, _IncrementalNode) and not parent._needs_relayout():
+            return  # 父节点干净且尺寸未变，本子树的结果与上次相同
+
+        if not self._layout_stale and self._box:
+            # 干净节点（通常是变化节点的兄弟）：先只读 border box，未变化时跳过整个子树
+            _taffylib.node_get_layout(_taffy._ptr, self._node_id, self._taffy_layout)
+            layout, box = self._taffy_layout, self._box[st.Edge.BORDER]
+            if (layout.x, layout.y, layout.width, layout.height) == (
+                box.x,
+                box.y,
+                box.width,
+                box.height,
+            ):
+                return
+
+        self._previous_box = self._box[st.Edge.BORDER] if self._box else None
+        super()._update_layout()  # 读回本节点，子节点按上面的规则决定是否读回
+
+        changes = _IncrementalNode.changes
+        if changes is not None and self.owner is not None:
+            if self._layout_stale or self._box[st.Edge.BORDER] != self._previous_box:
+                changes.append(self.owner)
+        self._layout_stale = False
+
+
 class LayoutNode:
     """
     Hibiki UI Layout Node - Stretchable Node Wrapper
@@ -1211,6 +1383,10 @@ class LayoutNode:
         self.key = key or f"node_{id(component)}"
         self.children: List["LayoutNode"] = []
         self.parent: Optional["LayoutNode"] = None
+        # 在父节点 children 中的位置；增删子节点后由父节点的 index_of 按需重新编号
+        self._index_in_parent = -1
+        # children[:_indexed_upto] 的 _index_in_parent 都是准确的
+        self._indexed_upto = 0
 
         # 转换样式并创建Stretchable节点
         try:
@@ -1233,7 +1409,8 @@ class LayoutNode:
             logger.debug(f"🔍 调用st.Node()，参数类型: {type(stretchable_style)}")
 
             # 创建 Stretchable 节点
-            self._stretchable_node = st.Node(style=stretchable_style)
+            self._stretchable_node = _IncrementalNode(style=stretchable_style)
+            self._stretchable_node.owner = self
             logger.debug(
                 f"🔍 带样式Node创建结果: {type(self._stretchable_node) if self._stretchable_node is not None else 'None'}"
             )
@@ -1259,7 +1436,10 @@ class LayoutNode:
         logger.debug(f"📐 创建布局节点: {self.key} -> {component.__class__.__name__}")
 
     def add_child(self, child_node: "LayoutNode", index: Optional[int] = None):
-        """添加子节点 - v3风格直接操作"""
+        """添加子节点 - v3风格直接操作
+
+        index 为 None 或超出范围时追加到末尾，否则插入到 index 位置。
+        """
         # 确保子节点从原父节点完全移除
         if child_node.parent:
             child_node.parent.remove_child(child_node)
@@ -1272,12 +1452,20 @@ class LayoutNode:
         child_node.parent = self
 
         try:
-            # Simplified version: always use append, ignore index parameter
-            # This ensures compatibility with previous versions
-            self.children.append(child_node)
-            # v3风格：直接在Stretchable节点上操作
-            self._stretchable_node.append(child_node._stretchable_node)
-            logger.debug(f"🔍 Stretchable append 执行完成")
+            if index is None or index >= len(self.children):
+                child_node._index_in_parent = len(self.children)
+                if self._indexed_upto == len(self.children):
+                    self._indexed_upto += 1
+                self.children.append(child_node)
+                # v3风格：直接在Stretchable节点上操作
+                self._stretchable_node.append(child_node._stretchable_node)
+                logger.debug(f"🔍 Stretchable append 执行完成")
+            else:
+                index = max(index, 0)
+                self.children.insert(index, child_node)
+                self._indexed_upto = min(self._indexed_upto, index)
+                self._sync_stretchable_children(index)
+                logger.debug(f"🔍 Stretchable 插入执行完成: index={index}")
 
             # 验证添加结果（使用Python list接口）
             actual_children = len(self._stretchable_node)
@@ -1313,36 +1501,147 @@ class LayoutNode:
         3. 先清空父引用，再执行移除操作
         4. 全程异常保护，确保不影响应用运行
         """
-        if child_node not in self.children:
+        index = self.index_of(child_node)
+        if index < 0:
             logger.debug(f"⚠️ 子节点不在父节点列表中: {child_node.key}")
             return
 
         # 第一步：从Python层移除节点引用
-        self.children.remove(child_node)
+        self._detach_child_at(index)
 
         # 第二步：安全移除底层Stretchable节点
-        self._safe_remove_stretchable_child(child_node)
+        self._safe_remove_stretchable_child(child_node, index)
 
         # 第三步：清理节点间的引用关系
         child_node.parent = None
 
         logger.debug(f"✅ 安全移除子节点完成: {self.key} <- {child_node.key}")
 
-    def _safe_remove_stretchable_child(self, child_node: "LayoutNode"):
+    def move_child(self, child_node: "LayoutNode", index: int) -> bool:
+        """
+        把子节点移动到 index 位置（节点保持挂载，不重建）
+
+        index 按移动后的子节点列表计算，超出范围时移动到末尾。
+        """
+        old_index = self.index_of(child_node)
+        if old_index < 0:
+            logger.debug(f"⚠️ 要移动的子节点不在父节点列表中: {child_node.key}")
+            return False
+
+        index = max(0, min(index, len(self.children) - 1))
+        if index == old_index:
+            return True
+
+        self.children.pop(old_index)
+        self.children.insert(index, child_node)
+        start = min(old_index, index)
+        self._indexed_upto = min(self._indexed_upto, start)
+        self._sync_stretchable_children(start)
+        logger.debug(f"↕️ 移动子节点: {child_node.key} {old_index} -> {index}")
+        return True
+
+    def reorder_children(self, ordered_nodes: List["LayoutNode"]) -> bool:
+        """
+        按 ordered_nodes 重新排列全部子节点
+
+        ordered_nodes 必须恰好是现有子节点的一个排列。
+        Taffy 中只重建第一个变化位置之后的子节点，前面不变的部分不受影响。
+        """
+        children = self.children
+        if (
+            len(ordered_nodes) != len(children)
+            or any(node.parent is not self for node in ordered_nodes)
+            or len({id(node) for node in ordered_nodes}) != len(children)
+        ):
+            logger.warning(f"⚠️ 重排的节点与现有子节点不一致: {self.key}")
+            return False
+
+        start = 0
+        while start < len(children) and children[start] is ordered_nodes[start]:
+            start += 1
+        if start == len(children):
+            return True
+
+        children[start:] = ordered_nodes[start:]
+        self._indexed_upto = min(self._indexed_upto, start)
+        self._sync_stretchable_children(start)
+        logger.debug(f"↕️ 重排子节点: {self.key} 从位置 {start} 开始")
+        return True
+
+    def _sync_stretchable_children(self, start: int):
+        """
+        让 Stretchable 子节点从 start 开始与 children 一致
+
+        Taffy 只提供追加和按位置移除，插入与移动通过截断 start 之后的子节点
+        再按新顺序追加实现；子节点本身及其子树保留，不会重新创建。
+        """
+        stretchable_node = self._stretchable_node
+        del stretchable_node[start:]
+        for child_node in self.children[start:]:
+            stretchable_node.append(child_node._stretchable_node)
+
+    def index_of(self, child_node: "LayoutNode") -> int:
+        """
+        子节点在 children 中的位置，不是本节点的子节点时返回 -1
+
+        位置记录在子节点上，命中时为 O(1)；中间位置增删后，
+        首次查询会重新编号受影响的后半段。
+        """
+        if child_node.parent is not self:
+            return -1
+        if self._child_at_recorded_index(child_node):
+            return child_node._index_in_parent
+
+        self._renumber_children(self._indexed_upto)
+        if not self._child_at_recorded_index(child_node):
+            self._renumber_children(0)  # children 被直接修改过，全部重新编号
+            if not self._child_at_recorded_index(child_node):
+                return -1
+        return child_node._index_in_parent
+
+    def _child_at_recorded_index(self, child_node: "LayoutNode") -> bool:
+        index = child_node._index_in_parent
+        return 0 <= index < len(self.children) and self.children[index] is child_node
+
+    def _renumber_children(self, start: int):
+        children = self.children
+        for i in range(start, len(children)):
+            children[i]._index_in_parent = i
+        self._indexed_upto = len(children)
+
+    def _detach_child_at(self, index: int) -> "LayoutNode":
+        """从 children 中取出指定位置的子节点，之后的位置记录待重新编号"""
+        child_node = self.children.pop(index)
+        child_node._index_in_parent = -1
+        self._indexed_upto = min(self._indexed_upto, index)
+        return child_node
+
+    def _safe_remove_stretchable_child(self, child_node: "LayoutNode", index: Optional[int] = None):
         """
         安全移除Stretchable子节点的内部方法
 
         这是解决Taffy崩溃问题的核心方法，通过多重检查和
         异常保护确保底层Rust节点的安全移除。
+
+        index 为子节点在 Python 层的位置；与 Stretchable 子节点一致时按位置移除，
+        不再线性查找。
         """
         try:
             stretchable_child = child_node._stretchable_node
-            if not stretchable_child:
+            if stretchable_child is None:
                 logger.debug("⚠️ 子节点的Stretchable节点为空，跳过移除")
                 return
 
+            stretchable_parent = self._stretchable_node
+            if (
+                index is not None
+                and index < len(stretchable_parent)
+                and stretchable_parent[index] is stretchable_child
+            ):
+                del stretchable_parent[index]
+                logger.debug("🔗 Stretchable子节点按位置移除成功")
             # 关键检查：确保节点确实存在于父节点中
-            if stretchable_child in self._stretchable_node:
+            elif stretchable_child in self._stretchable_node:
                 # 步骤1：先断开父引用，防止循环引用导致的问题
                 if hasattr(stretchable_child, "parent"):
                     stretchable_child.parent = None
@@ -1365,6 +1664,8 @@ class LayoutNode:
     def update_style(self, style: ComponentStyle):
         """更新节点样式"""
         stretchable_style = StyleConverter.convert_to_stretchable_style(style)
+        if stretchable_style is self._stretchable_node.style:
+            return  # 布局属性未变（只改了颜色等视觉属性），无需重新布局
         self._stretchable_node.style = stretchable_style
         self.mark_dirty()
 
@@ -1416,6 +1717,17 @@ class LayoutEngine:
         self._layout_calls = 0
         self._cache_hits = 0
         self._cache_misses = 0
+        self._frames_changed = 0
+
+        # 最近一次布局计算中 frame 需要更新的节点（增量布局）
+        self._layout_changes: List[LayoutNode] = []
+        self._layout_changes_root = None
+
+        # 布局调度：同一帧内的布局请求按布局树的根合并，每个根只布局一次
+        self._pending_roots: Dict[Any, None] = {}  # 有序集合
+        self._flush_scheduled = False
+        self._layout_requests = 0
+        self._layout_passes = 0
 
         # 布局专用文件日志器
         self.layout_file_logger = LayoutFileLogger()
@@ -1500,6 +1812,25 @@ class LayoutEngine:
 
         parent_node.add_child(child_node, index)
 
+    def move_child_relationship(self, parent_component, child_component, index: int) -> bool:
+        """把子组件的布局节点移动到父节点的 index 位置，节点不重建"""
+        parent_node = self.get_node_for_component(parent_component)
+        child_node = self.get_node_for_component(child_component)
+        if not parent_node or not child_node:
+            return False
+        return parent_node.move_child(child_node, index)
+
+    def reorder_child_relationships(self, parent_component, ordered_children) -> bool:
+        """按 ordered_children 的顺序重排父组件的全部子布局节点"""
+        parent_node = self.get_node_for_component(parent_component)
+        if not parent_node:
+            return False
+        ordered_nodes = [self.get_node_for_component(child) for child in ordered_children]
+        if any(node is None for node in ordered_nodes):
+            logger.warning(f"⚠️ 重排的子组件缺少布局节点: {parent_component.__class__.__name__}")
+            return False
+        return parent_node.reorder_children(ordered_nodes)
+
     def remove_child_relationship(self, parent_component, child_component):
         """
         Safely remove a parent-child layout relationship.
@@ -1594,8 +1925,9 @@ class LayoutEngine:
     def _force_remove_child_relationship(self, parent_node, child_node):
         """强制清理父子关系 - 最后的保险措施"""
         # 从Python层强制移除引用
-        if child_node in parent_node.children:
-            parent_node.children.remove(child_node)
+        index = parent_node.index_of(child_node)
+        if index >= 0:
+            parent_node._detach_child_at(index)
 
         # 断开子节点的父引用
         child_node.parent = None
@@ -1603,7 +1935,7 @@ class LayoutEngine:
         # 尝试从Stretchable层也移除（如果可能）
         try:
             stretchable_child = child_node._stretchable_node
-            if stretchable_child and hasattr(stretchable_child, "parent"):
+            if stretchable_child is not None and hasattr(stretchable_child, "parent"):
                 stretchable_child.parent = None
         except:
             pass  # 如果Stretchable层已损坏，忽略错误
@@ -1680,14 +2012,15 @@ class LayoutEngine:
         """清理所有子节点的内部方法"""
         try:
             # 创建子节点列表的副本，避免迭代时修改原列表
-            children = list(stretchable_node) if stretchable_node else []
+            count = len(stretchable_node) if stretchable_node else 0
 
-            if children:
-                logger.debug(f"🧹 开始清理 {len(children)} 个子节点")
+            if count:
+                logger.debug(f"🧹 开始清理 {count} 个子节点")
 
-                for i, child in enumerate(children):
+                # 从末尾按位置移除，每次移除不需要查找和移动其余子节点
+                for i in reversed(range(count)):
                     try:
-                        self._cleanup_single_child(stretchable_node, child, i)
+                        self._cleanup_single_child(stretchable_node, i)
                     except Exception as e:
                         logger.debug(f"⚠️ 清理第 {i} 个子节点异常: {e}")
             else:
@@ -1696,17 +2029,13 @@ class LayoutEngine:
         except Exception as e:
             logger.debug(f"⚠️ 获取子节点列表异常: {e}")
 
-    def _cleanup_single_child(self, parent_node, child_node, index):
+    def _cleanup_single_child(self, parent_node, index):
         """清理单个子节点"""
         try:
             # 检查子节点是否仍在父节点中
-            if child_node in parent_node:
-                # 先断开父引用
-                if hasattr(child_node, "parent"):
-                    child_node.parent = None
-
-                # 从父节点移除
-                parent_node.remove(child_node)
+            if index < len(parent_node):
+                # 从父节点移除（同时断开父引用）
+                del parent_node[index]
                 logger.debug(f"🗑️ 子节点 [{index}] 清理成功")
             else:
                 logger.debug(f"⚠️ 子节点 [{index}] 已不在父节点中")
@@ -1761,11 +2090,11 @@ class LayoutEngine:
         stretchable_node = node._stretchable_node
         logger.debug(f"🔍 直接布局计算，子节点数: {len(stretchable_node)} (Python list接口)")
 
-        # 执行布局计算
+        # 执行布局计算：增量模式，不重置布局状态，Taffy 对干净的子树使用缓存，
+        # 读回时只进入有变化的子树，变化的节点记入 changes
+        changes: List[LayoutNode] = []
+        _IncrementalNode.changes = changes
         try:
-            # 关键修复：在布局计算前重置布局状态，避免递归可见性检查错误
-            self._reset_layout_state(stretchable_node)
-
             success = stretchable_node.compute_layout(available_size)
             if not success:
                 logger.warning(f"⚠️ 组件布局计算失败: {component.__class__.__name__}")
@@ -1790,6 +2119,12 @@ class LayoutEngine:
 
                 logger.error(f"❌ 详细错误: {traceback.format_exc()}")
                 return None
+        finally:
+            _IncrementalNode.changes = None
+
+        self._layout_changes = changes
+        self._layout_changes_root = component
+        self._frames_changed += len(changes)
 
         # 获取结果
         box = stretchable_node.get_box()
@@ -1862,6 +2197,28 @@ class LayoutEngine:
 
         return result
 
+    def take_layout_changes(self, component) -> List[LayoutNode]:
+        """
+        取出最近一次布局计算中 frame 需要更新的后代节点（不含 component 本身）
+
+        只有在 component 正是最近一次计算的根时才能使用增量结果，
+        否则返回其全部后代，由调用方全部重新应用。
+        """
+        if component is self._layout_changes_root:
+            changes = self._layout_changes
+            self._layout_changes = []
+            self._layout_changes_root = None
+            return [node for node in changes if node.component is not component]
+
+        node = self.get_node_for_component(component)
+        descendants: List[LayoutNode] = []
+        stack = list(reversed(node.children)) if node else []
+        while stack:
+            child = stack.pop()
+            descendants.append(child)
+            stack.extend(reversed(child.children))
+        return descendants
+
     def _reset_layout_state(self, stretchable_node):
         """重置布局状态，解决可见性检查循环问题"""
         try:
@@ -1997,26 +2354,96 @@ class LayoutEngine:
             return None
 
     def update_component_style(self, component):
-        """更新组件样式并重新应用布局"""
+        """更新组件样式，重新布局在本帧结束前与其他请求合并执行"""
         node = self.get_node_for_component(component)
         if node and hasattr(component, "style"):
-            # 1. 更新节点样式
+            # 1. 更新节点样式（标记脏）
             node.update_style(component.style)
             logger.debug(f"🎨 更新组件样式: {component.__class__.__name__}")
 
-            # 2. 重新计算这个组件的布局
-            layout_result = self.compute_layout_for_component(component)
-            logger.debug(f"📐 重新计算组件布局: {component.__class__.__name__}")
+            # 2. 请求重新布局其所在的布局树
+            self.request_layout(component)
 
-            # 🔥 3. 关键修复：将布局结果应用到NSView上
-            if layout_result and hasattr(component, "_apply_layout_result"):
-                component._apply_layout_result(layout_result)
-                logger.debug(f"🎯 应用布局结果到NSView: {component.__class__.__name__}")
+    # =====================================
+    # 布局调度
+    # =====================================
 
-                # 🔥 4. 应用子组件的布局（Grid项目的位置）
-                if hasattr(component, "_apply_children_layout"):
-                    component._apply_children_layout(self)
-                    logger.debug(f"🔲 应用子组件布局: {component.__class__.__name__}")
+    def request_layout(self, component):
+        """
+        请求重新布局组件所在的布局树
+
+        同一帧（已安装帧调度器时）或同一个响应式批处理内的多次请求按布局树的根合并，
+        每个根只计算、应用一次布局。两者都不可用时（脚本、测试）立即执行。
+        """
+        self._layout_requests += 1
+        self._pending_roots[self._find_layout_root(component)] = None
+
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+
+        if _frame_dispatcher is not None:
+            _frame_dispatcher(self.flush_layout)
+        elif not call_after_batch(self.flush_layout):
+            self.flush_layout()
+
+    def flush_layout(self) -> int:
+        """立即执行所有待处理的布局，返回执行的布局次数"""
+        self._flush_scheduled = False
+        passes = 0
+        # 应用布局时可能产生新的请求，最多再处理几轮
+        for _ in range(_MAX_LAYOUT_FLUSH_ROUNDS):
+            if not self._pending_roots:
+                break
+            roots = list(self._pending_roots)
+            self._pending_roots.clear()
+            for root in roots:
+                if self._perform_layout(root):
+                    passes += 1
+        else:
+            if self._pending_roots:
+                logger.warning(f"⚠️ 布局请求循环，丢弃 {len(self._pending_roots)} 个待处理的根")
+                self._pending_roots.clear()
+        return passes
+
+    def get_scheduler_stats(self) -> dict:
+        """布局调度统计：请求数、实际布局次数、被合并掉的次数"""
+        return {
+            "requests": self._layout_requests,
+            "passes": self._layout_passes,
+            "coalesced": self._layout_requests - self._layout_passes,
+            "pending": len(self._pending_roots),
+        }
+
+    def _find_layout_root(self, component):
+        """组件所在布局树的根组件"""
+        node = self.get_node_for_component(component)
+        if node is None:
+            return component
+        while node.parent is not None:
+            node = node.parent
+        return node.component
+
+    def _perform_layout(self, root) -> bool:
+        """计算一棵布局树并把变化的 frame 应用到 NSView"""
+        if root not in self._component_nodes:
+            return False  # 组件已清理
+
+        if hasattr(root, "_get_available_size_from_parent"):
+            available_size = root._get_available_size_from_parent()
+        else:
+            available_size = None
+
+        layout_result = self.compute_layout_for_component(root, available_size)
+        if not layout_result:
+            return False
+        self._layout_passes += 1
+
+        if getattr(root, "_nsview", None) and hasattr(root, "_apply_layout_result"):
+            root._apply_layout_result(layout_result)
+            if hasattr(root, "_apply_children_layout"):
+                root._apply_children_layout(self)
+        return True
 
     def recalculate_all_layouts(self):
         """响应窗口大小变化，重新计算所有布局
@@ -2046,6 +2473,7 @@ class LayoutEngine:
                     # 🔧 关键修复：不仅计算布局，还要应用到NSView
                     available_size = window_size
                     layout_result = self.compute_layout_for_component(component, available_size)
+                    self._pending_roots.pop(component, None)
 
                     if layout_result and hasattr(component, "_apply_layout_result"):
                         # 应用根容器布局
@@ -2089,6 +2517,7 @@ class LayoutEngine:
 
             # 清理映射
             del self._component_nodes[component]
+            self._pending_roots.pop(component, None)
             logger.debug(f"🧹 清理组件布局节点: {component.__class__.__name__}")
 
     def debug_print_stats(self):
@@ -2097,7 +2526,17 @@ class LayoutEngine:
         logger.info("📊 Hibiki UI 布局引擎状态报告")
         logger.info("=" * 50)
         logger.info(f"🔄 布局计算调用次数: {self._layout_calls}")
+        logger.info(f"🖼️ 更新的frame数量: {self._frames_changed}")
+        logger.info(
+            f"🗓️ 布局请求: {self._layout_requests}, 实际布局: {self._layout_passes}, "
+            f"合并: {self._layout_requests - self._layout_passes}"
+        )
         logger.info(f"📐 活跃布局节点数量: {len(self._component_nodes)}")
+        style_stats = StyleConverter.get_cache_stats()
+        logger.info(
+            f"🎨 样式转换: {style_stats['conversions']}, 缓存命中: {style_stats['hits']}, "
+            f"已缓存: {style_stats['cached']}"
+        )
         logger.info(f"🧠 缓存启用状态: {self.enable_cache}")
         logger.info(f"🐛 调试模式状态: {self.debug_mode}")
 
@@ -2139,6 +2578,9 @@ class LayoutEngine:
                         "cache_hits": self._cache_hits,
                         "cache_calls": cache_calls,
                         "avg_layout_time_ms": round(avg_time, 2),
+                        "frames_changed": self._frames_changed,
+                        "scheduler": self.get_scheduler_stats(),
+                        "style_conversion": StyleConverter.get_cache_stats(),
                     },
                     "component_distribution": component_types,
                     "summary": {
@@ -2187,7 +2629,7 @@ class LayoutEngine:
                     # 检查父子关系一致性
                     if hasattr(component, "parent") and component.parent:
                         parent_node = self.get_node_for_component(component.parent)
-                        if parent_node and node not in parent_node.children:
+                        if parent_node and parent_node.index_of(node) < 0:
                             health_status["orphaned_nodes"] += 1
                             health_status["warnings"].append(
                                 f"组件 {component.__class__.__name__} 存在孤立的布局节点"
@@ -2268,29 +2710,7 @@ class LayoutEngine:
             return {"error": "未找到布局节点"}
 
         try:
-            info = {
-                "component_type": component.__class__.__name__,
-                "node_key": getattr(node, "key", "unknown"),
-                "children_count": len(node.children),
-                "has_parent": node.parent is not None,
-                "stretchable_valid": node._stretchable_node is not None,
-                "children": [],
-            }
-
-            # 递归获取子节点信息
-            for child_node in node.children:
-                child_component = None
-                # 找到对应的组件
-                for comp, n in self._component_nodes.items():
-                    if n == child_node:
-                        child_component = comp
-                        break
-
-                if child_component:
-                    child_info = self.get_node_tree_info(child_component)
-                    info["children"].append(child_info)
-                else:
-                    info["children"].append({"error": "找不到对应的组件"})
+            info = self._node_tree_info(node)
 
             # 输出到布局专用文件日志（JSON格式）
             if self.layout_file_logger.is_enabled():
@@ -2309,10 +2729,32 @@ class LayoutEngine:
 
             return error_info
 
+    def _node_tree_info(self, node: LayoutNode) -> dict:
+        """节点子树信息，通过节点上的组件引用找到子组件，整棵树 O(n)"""
+        info = {
+            "component_type": node.component.__class__.__name__,
+            "node_key": getattr(node, "key", "unknown"),
+            "children_count": len(node.children),
+            "has_parent": node.parent is not None,
+            "stretchable_valid": node._stretchable_node is not None,
+            "children": [],
+        }
+
+        for child_node in node.children:
+            if self._component_nodes.get(child_node.component) is child_node:
+                info["children"].append(self._node_tree_info(child_node))
+            else:
+                info["children"].append({"error": "找不到对应的组件"})
+
+        return info
+
 
 # 全局布局引擎实例
 _global_layout_engine: Optional[LayoutEngine] = None
 
+# 帧调度器，由 AppManager 安装；未安装时布局请求在响应式批处理结束时执行
+_frame_dispatcher: Optional[Callable[[Callable[[], None]], Any]] = None
+
 
 def get_layout_engine() -> LayoutEngine:
     """获取全局布局引擎实例"""
@@ -2327,6 +2769,17 @@ def set_debug_mode(enabled: bool):
     get_layout_engine().debug_mode = enabled
 
 
+def set_layout_frame_dispatcher(dispatcher: Optional[Callable[[Callable[[], None]], Any]]) -> None:
+    """安装帧调度器：dispatcher(fn) 需要安排 fn 在 UI 线程下一次绘制之前执行一次"""
+    global _frame_dispatcher
+    _frame_dispatcher = dispatcher
+
+
+def flush_layout() -> int:
+    """立即执行所有待处理的布局（例如在读取 frame 之前），返回执行的布局次数"""
+    return get_layout_engine().flush_layout()
+
+
 # ================================
 # 测试代码
 # ================================
@@ -34,6 +34,15 @@ from Foundation import (
     NSStringFromSelector,
 )
 
+# CoreFoundation imports
+from CoreFoundation import (
+    CFRunLoopAddObserver,
+    CFRunLoopGetMain,
+    CFRunLoopObserverCreateWithHandler,
+    kCFRunLoopBeforeWaiting,
+    kCFRunLoopCommonModes,
+)
+
 # Quartz imports
 from Quartz import (
     CATransform3DIdentity,
@@ -46,6 +55,7 @@ from Quartz import (
 from PyObjCTools import AppHelper
 
 from .logging import get_logger
+from .reactive import bind_ui_thread, set_main_thread_dispatcher
 
 logger = get_logger("core.managers")
 logger.setLevel("INFO")
@@ -918,6 +928,23 @@ class AppManager:
 
         self._app.setMainMenu_(main_menu)
 
+        # 🧵 后台线程写入的 Signal 排队到主循环统一生效
+        bind_ui_thread()
+        set_main_thread_dispatcher(AppHelper.callAfter)
+
+        # 🗓️ 同一轮主循环内的布局请求合并，在绘制之前统一计算
+        from .layout import set_layout_frame_dispatcher
+
+        set_layout_frame_dispatcher(self._schedule_before_display)
+
+    @staticmethod
+    def _schedule_before_display(fn: Callable[[], None]) -> None:
+        """在本轮主循环进入等待之前执行一次 fn，排在 Core Animation 提交和视图绘制之前"""
+        observer = CFRunLoopObserverCreateWithHandler(
+            None, kCFRunLoopBeforeWaiting, False, 0, lambda observer, activity: fn()
+        )
+        CFRunLoopAddObserver(CFRunLoopGetMain(), observer, kCFRunLoopCommonModes)
+
     def create_window(self, title: str, width: int = 800, height: int = 600) -> AppWindow:
         """创建新窗口"""
         window = AppWindow(title, width, height)
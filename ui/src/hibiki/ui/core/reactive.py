@@ -1,7 +1,9 @@
+import operator
 import threading
+import weakref
 from collections import deque
 from contextvars import ContextVar
-from typing import Callable, Generic, Optional, TypeVar, Dict, Set, Union, Any
+from typing import Callable, Generic, NamedTuple, Optional, TypeVar, Dict, List, Set, Union, Any
 
 T = TypeVar("T")
 
@@ -9,7 +11,6 @@ T = TypeVar("T")
 _global_version = 0
 _batch_depth = 0
 _deferred_updates: deque = deque()
-_batch_lock = threading.Lock()
 
 # 导入日志系统
 from .logging import get_logger
@@ -17,107 +18,370 @@ from .logging import get_logger
 logger = get_logger("signal")
 logger.setLevel("INFO")
 
+# 🔬 追踪开关：关闭时热路径（get/set/通知/Effect执行）不做任何日志格式化
+# 只在排查响应式问题时通过 set_reactive_tracing(True) 打开
+_trace = False
 
-# 🆕 优化的批处理系统
+
+def set_reactive_tracing(enabled: bool) -> None:
+    """打开/关闭响应式核心的调试追踪日志"""
+    global _trace
+    _trace = bool(enabled)
+    logger.setLevel("DEBUG" if _trace else "INFO")
+
+
+def is_reactive_tracing() -> bool:
+    """当前是否开启了响应式追踪"""
+    return _trace
+
+
+# 🆕 推拉式调度 (push-pull)
+# push 阶段只沿观察者链标记状态；pull 阶段按高度顺序拉取，每个节点每轮最多重算一次
+_CLEAN = 0  # 值是最新的
+_CHECK = 1  # 某个上游 Computed 可能变化，需要先拉取上游再决定
+_DIRTY = 2  # 直接依赖的 Signal 已变化，必须重算
+
+_MAX_FLUSH_ROUNDS = 100  # Effect 互相写入导致的循环保护
+_SMALL_DEPS = 8  # 依赖数不超过该阈值时只用列表线性查重，超过才建立集合索引
+_MAX_HEIGHT = 1 << 30
+_weak_ref = weakref.ref
+_flushing = False
+
+
+# 批处理状态只在 UI 线程上读写（其他线程的写入会被转交到 UI 线程），因此无需加锁
 def _start_batch():
     """开始批处理"""
     global _batch_depth
-    with _batch_lock:
-        _batch_depth += 1
-        if _batch_depth == 1:
-            logger.debug(f"🚀 开始批处理 (深度: {_batch_depth})")
+    _batch_depth += 1
 
 
 def _end_batch():
     """结束批处理并刷新更新"""
     global _batch_depth
-    with _batch_lock:
-        _batch_depth -= 1
-        if _batch_depth == 0:
-            logger.debug(f"🏁 结束批处理，处理 {len(_deferred_updates)} 个排队更新")
-            _flush_deferred_updates()
+    _batch_depth -= 1
+    if _batch_depth == 0:
+        _flush_deferred_updates()
+        if _after_batch_callbacks and not _flushing:
+            _run_after_batch_callbacks()
+
+
+# 批处理（包括其中触发的 Effect）全部结束后执行的回调，例如布局引擎合并后的布局
+_after_batch_callbacks: List[Callable[[], None]] = []
+
+
+def call_after_batch(fn: Callable[[], None]) -> bool:
+    """在当前批处理及其 Effect 全部执行完之后调用 fn
+
+    不在批处理中时不登记，返回 False，由调用方决定是否立即执行。
+    """
+    if _batch_depth == 0 and not _flushing:
+        return False
+    _after_batch_callbacks.append(fn)
+    return True
+
+
+def _run_after_batch_callbacks():
+    while _after_batch_callbacks:
+        callbacks = _after_batch_callbacks[:]
+        _after_batch_callbacks.clear()
+        for fn in callbacks:
+            try:
+                fn()
+            except Exception as e:
+                logger.error(f"❌ 批处理结束回调错误: {e}")
 
 
 def _enqueue_update(observer):
     """将更新加入队列"""
     _deferred_updates.append(observer)
-    logger.debug(f"📥 更新入队: {type(observer).__name__}[{id(observer)}]")
+    if _trace:
+        logger.debug(f"📥 更新入队: {type(observer).__name__}[{id(observer)}]")
 
 
-def _flush_deferred_updates():
-    """🆕 批处理刷新 - 真正的动态队列处理"""
-    if not _deferred_updates:
+# 📦 紧凑依赖存储
+# 观察者只用一个列表 _sources 记录依赖（强引用）；依赖数超过 _SMALL_DEPS 时才额外建立
+# _source_index 集合用于 O(1) 查重。源节点的观察者 _obs 只保存弱引用，同样先用列表，
+# 超过阈值再升级为集合——Signal 不会让已无人持有的 Effect/Computed 继续存活。
+# 变化检测不再按依赖记录版本，而是比较全局版本戳：
+# 源节点记录最后一次值变化时的 _changed_at，观察者记录最后一次执行/校验时的 _verified_at。
+
+
+# 🧵 线程亲和性
+# 响应式图只在 UI 线程（默认是主线程）上修改。其他线程的 Signal.set 不直接生效，
+# 而是放入线程安全的队列，并通过调度器（例如 AppHelper.callAfter）在下一次主循环时统一写入。
+# 没有安装调度器时（脚本、测试）写入同样只排队，需要 UI 线程自己调用 drain_pending_writes()。
+_get_ident = threading.get_ident
+_ui_thread_id = threading.main_thread().ident
+_main_thread_dispatcher: Optional[Callable[[Callable[[], None]], Any]] = None
+_pending_writes: deque = deque()  # (fn, args)，deque 的 append/popleft 是线程安全的
+_drain_lock = threading.Lock()
+_drain_scheduled = False
+_warned_no_dispatcher = False
+_thread_check = False
+_cross_thread_writes = 0
+
+
+def set_main_thread_dispatcher(dispatcher: Optional[Callable[[Callable[[], None]], Any]]) -> None:
+    """安装主循环调度器：dispatcher(fn) 需要安排 fn 在 UI 线程的下一次循环中执行"""
+    global _main_thread_dispatcher
+    _main_thread_dispatcher = dispatcher
+
+
+def bind_ui_thread(thread_id: Optional[int] = None) -> None:
+    """把响应式图绑定到指定线程（默认当前线程）"""
+    global _ui_thread_id
+    _ui_thread_id = _get_ident() if thread_id is None else thread_id
+
+
+def set_thread_check(enabled: bool) -> None:
+    """调试模式：跨线程写入 Signal 时输出警告和调用栈"""
+    global _thread_check
+    _thread_check = bool(enabled)
+
+
+def _set_from_other_thread(signal, value) -> None:
+    """非 UI 线程的写入：排队等待 UI 线程处理"""
+    _run_on_ui_thread(signal, signal._write, value)
+
+
+def _run_on_ui_thread(target, fn: Callable[..., Any], *args) -> None:
+    """把对 target（Signal 或 run_on_ui_thread 提交的函数）的一次修改 fn(*args) 转交给 UI 线程"""
+    global _drain_scheduled, _cross_thread_writes, _warned_no_dispatcher
+    _cross_thread_writes += 1
+    if _thread_check:
+        import traceback
+
+        logger.warning(
+            f"⚠️ 跨线程写入 {type(target).__name__}[{id(target)}] (线程: {threading.current_thread().name})\n"
+            + "".join(traceback.format_stack(limit=8)[:-3])
+        )
+
+    _pending_writes.append((fn, args))
+    dispatcher = _main_thread_dispatcher
+    if dispatcher is None:
+        if not _warned_no_dispatcher:
+            _warned_no_dispatcher = True
+            logger.warning("⚠️ 未安装主线程调度器：跨线程写入已排队，需在 UI 线程调用 drain_pending_writes()")
         return
 
-    processed_ids: Set[int] = set()
-    round_number = 1
+    with _drain_lock:
+        if _drain_scheduled:
+            return
+        _drain_scheduled = True
+    dispatcher(drain_pending_writes)
 
-    # 🔄 真正动态的处理：每处理完一批，立即检查是否有新观察者
-    while True:
-        # 收集当前队列中的所有观察者（快照）
-        current_batch = []
 
-        # 获取当前队列快照
-        queue_snapshot = list(_deferred_updates)
-        _deferred_updates.clear()
+def run_on_ui_thread(fn: Callable[..., Any], *args) -> None:
+    """在 UI 线程上执行 fn(*args)
 
-        for observer in queue_snapshot:
-            observer_id = id(observer)
-            if observer_id not in processed_ids:
-                current_batch.append(observer)
-                processed_ids.add(observer_id)
-            else:
-                logger.debug(f"⏭️  跳过重复更新: {type(observer).__name__}[{observer_id}]")
+    已在 UI 线程时立即执行；否则与跨线程的 Signal 写入进入同一个队列，按提交顺序执行。
+    适合需要在执行时读取最新状态的复合修改（先读列表再按位置修改）。
+    """
+    if _get_ident() == _ui_thread_id:
+        fn(*args)
+    else:
+        _run_on_ui_thread(fn, fn, *args)
 
-        if not current_batch:
-            break
 
-        # 🚀 按依赖顺序排序：Computed -> Effect
-        def get_priority(observer):
-            if observer.__class__.__name__ == "Computed":
-                return 0  # 最高优先级
-            elif observer.__class__.__name__ == "Effect":
-                return 1  # 中等优先级
-            else:
-                return 2  # 最低优先级
+def drain_pending_writes() -> int:
+    """在 UI 线程上应用排队的跨线程写入，返回处理的写入数
 
-        current_batch.sort(key=get_priority)
+    同一轮内的所有写入在一个批处理中生效，对同一个 Signal 的多次写入只触发一次下游更新。
+    """
+    global _drain_scheduled
+    with _drain_lock:
+        _drain_scheduled = False
+    if not _pending_writes:
+        return 0
+
+    count = 0
+    _start_batch()
+    try:
+        while _pending_writes:
+            fn, args = _pending_writes.popleft()
+            fn(*args)
+            count += 1
+    finally:
+        _end_batch()
+    return count
 
-        logger.debug(f"🔄 第{round_number}轮：按依赖顺序处理 {len(current_batch)} 个观察者")
-        for i, observer in enumerate(current_batch):
-            logger.debug(
-                f"   {i+1}. {type(observer).__name__}[{id(observer)}] (优先级: {get_priority(observer)})"
-            )
 
-        # 按排序后的顺序执行更新
-        for observer in current_batch:
-            logger.debug(f"⚡ 执行更新: {type(observer).__name__}[{id(observer)}]")
+def _track_dependency(source, observer) -> None:
+    """记录 observer 对 source 的依赖，并维护 observer 的拓扑高度"""
+    sources = observer._sources
+    index = observer._source_index
+    if index is None:
+        if source in sources:
+            return
+        if len(sources) >= _SMALL_DEPS:
+            observer._source_index = index = set(sources)
+            index.add(source)
+    elif source in index:
+        return
+    else:
+        index.add(source)
+    sources.append(source)
+    _subscribe(source, observer)
+
+    height = source._height + 1
+    if height > observer._height:
+        observer._height = height
+
+
+def _subscribe(source, observer) -> None:
+    """把 observer 的弱引用加入 source 的观察者（调用方负责查重）"""
+    # 无回调的 weakref.ref 由解释器缓存，同一个观察者的所有订阅共用一个引用对象
+    ref = _weak_ref(observer)
+    observers = source._obs
+    if observers is None:
+        source._obs = [ref]
+    elif type(observers) is list:
+        observers.append(ref)
+        if len(observers) > _SMALL_DEPS:
+            # 升级时顺便丢弃已被回收的观察者
+            source._obs = {r for r in observers if r() is not None}
+    else:
+        observers.add(ref)
+
+
+def _unsubscribe(source, observer) -> None:
+    """从 source 的观察者中移除 observer"""
+    observers = source._obs
+    if observers is None:
+        return
+    ref = _weak_ref(observer)
+    if type(observers) is list:
+        try:
+            observers.remove(ref)
+        except ValueError:
+            pass
+    else:
+        observers.discard(ref)
+
+
+def _live_observers(source) -> List[Any]:
+    """source 当前存活的观察者快照，同时清理已被回收的弱引用"""
+    observers = source._obs
+    if not observers:
+        return []
+    live = []
+    dead = None
+    for ref in observers:
+        observer = ref()
+        if observer is None:
+            if dead is None:
+                dead = []
+            dead.append(ref)
+        else:
+            live.append(observer)
+    if dead is not None:
+        if type(observers) is list:
+            source._obs = [ref for ref in observers if ref() is not None]
+        else:
+            observers.difference_update(dead)
+    return live
+
 
-            try:
-                if hasattr(observer, "_rerun") and hasattr(observer, "_active"):
-                    if observer._active:
-                        logger.debug(f"   调用 {type(observer).__name__}._rerun() - active")
-                        observer._rerun()
-                    else:
-                        logger.debug(f"   跳过 {type(observer).__name__} - inactive")
-                elif hasattr(observer, "_rerun"):
-                    logger.debug(f"   调用 {type(observer).__name__}._rerun() - no active check")
-                    observer._rerun()
-                else:
-                    logger.debug(f"   直接调用 {type(observer).__name__}()")
-                    observer()
-            except Exception as e:
-                logger.error(f"❌ 批处理更新错误: {e}")
+def _untrack_all(observer) -> None:
+    """解除 observer 对所有依赖的订阅（保留列表的已分配空间）"""
+    sources = observer._sources
+    for dep in sources:
+        _unsubscribe(dep, observer)
+    sources.clear()
+    observer._source_index = None
 
-        # 检查处理完这一轮后是否有新观察者
-        if _deferred_updates:
-            logger.debug(
-                f"🔄 第{round_number}轮完成，发现 {len(_deferred_updates)} 个新观察者，进入第{round_number + 1}轮..."
-            )
+
+def _sources_changed(node) -> bool:
+    """检查 node 的依赖自上次校验后是否变化（会先把上游 Computed 更新到最新）"""
+    verified_at = node._verified_at
+    for dep in node._sources:
+        if isinstance(dep, Computed) and dep._state != _CLEAN:
+            dep._update_if_necessary()
+        if dep._changed_at > verified_at:
+            return True
+    return False
+
+
+class _ObserverView:
+    """观察者的集合视图（调试/兼容用，热路径直接访问 _obs）"""
+
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    def add(self, observer) -> None:
+        if observer not in self:
+            _subscribe(self._node, observer)
+
+    def discard(self, observer) -> None:
+        _unsubscribe(self._node, observer)
+
+    def __contains__(self, observer) -> bool:
+        observers = self._node._obs
+        if not observers:
+            return False
+        try:
+            return _weak_ref(observer) in observers
+        except TypeError:
+            return False
+
+    def __iter__(self):
+        return iter(_live_observers(self._node))
+
+    def __len__(self) -> int:
+        return len(_live_observers(self._node))
+
+
+def _flush_priority(observer) -> int:
+    """pull 阶段的执行顺序：高度小的先执行，非内置观察者最后"""
+    if isinstance(observer, (Computed, Effect)):
+        return observer._height
+    return _MAX_HEIGHT
+
+
+def _flush_deferred_updates():
+    """🆕 pull 阶段 - 按拓扑高度处理被标记的观察者
+
+    每一轮取出当前队列，按高度排序后依次拉取。Computed 通过状态位保证每轮最多重算一次；
+    Effect 执行期间写入的 Signal 会把新的观察者加入下一轮。
+    """
+    global _flushing
+    if _flushing or not _deferred_updates:
+        return
+
+    _flushing = True
+    try:
+        round_number = 0
+        while _deferred_updates:
             round_number += 1
-        else:
-            logger.debug(f"🏁 批处理完成，共 {round_number} 轮")
-            break
+            if round_number > _MAX_FLUSH_ROUNDS:
+                logger.error(
+                    f"❌ 批处理超过 {_MAX_FLUSH_ROUNDS} 轮，可能存在循环依赖，丢弃 {len(_deferred_updates)} 个更新"
+                )
+                _deferred_updates.clear()
+                break
+
+            # 去重：同一轮内每个观察者只处理一次
+            current_batch = list({id(o): o for o in _deferred_updates}.values())
+            _deferred_updates.clear()
+            current_batch.sort(key=_flush_priority)
+
+            if _trace:
+                logger.debug(f"🔄 第{round_number}轮：按高度处理 {len(current_batch)} 个观察者")
+            for observer in current_batch:
+                try:
+                    if isinstance(observer, (Computed, Effect)):
+                        observer._update_if_necessary()
+                    elif hasattr(observer, "_rerun"):
+                        if getattr(observer, "_active", True):
+                            observer._rerun()
+                    else:
+                        observer()
+                except Exception as e:
+                    logger.error(f"❌ 批处理更新错误: {e}")
+    finally:
+        _flushing = False
 
 
 class BatchUpdater:
@@ -147,102 +411,131 @@ batch_updater = BatchUpdater()
 batch_update = batch_updater.batch_update
 
 
+# ⚖️ 相等性策略
+# equals 参数决定一次 set / 重算是否算作“变化”：
+#   None        - 默认，使用 ==（对大列表是逐元素比较，O(n)）
+#   "identity"  - 只比较对象身份，O(1)
+#   "versioned" - 每次写入都是新版本，总是通知下游
+#   callable    - 自定义比较函数 equals(old, new) -> bool
+def _never_equal(old: Any, new: Any) -> bool:
+    return False
+
+
+_EQUALITY_STRATEGIES: Dict[str, Callable[[Any, Any], bool]] = {
+    "identity": operator.is_,
+    "versioned": _never_equal,
+}
+
+
+def _resolve_equals(equals) -> Optional[Callable[[Any, Any], bool]]:
+    """把 equals 参数规整为比较函数，None 表示默认的 == 比较"""
+    if equals is None or callable(equals):
+        return equals
+    try:
+        return _EQUALITY_STRATEGIES[equals]
+    except (KeyError, TypeError):
+        raise ValueError(
+            f"未知的相等性策略: {equals!r}，可选 None / 'identity' / 'versioned' / callable"
+        ) from None
+
+
 class Signal(Generic[T]):
     """🚀 优化版响应式信号 - 集成版本控制和智能缓存"""
 
+    __slots__ = ("_value", "_version", "_changed_at", "_obs", "_equals", "__weakref__")
+
     _current_observer: ContextVar[Optional[Any]] = ContextVar("observer", default=None)
 
-    def __init__(self, initial_value: T):
+    # Signal 是依赖图的源头，拓扑高度恒为 0
+    _height = 0
+
+    def __init__(self, initial_value: T, equals=None):
         self._value = initial_value
-        self._observers = set()  # 改用普通set，手动管理Effect引用
         self._version = 0  # 🆕 版本控制
-        logger.debug(f"Signal创建: 初始值={initial_value}, 版本=v{self._version}, id={id(self)}")
+        self._changed_at = _global_version  # 最后一次值变化时的全局版本
+        self._obs: Union[None, List[Any], Set[Any]] = None  # 观察者，首次订阅时分配
+        self._equals = _resolve_equals(equals)
+
+    @property
+    def _observers(self) -> _ObserverView:
+        """观察者集合视图"""
+        return _ObserverView(self)
 
     def get(self) -> T:
         """获取信号值，同时建立依赖关系 + 版本追踪"""
-        observer = Signal._current_observer.get()
-        if observer:
-            self._observers.add(observer)
-            # 🆕 记录观察者看到的版本 - 只对 Computed 和 Effect 实例
-            if hasattr(observer, "_dependency_versions") and hasattr(observer, "_version"):
-                observer._dependency_versions[id(self)] = self._version  # type: ignore
-            # 记录依赖关系
-            if hasattr(observer, "_dependencies"):
-                observer._dependencies.add(self)  # type: ignore
-            logger.debug(
-                f"🔗 Signal[{id(self)}].get: 添加观察者 {type(observer).__name__}[{id(observer)}] (v{self._version}), 总观察者数: {len(self._observers)}"
-            )
-        else:
-            logger.debug(
-                f"Signal[{id(self)}].get: 无当前观察者, 返回值: {self._value} (v{self._version})"
-            )
+        observer = _current_observer_get()
+        if observer is not None:
+            _track_dependency(self, observer)
+            if _trace:
+                logger.debug(
+                    f"🔗 Signal[{id(self)}].get: 添加观察者 {type(observer).__name__}[{id(observer)}] (v{self._version})"
+                )
         return self._value
 
     def set(self, new_value: T) -> None:
-        """🚀 优化设置信号值 - 版本控制 + 批处理"""
-        global _global_version
+        """🚀 优化设置信号值 - 版本控制 + 批处理
 
-        if self._value != new_value:
-            old_value = self._value
-            old_version = self._version
-
-            self._value = new_value
-            self._version += 1  # 🆕 版本递增
-            _global_version += 1  # 🆕 全局版本递增
+        在 UI 线程以外调用时，写入会排队到 UI 线程的下一次主循环再生效。
+        """
+        if _get_ident() != _ui_thread_id:
+            _set_from_other_thread(self, new_value)
+            return
+        self._write(new_value)
+
+    def _write(self, new_value: T) -> None:
+        """在 UI 线程上实际写入新值并通知观察者"""
+        equals = self._equals
+        if equals is None:
+            if self._value == new_value:
+                return
+        elif equals(self._value, new_value):
+            return
 
+        if _trace:
             logger.debug(
-                f"Signal[{id(self)}].set: {old_value} -> {new_value} (v{old_version} -> v{self._version}), 观察者数: {len(self._observers)}"
+                f"Signal[{id(self)}].set: {self._value!r} -> {new_value!r} (v{self._version + 1})"
             )
+        self._value = new_value
+        self._commit()
 
-            # 🆕 批处理通知
-            _start_batch()
-            try:
-                self._notify_observers()
-            finally:
-                _end_batch()
-        else:
-            logger.debug(f"Signal[{id(self)}].set: 值未变化 ({new_value}), 跳过通知")
+    def _commit(self) -> None:
+        """值已经改变：递增版本并通知观察者"""
+        global _global_version
 
-    def _notify_observers(self):
-        """🚀 优化通知观察者 - 智能批处理"""
-        observers = list(self._observers)  # 创建副本避免并发修改
-        logger.debug(f"Signal[{id(self)}]._notify_observers: 批处理通知 {len(observers)} 个观察者")
+        self._version += 1  # 🆕 版本递增
+        _global_version += 1  # 🆕 全局版本递增
+        self._changed_at = _global_version
+
+        # 没有观察者时无需进入批处理
+        if not self._obs:
+            return
 
-        for i, observer in enumerate(observers):
+        # 🆕 批处理通知
+        _start_batch()
+        try:
+            self._notify_observers()
+        finally:
+            _end_batch()
+
+    def _notify_observers(self):
+        """🚀 push 阶段 - 只标记直接观察者为脏，不执行任何计算"""
+        for observer in _live_observers(self):  # 快照，避免通知过程中并发修改
             try:
-                # 🆕 智能更新检查
-                if hasattr(observer, "_needs_update"):
+                if isinstance(observer, (Computed, Effect)):
+                    observer._mark(_DIRTY)
+                elif hasattr(observer, "_needs_update"):
+                    # 兼容外部观察者：沿用版本检查 + 入队协议
                     if observer._needs_update(self):
-                        logger.debug(
-                            f"  观察者 {i+1}/{len(observers)}: {type(observer).__name__}[{id(observer)}] 需要更新"
-                        )
                         _enqueue_update(observer)
-                    else:
-                        logger.debug(
-                            f"  观察者 {i+1}/{len(observers)}: {type(observer).__name__}[{id(observer)}] 版本未变，跳过"
-                        )
+                elif hasattr(observer, "_active") and not observer._active:
+                    _unsubscribe(self, observer)
                 else:
-                    # 兼容现有Effect
-                    if hasattr(observer, "_active") and not observer._active:
-                        # 清理失活的Effect
-                        logger.debug(
-                            f"  观察者 {i+1}/{len(observers)}: Effect[{id(observer)}] 已失活，移除"
-                        )
-                        self._observers.discard(observer)
-                    else:
-                        logger.debug(
-                            f"  观察者 {i+1}/{len(observers)}: {type(observer).__name__}[{id(observer)}] 加入批处理"
-                        )
-                        _enqueue_update(observer)
+                    _enqueue_update(observer)
             except Exception as e:
-                logger.error(f"观察者 {i+1}/{len(observers)} 通知错误: {e}")
+                logger.error(f"观察者通知错误: {e}")
                 # 如果是失活的Effect，从观察者中移除
                 if hasattr(observer, "_active") and not observer._active:
-                    self._observers.discard(observer)
-
-        logger.debug(
-            f"Signal[{id(self)}]._notify_observers: 批处理通知完成，剩余观察者: {len(self._observers)}"
-        )
+                    _unsubscribe(self, observer)
 
     @property
     def value(self) -> T:
@@ -257,175 +550,412 @@ class Signal(Generic[T]):
         return f"Signal(value={self._value}, version={self._version})"
 
 
+# 热路径上直接使用绑定方法，省去每次的属性查找
+_current_observer_get = Signal._current_observer.get
+_current_observer_set = Signal._current_observer.set
+_current_observer_reset = Signal._current_observer.reset
+
+
+# ================================
+# 1b. 集合信号 - 原地修改 + 细粒度变更记录
+# ================================
+
+
+class ListChange(NamedTuple):
+    """ListSignal 的一次变更：在 index 处删除 removed、插入 inserted"""
+
+    version: int
+    index: int
+    removed: tuple
+    inserted: tuple
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+MISSING: Any = _Missing()  # DictChange 中表示键不存在
+
+
+class DictChange(NamedTuple):
+    """DictSignal 的一次变更：old/new 为 MISSING 分别表示新增/删除"""
+
+    version: int
+    key: Any
+    old: Any
+    new: Any
+
+
+class _CollectionSignal(Signal[T]):
+    """集合信号基类：维护一段有限长度的变更历史
+
+    消费方记住上次看到的 version，之后用 changes_since(version) 取增量；
+    返回 None 表示增量不可用（整体替换或历史已溢出），需要全量处理。
+    """
+
+    __slots__ = ("_changes", "_history_start")
+
+    _MAX_CHANGES = 256
+
+    def __init__(self, initial_value: T, equals="identity"):
+        super().__init__(self._coerce(initial_value), equals)
+        self._changes: deque = deque(maxlen=self._MAX_CHANGES)
+        self._history_start = 0  # 从该版本起的变更记录是完整的
+
+    @staticmethod
+    def _coerce(value):
+        return value
+
+    @property
+    def version(self) -> int:
+        """当前版本号"""
+        return self._version
+
+    def changes_since(self, version: int) -> Optional[list]:
+        """返回 version 之后的变更记录（按发生顺序），增量不可用时返回 None"""
+        if version >= self._version:
+            return []
+        if version < self._history_start:
+            return None
+        result = []
+        for change in reversed(self._changes):
+            if change.version <= version:
+                break
+            result.append(change)
+        result.reverse()
+        return result
+
+    def _write(self, new_value) -> None:
+        """整体替换：清空变更历史后通知"""
+        new_value = self._coerce(new_value)
+        equals = self._equals
+        if equals is None:
+            if self._value == new_value:
+                return
+        elif equals(self._value, new_value):
+            return
+
+        self._value = new_value
+        self._changes.clear()
+        self._history_start = self._version + 1
+        self._commit()
+
+    def _record(self, change) -> None:
+        changes = self._changes
+        if len(changes) == changes.maxlen:
+            self._history_start = changes[0].version
+        changes.append(change)
+
+
+class ListSignal(_CollectionSignal[List[Any]]):
+    """📋 列表信号 - 原地修改，发出 ListChange 记录而不是替换整个列表
+
+    默认使用 identity 相等性，set() 整体替换时不做逐元素比较。
+    value 返回内部列表本身，应视为只读；需要透传该列表的 Computed
+    应使用 equals="versioned"，否则原地修改后新旧值是同一个对象，会被视为未变化。
+    在 UI 线程以外调用修改方法时，修改会排队到 UI 线程执行且不返回结果。
+    """
+
+    __slots__ = ()
+
+    def __init__(self, initial_value=None, equals="identity"):
+        super().__init__(initial_value, equals)
+
+    @staticmethod
+    def _coerce(value) -> list:
+        if value is None:
+            return []
+        return value if type(value) is list else list(value)
+
+    def splice(self, start: int, delete_count: int, items=()) -> list:
+        """在 start 处删除 delete_count 个元素并插入 items，返回被删除的元素"""
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.splice, start, delete_count, tuple(items))
+            return []
+
+        value = self._value
+        size = len(value)
+        if start < 0:
+            start = max(size + start, 0)
+        start = min(start, size)
+        stop = min(start + max(delete_count, 0), size)
+
+        removed = tuple(value[start:stop])
+        inserted = tuple(items)
+        if not removed and not inserted:
+            return []
+
+        value[start:stop] = inserted
+        self._record(ListChange(self._version + 1, start, removed, inserted))
+        self._commit()
+        return list(removed)
+
+    def append(self, item) -> None:
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.append, item)
+            return
+        self.splice(len(self._value), 0, (item,))
+
+    def extend(self, items) -> None:
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.extend, tuple(items))
+            return
+        self.splice(len(self._value), 0, items)
+
+    def insert(self, index: int, item) -> None:
+        self.splice(index, 0, (item,))
+
+    def pop(self, index: int = -1):
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.pop, index)
+            return None
+        size = len(self._value)
+        if not -size <= index < size:
+            raise IndexError("pop index out of range")
+        return self.splice(index, 1)[0]
+
+    def remove(self, item) -> None:
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.remove, item)
+            return
+        self.splice(self._value.index(item), 1)
+
+    def clear(self) -> None:
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.clear)
+            return
+        self.splice(0, len(self._value))
+
+    def set_item(self, index: int, item) -> None:
+        """替换单个元素"""
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.set_item, index, item)
+            return
+        size = len(self._value)
+        if not -size <= index < size:
+            raise IndexError("list assignment index out of range")
+        if index < 0:
+            index += size
+        if self._value[index] is item:
+            return
+        self.splice(index, 1, (item,))
+
+    def __repr__(self) -> str:
+        return f"ListSignal(len={len(self._value)}, version={self._version})"
+
+
+class DictSignal(_CollectionSignal[Dict[Any, Any]]):
+    """📖 字典信号 - 原地修改，发出 DictChange 记录而不是替换整个字典
+
+    约定与 ListSignal 相同；clear() 与 set() 一样视为整体替换。
+    """
+
+    __slots__ = ()
+
+    def __init__(self, initial_value=None, equals="identity"):
+        super().__init__(initial_value, equals)
+
+    @staticmethod
+    def _coerce(value) -> dict:
+        if value is None:
+            return {}
+        return value if type(value) is dict else dict(value)
+
+    def get_item(self, key, default=None):
+        """读取单个键（建立依赖）"""
+        return self.get().get(key, default)
+
+    def set_item(self, key, item) -> None:
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.set_item, key, item)
+            return
+        self.update({key: item})
+
+    def update(self, items) -> None:
+        """批量写入，只通知一次"""
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.update, dict(items))
+            return
+
+        value = self._value
+        version = self._version + 1
+        changed = False
+        for key, item in dict(items).items():
+            old = value.get(key, MISSING)
+            if old is item:
+                continue
+            value[key] = item
+            self._record(DictChange(version, key, old, item))
+            changed = True
+        if changed:
+            self._commit()
+
+    def pop(self, key, default=MISSING):
+        if _get_ident() != _ui_thread_id:
+            _run_on_ui_thread(self, self.pop, key, default)
+            return None
+        if key not in self._value:
+            if default is MISSING:
+                raise KeyError(key)
+            return default
+        old = self._value.pop(key)
+        self._record(DictChange(self._version + 1, key, old, MISSING))
+        self._commit()
+        return old
+
+    def clear(self) -> None:
+        if self._value or _get_ident() != _ui_thread_id:
+            self.set({})
+
+    def __repr__(self) -> str:
+        return f"DictSignal(len={len(self._value)}, version={self._version})"
+
+
 class Computed(Generic[T]):
-    """🚀 优化计算属性 - 智能缓存 + 版本控制"""
+    """🚀 优化计算属性 - 推拉式惰性求值 + 版本控制
 
-    def __init__(self, fn: Callable[[], T]):
-        global _global_version
+    上游变化时只被标记为 CHECK/DIRTY，真正的重算推迟到下一次读取或批处理的 pull 阶段。
+    值未变化时版本号不递增，下游因此可以跳过重算。
+    """
+
+    __slots__ = (
+        "_fn",
+        "_value",
+        "_version",
+        "_changed_at",
+        "_verified_at",
+        "_state",
+        "_height",
+        "_active",
+        "_obs",
+        "_sources",
+        "_source_index",
+        "_owner",
+        "_equals",
+        "__weakref__",
+    )
+
+    def __init__(self, fn: Callable[[], T], equals=None):
         self._fn = fn
         self._value: Optional[T] = None
         self._version = 0  # 🆕 版本控制
-        self._dirty = True
-        self._observers = set()  # 改用普通set
-        self._dependencies = set()  # 存储依赖的引用
-        self._dependency_versions: Dict[int, int] = {}  # 🆕 依赖版本追踪
-        self._global_version_seen = _global_version - 1  # 🆕 全局版本追踪
+        self._changed_at = _global_version  # 最后一次值变化时的全局版本
+        self._verified_at = -1  # 最后一次重算/校验时的全局版本
+        self._state = _DIRTY
+        self._height = 1  # 拓扑高度 = 1 + 依赖的最大高度
         self._active = True  # 标记是否活跃
-        logger.debug(f"Computed创建: 版本=v{self._version}, id={id(self)}")
+        self._obs: Union[None, List[Any], Set[Any]] = None  # 观察者，首次订阅时分配
+        self._sources: List[Any] = []  # 依赖的节点
+        self._source_index: Optional[Set[Any]] = None  # 依赖较多时的查重索引
+        self._owner: Optional["Owner"] = _adopt_into_current_owner(self)
+        self._equals = _resolve_equals(equals)
+
+    @property
+    def _observers(self) -> _ObserverView:
+        """观察者集合视图"""
+        return _ObserverView(self)
+
+    @property
+    def _dirty(self) -> bool:
+        return self._state != _CLEAN
 
     def get(self) -> T:
         """🚀 智能获取 - 仅在必要时重计算"""
-        global _global_version
-
-        # 🆕 全局版本检查：如果全局无变化且不脏，直接返回缓存
-        if not self._dirty and self._global_version_seen == _global_version:
-            logger.debug(
-                f"Computed[{id(self)}].get: 使用全局缓存 = {self._value} (v{self._version})"
-            )
-        else:
-            # 检查是否需要重计算
-            if self._dirty or self._dependencies_changed():
-                logger.debug(f"Computed[{id(self)}].get: 重计算 (脏标记: {self._dirty})")
-                self._recompute()
-            else:
-                logger.debug(
-                    f"Computed[{id(self)}].get: 依赖未变，使用缓存 = {self._value} (v{self._version})"
-                )
+        if self._state != _CLEAN:
+            self._update_if_necessary()
 
         # 向上传播依赖
-        observer = Signal._current_observer.get()
-        if observer:
-            self._observers.add(observer)
-            # 🆕 记录观察者看到的版本 - 只对 Computed 和 Effect 实例
-            if hasattr(observer, "_dependency_versions") and hasattr(observer, "_version"):
-                observer._dependency_versions[id(self)] = self._version  # type: ignore
-            # 记录依赖关系
-            if hasattr(observer, "_dependencies"):
-                observer._dependencies.add(self)  # type: ignore
-            logger.debug(
-                f"Computed[{id(self)}].get: 添加观察者 {type(observer).__name__}[{id(observer)}] (v{self._version}), 总观察者数: {len(self._observers)}"
-            )
-        else:
-            logger.debug(
-                f"Computed[{id(self)}].get: 无当前观察者, 返回值: {self._value} (v{self._version})"
-            )
+        observer = _current_observer_get()
+        if observer is not None and observer is not self:
+            _track_dependency(self, observer)
 
         return self._value  # type: ignore # _value is guaranteed to be T after _recompute()
 
+    def _mark(self, state: int) -> None:
+        """push 阶段：提升自身状态，并把下游标记为 CHECK（已标记的下游直接返回）"""
+        if not self._active or self._state >= state:
+            return
+        self._state = state
+        if not self._obs:
+            return
+        for observer in _live_observers(self):
+            if isinstance(observer, (Computed, Effect)):
+                observer._mark(_CHECK)
+            elif hasattr(observer, "_needs_update"):
+                if observer._needs_update(self):
+                    _enqueue_update(observer)
+            else:
+                _enqueue_update(observer)
+
+    def _update_if_necessary(self) -> None:
+        """pull 阶段：先拉取上游 Computed，只有依赖版本确实变化时才重算"""
+        if self._state == _CHECK:
+            try:
+                changed = _sources_changed(self)
+            except BaseException:
+                self._state = _DIRTY
+                raise
+            if not changed:
+                self._state = _CLEAN
+                self._verified_at = _global_version
+                return
+        if self._state != _CLEAN:
+            self._recompute()
+
     def _dependencies_changed(self) -> bool:
         """🆕 检查依赖版本是否变化"""
-        # 简化实现 - 实际应该检查所有记录的依赖版本
-        # 这里可以添加更精细的依赖检查逻辑
-        return False
+        return _sources_changed(self)
 
     def _recompute(self):
         """🚀 重新计算值 - 版本控制"""
-        global _global_version
-
         # 清理旧的依赖
-        for dep in self._dependencies:
-            dep._observers.discard(self)
-        self._dependencies.clear()
+        _untrack_all(self)
+        self._height = 1
+
+        # 先标记为干净：计算期间的自引用直接读取旧值
+        self._state = _CLEAN
+        self._verified_at = _global_version
 
         # 设置当前观察者为自己
-        token = Signal._current_observer.set(self)  # type: ignore
+        token = _current_observer_set(self)
         try:
             old_value = self._value
             self._value = self._fn()
 
             # 🆕 智能版本控制 - 仅值改变时递增
-            if old_value != self._value:
+            equals = self._equals
+            if not (old_value == self._value if equals is None else equals(old_value, self._value)):
                 self._version += 1
-                logger.debug(
-                    f"Computed[{id(self)}]: 版本更新 v{self._version-1} -> v{self._version}"
-                )
-                # 🚀 值改变时通知观察者
-                logger.debug(f"Computed[{id(self)}]: 值改变，通知观察者")
-                self._notify_observers()
-
-            self._dirty = False
-            self._global_version_seen = _global_version
-
+                self._changed_at = _global_version
+                if _trace:
+                    logger.debug(f"Computed[{id(self)}]: 版本更新 -> v{self._version}")
+        except BaseException:
+            self._state = _DIRTY
+            raise
         finally:
-            Signal._current_observer.reset(token)
+            _current_observer_reset(token)
 
     def _needs_update(self, source) -> bool:
         """🆕 版本化依赖检查"""
-        if hasattr(source, "_version"):
-            source_id = id(source)
-            if source_id in self._dependency_versions:
-                last_seen = self._dependency_versions[source_id]
-                current = source._version
-                needs_update = current > last_seen
-                logger.debug(
-                    f"Computed[{id(self)}] 检查依赖更新: v{last_seen} vs v{current} -> {'需要' if needs_update else '跳过'}"
-                )
-                return needs_update
-        return True
-
-    def _notify_observers(self):
-        """🚀 通知观察者 - 不启动新批处理，直接加入当前批处理队列"""
-        if not self._observers:
-            return
-
-        observers = list(self._observers)  # 创建副本避免并发修改
-        logger.debug(
-            f"Computed[{id(self)}]._notify_observers: 通知 {len(observers)} 个观察者（直接加入队列）"
-        )
-
-        # ❌ 不启动新的批处理，避免嵌套批处理问题
-        # 直接将观察者加入当前的批处理队列
-        for i, observer in enumerate(observers):
-            try:
-                # 🆕 智能更新检查
-                if hasattr(observer, "_needs_update"):
-                    if observer._needs_update(self):
-                        logger.debug(
-                            f"  观察者 {i+1}/{len(observers)}: {type(observer).__name__}[{id(observer)}] 需要更新"
-                        )
-                        _enqueue_update(observer)
-                    else:
-                        logger.debug(
-                            f"  观察者 {i+1}/{len(observers)}: {type(observer).__name__}[{id(observer)}] 版本未变，跳过"
-                        )
-                else:
-                    # 兼容现有Effect
-                    if hasattr(observer, "_active") and not observer._active:
-                        # 清理失活的Effect
-                        logger.debug(
-                            f"  观察者 {i+1}/{len(observers)}: Effect[{id(observer)}] 已失活，移除"
-                        )
-                        self._observers.discard(observer)
-                    else:
-                        logger.debug(
-                            f"  观察者 {i+1}/{len(observers)}: {type(observer).__name__}[{id(observer)}] 加入批处理"
-                        )
-                        _enqueue_update(observer)
-            except Exception as e:
-                logger.error(f"观察者 {i+1}/{len(observers)} 通知错误: {e}")
-                # 如果是失活的Effect，从观察者中移除
-                if hasattr(observer, "_active") and not observer._active:
-                    self._observers.discard(observer)
-
-        logger.debug(
-            f"Computed[{id(self)}]._notify_observers: 通知完成，剩余观察者: {len(self._observers)}"
-        )
+        if source not in self._sources:
+            return True
+        return getattr(source, "_changed_at", _global_version) > self._verified_at
 
     def _invalidate(self):
         """标记为需要重新计算并通知"""
-        logger.debug(f"Computed[{id(self)}]._invalidate: dirty={self._dirty}")
-        if not self._dirty:  # 避免重复失效
-            self._dirty = True
-            logger.debug(f"Computed[{id(self)}]: 标记为脏，开始通知观察者")
-            self._notify_observers()
-        else:
-            logger.debug(f"Computed[{id(self)}]: 已经是脏状态，跳过通知观察者")
+        _start_batch()
+        try:
+            self._mark(_DIRTY)
+        finally:
+            _end_batch()
 
     def _rerun(self):
         """重新运行计算 - 与Effect接口兼容"""
-        logger.debug(f"Computed[{id(self)}]._rerun: 收到重新运行请求，立即重新计算")
-        # 🚀 修复：直接重新计算，不只是标记为脏
-        self._recompute()
+        self._mark(_DIRTY)
+        self._update_if_necessary()
 
     @property
     def value(self) -> T:
@@ -433,173 +963,301 @@ class Computed(Generic[T]):
     
     def cleanup(self):
         """清理计算属性，移除所有依赖关系"""
-        logger.debug(f"Computed[{id(self)}].cleanup: 清理依赖关系")
         # 从所有依赖中移除自己
-        for dep in self._dependencies:
-            dep._observers.discard(self)
-        self._dependencies.clear()
-        self._dependency_versions.clear()
-        self._dirty = True
+        _untrack_all(self)
+        self._state = _DIRTY
         self._active = False
+        owner = self._owner
+        if owner is not None:
+            self._owner = None
+            owner._release(self)
 
 
-# 全局Effect注册表，防止被垃圾回收
+# 全局Effect注册表：只保存没有 Owner 的 Effect，防止被垃圾回收。
+# 这些 Effect 只能靠显式 cleanup() 释放，数量持续增长即意味着泄漏。
 _active_effects = set()
 
+_effects_created = 0
+_effects_disposed = 0
+
 
 class Effect:
-    """🚀 优化副作用 - 智能更新检查"""
+    """🚀 优化副作用 - 推拉式更新检查
 
-    def __init__(self, fn: Callable[[], None]):
-        import traceback
+    上游变化只会把 Effect 放入批处理队列；真正执行前会先拉取上游 Computed，
+    若所有依赖版本都未变化则跳过本次执行。
+    """
 
-        logger.debug(f"📍 Effect.__init__ 被调用! Effect ID: {id(self)}")
-        stack_lines = traceback.format_stack()
-        for i, line in enumerate(stack_lines[-5:-1]):  # 显示最近4层调用栈
-            logger.debug(f"   调用栈[{i}]: {line.strip()}")
+    __slots__ = (
+        "_fn",
+        "_cleanup_fn",
+        "_active",
+        "_state",
+        "_height",
+        "_verified_at",
+        "_sources",
+        "_source_index",
+        "_owner",
+        "_scope",
+        "__weakref__",
+    )
 
+    def __init__(self, fn: Callable[[], None]):
         self._fn = fn
         self._cleanup_fn: Optional[Callable[[], None]] = None
         self._active = True
-        self._dependencies = set()  # 存储依赖的引用
-        self._dependency_versions: Dict[int, int] = {}  # 🆕 依赖版本追踪
+        self._state = _DIRTY
+        self._height = 1  # 拓扑高度 = 1 + 依赖的最大高度
+        self._verified_at = -1  # 最后一次执行/校验时的全局版本
+        self._sources: List[Any] = []  # 依赖的节点
+        self._source_index: Optional[Set[Any]] = None  # 依赖较多时的查重索引
+
+        global _effects_created
+        _effects_created += 1
+        if _trace:
+            logger.debug(f"Effect创建: id={id(self)}, 函数={getattr(fn, '__qualname__', type(fn).__name__)}")
+
+        # 有 Owner 时由 Owner 持有；否则注册到全局列表以防止被垃圾回收
+        self._owner: Optional["Owner"] = _adopt_into_current_owner(self)
+        if self._owner is None:
+            _active_effects.add(self)
+        # 执行期间新建的节点归属这个子作用域（首次有节点加入时才创建），每次重新执行前整体清理
+        self._scope: Optional["Owner"] = None
 
-        logger.debug(
-            f"Effect创建: id={id(self)}, 函数={fn.__name__ if hasattr(fn, '__name__') else type(fn).__name__}"
-        )
+        self._run_effect()
 
-        # 注册到全局列表以防止被垃圾回收
-        _active_effects.add(self)
-        logger.debug(f"Effect[{id(self)}]: 注册到全局列表，总Effect数: {len(_active_effects)}")
+    def _mark(self, state: int) -> None:
+        """push 阶段：首次变脏时加入批处理队列"""
+        if not self._active or self._state >= state:
+            return
+        if self._state == _CLEAN:
+            _enqueue_update(self)
+        self._state = state
 
+    def _update_if_necessary(self) -> None:
+        """pull 阶段：依赖版本确实变化时才重新执行"""
+        if not self._active or self._state == _CLEAN:
+            return
+        if self._state == _CHECK:
+            try:
+                changed = _sources_changed(self)
+            except Exception:
+                changed = True  # 上游计算出错时交给 _run_effect 记录
+            if not changed:
+                self._state = _CLEAN
+                self._verified_at = _global_version
+                return
         self._run_effect()
 
     def _run_effect(self):
         """运行副作用函数"""
         if not self._active:
-            logger.debug(f"Effect[{id(self)}]._run_effect: Effect已失活，跳过执行")
             return
 
-        logger.debug(f"Effect[{id(self)}]._run_effect: 开始执行")
-
-        # 清理上一次的副作用
+        # 清理上一次执行中创建的子节点和副作用
+        scope = self._scope
+        if scope is not None and scope._nodes:
+            scope.dispose()
         if self._cleanup_fn:
-            logger.debug(f"Effect[{id(self)}]: 清理上一次的副作用")
-            self._cleanup_fn()
+            cleanup_fn = self._cleanup_fn
             self._cleanup_fn = None
+            cleanup_fn()
 
         # 清理旧的依赖
-        for dep in self._dependencies:
-            dep._observers.discard(self)
-        self._dependencies.clear()
+        _untrack_all(self)
+        self._height = 1
 
-        # 设置当前观察者为自己（而不是方法）
-        token = Signal._current_observer.set(self)  # type: ignore
-        import threading
+        # 执行期间写入的依赖会把自己重新标记并加入下一轮
+        self._state = _CLEAN
+        self._verified_at = _global_version
 
-        thread_id = threading.get_ident()
-        logger.debug(f"🎯 Effect[{id(self)}]: 线程ID={thread_id}, 设置为当前观察者，开始执行函数")
+        if _trace:
+            logger.debug(f"Effect[{id(self)}]._run_effect: 开始执行")
 
+        # 设置当前观察者为自己（而不是方法）；当前作用域也设为自己，新建节点时才创建子作用域
+        token = _current_observer_set(self)
+        owner_token = _current_owner_set(self)
         try:
-            # 在调用函数之前再次确认观察者上下文
-            current_observer = Signal._current_observer.get()
-            logger.debug(
-                f"🎯 Effect[{id(self)}]: 准备调用函数 - 观察者上下文 = {type(current_observer).__name__ if current_observer else 'None'}[{id(current_observer) if current_observer else 'N/A'}]"
-            )
-
-            # 测试函数：直接检查上下文传递
-            def test_context():
-                test_observer = Signal._current_observer.get()
-                logger.debug(
-                    f"🧪 Effect[{id(self)}]: 内联测试函数 - 观察者上下文 = {type(test_observer).__name__ if test_observer else 'None'}[{id(test_observer) if test_observer else 'N/A'}]"
-                )
-                return test_observer
-
-            test_result = test_context()
-            logger.debug(
-                f"🧪 Effect[{id(self)}]: 测试结果: 上下文传递{'成功' if test_result else '失败'}"
-            )
-
-            # 调试self._fn的类型和属性
-            logger.debug(f"🔬 Effect[{id(self)}]: self._fn 类型: {type(self._fn)}")
-            logger.debug(
-                f"🔬 Effect[{id(self)}]: self._fn 属性: {dir(self._fn) if hasattr(self._fn, '__dir__') else 'N/A'}"
-            )
-            if hasattr(self._fn, "__name__"):
-                logger.debug(f"🔬 Effect[{id(self)}]: self._fn.__name__: {self._fn.__name__}")
-            if hasattr(self._fn, "__module__"):
-                logger.debug(f"🔬 Effect[{id(self)}]: self._fn.__module__: {self._fn.__module__}")
-
-            # 检查函数的globals中是否有不同的Signal类
-            if hasattr(self._fn, "__globals__"):
-                fn_globals = self._fn.__globals__
-                # 查找Signal相关的导入
-                signal_in_globals = [
-                    k for k in fn_globals.keys() if "signal" in k.lower() or "Signal" in k
-                ]
-                logger.debug(
-                    f"🔬 Effect[{id(self)}]: 函数globals中的Signal相关: {signal_in_globals}"
-                )
-                for key in signal_in_globals:
-                    value = fn_globals.get(key)
-                    if value is not None and hasattr(value, "_current_observer"):
-                        logger.debug(
-                            f"🔬 Effect[{id(self)}]: {key}._current_observer = {value._current_observer}"
-                        )
-                        logger.debug(
-                            f"🔬 Effect[{id(self)}]: {key}._current_observer.get() = {value._current_observer.get()}"
-                        )
-
             result = self._fn()
             # 如果函数返回清理函数，保存它
             if callable(result):
                 self._cleanup_fn = result
-                logger.debug(f"Effect[{id(self)}]: 保存清理函数")
-            logger.debug(f"Effect[{id(self)}]: 函数执行完成")
         except Exception as e:
             logger.error(f"Effect[{id(self)}] 执行错误: {e}")
         finally:
-            Signal._current_observer.reset(token)
-            logger.debug(f"Effect[{id(self)}]: 重置观察者上下文")
+            _current_owner_reset(owner_token)
+            _current_observer_reset(token)
 
     def _needs_update(self, source) -> bool:
         """🆕 智能更新检查"""
-        if hasattr(source, "_version"):
-            source_id = id(source)
-            if source_id in self._dependency_versions:
-                last_seen = self._dependency_versions[source_id]
-                current = source._version
-                needs_update = current > last_seen
-                logger.debug(
-                    f"Effect[{id(self)}] 检查依赖更新: v{last_seen} vs v{current} -> {'需要' if needs_update else '跳过'}"
-                )
-                return needs_update
-        return True
+        if source not in self._sources:
+            return True
+        return getattr(source, "_changed_at", _global_version) > self._verified_at
 
     def _rerun(self):
         """重新运行副作用"""
-        logger.debug(f"Effect[{id(self)}]._rerun: 收到重新运行请求")
         if self._active:
             self._run_effect()
-        else:
-            logger.debug(f"Effect[{id(self)}]._rerun: Effect已失活，跳过重新运行")
 
     def cleanup(self):
         """清理副作用"""
-        self._active = False
+        global _effects_disposed
+        if self._active:
+            self._active = False
+            _effects_disposed += 1
+        scope = self._scope
+        if scope is not None:
+            self._scope = None
+            scope.dispose()
         if self._cleanup_fn:
-            self._cleanup_fn()
+            cleanup_fn = self._cleanup_fn
             self._cleanup_fn = None
+            cleanup_fn()
 
         # 从所有依赖中移除自己
-        for dep in self._dependencies:
-            dep._observers.discard(self)
-        self._dependencies.clear()
-        self._dependency_versions.clear()
+        _untrack_all(self)
+
+        # 从 Owner 或全局注册表中移除
+        owner = self._owner
+        if owner is not None:
+            self._owner = None
+            owner._release(self)
+        else:
+            _active_effects.discard(self)
+
 
-        # 从全局注册表中移除
-        _active_effects.discard(self)
-        logger.debug(f"Effect[{id(self)}]: 清理完成，剩余总Effect数: {len(_active_effects)}")
+# ================================
+# 2. 所有权作用域
+# ================================
+
+_current_owner: ContextVar[Optional["Owner"]] = ContextVar("owner", default=None)
+_current_owner_get = _current_owner.get
+_current_owner_set = _current_owner.set
+_current_owner_reset = _current_owner.reset
+
+
+def _resolve_owner(owner) -> Optional["Owner"]:
+    """执行中的 Effect 作为当前作用域时，返回（必要时创建）它的子作用域"""
+    if owner.__class__ is Effect:
+        scope = owner._scope
+        if scope is None:
+            scope = owner._scope = Owner()
+        return scope
+    return owner
+
+
+def _adopt_into_current_owner(node) -> Optional["Owner"]:
+    """把新建节点挂到当前 Owner 下，返回该 Owner（没有时返回 None）"""
+    owner = _current_owner_get()
+    if owner is not None:
+        owner = _resolve_owner(owner)
+        owner._nodes[node] = None
+    return owner
+
+
+class Owner:
+    """响应式所有权作用域
+
+    在 Owner 作用域内创建的 Effect、Computed 和子 Owner 都由它持有，
+    dispose() 时按创建的逆序统一清理。Owner 被丢弃且未 dispose 时，
+    它持有的节点也会随之被回收——Signal 只弱引用观察者。
+
+    Example:
+        owner = Owner()
+        with owner:
+            Effect(lambda: print(count.value))
+        ...
+        owner.dispose()  # 作用域内的 Effect 全部停止
+    """
+
+    __slots__ = ("_nodes", "_parent", "_tokens", "__weakref__")
+
+    def __init__(self, parent: Optional["Owner"] = None):
+        self._nodes: Dict[Any, None] = {}  # 有序且支持 O(1) 移除
+        self._parent = parent
+        self._tokens: List[Any] = []
+        if parent is not None:
+            parent._nodes[self] = None
+
+    def __enter__(self) -> "Owner":
+        self._tokens.append(_current_owner_set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current_owner_reset(self._tokens.pop())
+        return False
+
+    def run(self, fn: Callable[[], T]) -> T:
+        """在当前作用域内执行 fn"""
+        with self:
+            return fn()
+
+    def _release(self, node) -> None:
+        self._nodes.pop(node, None)
+
+    @property
+    def node_count(self) -> int:
+        """作用域直接持有的节点数"""
+        return len(self._nodes)
+
+    def dispose(self) -> None:
+        """清理作用域内的所有节点；Owner 之后仍可复用"""
+        _root_owners.discard(self)
+        nodes = list(self._nodes)
+        self._nodes.clear()
+        for node in reversed(nodes):
+            try:
+                node.cleanup()
+            except Exception as e:
+                logger.error(f"Owner 清理节点错误: {e}")
+        parent = self._parent
+        if parent is not None:
+            self._parent = None
+            parent._release(self)
+
+    cleanup = dispose
+
+
+# create_root 创建的根作用域：在 dispose 前一直强引用，调用方丢掉 dispose 句柄也不会被回收
+_root_owners: Set[Owner] = set()
+
+
+def create_root(fn: Callable[[Callable[[], None]], T]) -> T:
+    """在新的独立作用域中执行 fn(dispose)
+
+    作用域不挂到外层 Owner 下，只有调用 dispose 才会清理其中创建的节点。
+    """
+    owner = Owner()
+    _root_owners.add(owner)
+    try:
+        with owner:
+            return fn(owner.dispose)
+    except BaseException:
+        # 调用方拿不到 dispose 句柄，失败时直接清理
+        owner.dispose()
+        raise
+
+
+def get_owner() -> Optional[Owner]:
+    """当前的 Owner（不在任何作用域内时为 None）"""
+    owner = _current_owner_get()
+    return _resolve_owner(owner) if owner is not None else None
+
+
+def get_reactive_stats() -> Dict[str, int]:
+    """响应式系统的运行统计，用于泄漏监控
+
+    unowned_effects 是泄漏计数：没有 Owner、只能靠显式 cleanup() 释放的存活 Effect 数；
+    roots 是尚未 dispose 的 create_root 作用域数。
+    """
+    return {
+        "effects_created": _effects_created,
+        "effects_disposed": _effects_disposed,
+        "unowned_effects": len(_active_effects),
+        "roots": len(_root_owners),
+        "cross_thread_writes": _cross_thread_writes,
+        "pending_writes": len(_pending_writes),
+    }
 
 
 # ================================
@@ -607,14 +1265,14 @@ class Effect:
 # ================================
 
 
-def create_signal(initial_value: T) -> Signal[T]:
+def create_signal(initial_value: T, equals=None) -> Signal[T]:
     """创建信号的便捷函数"""
-    return Signal(initial_value)
+    return Signal(initial_value, equals)
 
 
-def create_computed(fn: Callable[[], T]) -> Computed[T]:
+def create_computed(fn: Callable[[], T], equals=None) -> Computed[T]:
     """创建计算属性的便捷函数"""
-    return Computed(fn)
+    return Computed(fn, equals)
 
 
 def create_effect(fn: Callable[[], None]) -> Effect:
@@ -650,6 +1308,11 @@ class batch:
 # 导出
 __all__ = [
     "Signal",
+    "ListSignal",
+    "DictSignal",
+    "ListChange",
+    "DictChange",
+    "MISSING",
     "Computed",
     "Effect",
     "create_signal",
@@ -657,4 +1320,16 @@ __all__ = [
     "create_effect",
     "batch_update",
     "batch",
+    "call_after_batch",
+    "set_reactive_tracing",
+    "is_reactive_tracing",
+    "Owner",
+    "create_root",
+    "get_owner",
+    "get_reactive_stats",
+    "set_main_thread_dispatcher",
+    "drain_pending_writes",
+    "run_on_ui_thread",
+    "bind_ui_thread",
+    "set_thread_check",
 ]
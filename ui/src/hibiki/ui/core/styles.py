@@ -148,6 +148,18 @@ class Display(Enum):
 # 3. 核心样式数据结构
 # ================================
 
+# 影响布局计算的属性（StyleConverter 转换的全部属性），其余为视觉属性
+_LAYOUT_PROPERTIES = (
+    'display', 'position',
+    'flex_direction', 'justify_content', 'align_items', 'flex_grow', 'flex_shrink', 'flex_basis',
+    'grid_template_columns', 'grid_template_rows', 'grid_column', 'grid_row', 'grid_area',
+    'width', 'height', 'min_width', 'min_height', 'max_width', 'max_height',
+    'margin', 'margin_top', 'margin_right', 'margin_bottom', 'margin_left',
+    'padding', 'padding_top', 'padding_right', 'padding_bottom', 'padding_left',
+    'gap', 'row_gap', 'column_gap',
+    'top', 'right', 'bottom', 'left',
+)
+
 @dataclass
 class ComponentStyle:
     """组件样式定义 - 涵盖所有布局和视觉属性
@@ -323,6 +335,22 @@ class ComponentStyle:
             return Length(value)
         return value
     
+    def layout_key(self) -> Optional[tuple]:
+        """布局属性的可哈希快照，用作样式转换缓存的键
+
+        每次调用都按当前属性值重新生成，样式被修改后自然得到新的键。
+        含 vw/vh 的样式依赖视口尺寸，返回 None 表示不可缓存。
+        """
+        key = []
+        for prop in _LAYOUT_PROPERTIES:
+            value = getattr(self, prop)
+            if isinstance(value, Length):
+                if value.unit in (LengthUnit.VW, LengthUnit.VH):
+                    return None
+                value = (value.value, value.unit)
+            key.append(value)
+        return tuple(key)
+
     def copy(self) -> 'ComponentStyle':
         """创建样式副本"""
         return ComponentStyle(**self.__dict__)
@@ -459,6 +459,22 @@ class TestComponentLifecycle:
         signal.value = 2
         assert executions == [0, 1]  # No new execution
     
+    def test_lifecycle_cleanup_disposes_unmanaged_effects(self):
+        """Test that effects created in the component scope are disposed on cleanup."""
+        component = MockComponent()
+        signal = Signal(0)
+        executions = []
+        
+        # Effects created inside the owner (e.g. by ReactiveBinding during mount)
+        with component._owner:
+            Effect(lambda: executions.append(signal.value))
+        
+        component.cleanup()
+        
+        signal.value = 1
+        assert executions == [0]
+        assert component._owner.node_count == 0
+    
     def test_lifecycle_parent_change(self):
         """Test changing a component's parent container."""
         child = MockComponent()
@@ -479,4 +495,128 @@ class TestComponentLifecycle:
         assert child not in parent2.children  # Not in new parent's public list
         # Internal lists are updated
         assert child not in parent1._children
-        assert child in parent2._children
\ No newline at end of file
+        assert child in parent2._children
+
+class KeyedRow(MockComponent):
+    """Row component identified by a data key."""
+
+    def __init__(self, song_id):
+        super().__init__(height=20)
+        self.song_id = song_id
+
+
+@pytest.fixture
+def mounted_rows():
+    """A container mounted against a real layout engine, holding rows 0..4."""
+    from hibiki.ui.core.layout import LayoutEngine
+
+    engine = LayoutEngine()
+    rows = [KeyedRow(i) for i in range(5)]
+    container = Container(children=list(rows))
+    container_view = MagicMock()
+    container_class = MagicMock()
+    container_class.alloc.return_value.init.return_value = container_view
+
+    with patch('hibiki.ui.core.component.get_layout_engine', return_value=engine), \
+            patch('hibiki.ui.core.base_view.HibikiContainerView', container_class):
+        container.mount()
+        yield container, rows, engine
+
+
+def by_song(row):
+    return row.song_id
+
+
+class TestReconcileChildren:
+    """Test keyed child reconciliation on a mounted container."""
+
+    def test_reverse_moves_without_remount(self, mounted_rows):
+        """Test that reversing keeps every mounted row and moves all but one."""
+        container, rows, engine = mounted_rows
+        views = [row._nsview for row in rows]
+
+        stats = container.reconcile_children(
+            [KeyedRow(i) for i in reversed(range(5))], key=by_song
+        )
+
+        assert stats == {"inserted": 0, "removed": 0, "moved": 4, "kept": 1}
+        assert container.children == rows[::-1]
+        assert [row._nsview for row in container.children] == views[::-1]
+        layout_order = [node.component for node in engine.get_node_for_component(container).children]
+        assert layout_order == rows[::-1]
+        assert all(engine.get_node_for_component(row) is not None for row in rows)
+        assert not any(row._nsview.removeFromSuperview.called for row in rows)
+
+    def test_single_move_repositions_one_view(self, mounted_rows):
+        """Test that moving one row touches only that row's view."""
+        container, rows, _ = mounted_rows
+        container._nsview.addSubview_positioned_relativeTo_.reset_mock()
+
+        stats = container.reconcile_children(
+            [rows[0], rows[2], rows[3], rows[1], rows[4]]
+        )
+
+        assert stats["moved"] == 1
+        container._nsview.addSubview_positioned_relativeTo_.assert_called_once()
+        moved_view = container._nsview.addSubview_positioned_relativeTo_.call_args[0][0]
+        assert moved_view is rows[1]._nsview
+
+    def test_insert_and_remove(self, mounted_rows):
+        """Test that new keys are mounted in place and missing keys are cleaned up."""
+        container, rows, engine = mounted_rows
+        new_row = KeyedRow(9)
+
+        stats = container.reconcile_children(
+            [KeyedRow(0), new_row, KeyedRow(2), KeyedRow(4)], key=by_song
+        )
+
+        assert stats == {"inserted": 1, "removed": 2, "moved": 0, "kept": 3}
+        assert container.children == [rows[0], new_row, rows[2], rows[4]]
+        assert new_row._parent_container is container
+        assert engine.get_node_for_component(rows[1]) is None
+        assert rows[1]._nsview.removeFromSuperview.called
+        assert [node.component for node in engine.get_node_for_component(container).children] == (
+            container.children
+        )
+
+    def test_unmounted_insert_sets_parent(self):
+        """Test that inserted children know their container before it is mounted."""
+        kept = KeyedRow(1)
+        container = Container(children=[kept])
+        new_row = KeyedRow(2)
+
+        stats = container.reconcile_children([KeyedRow(1), new_row], key=by_song)
+
+        assert stats["inserted"] == 1
+        assert container.children == [kept, new_row]
+        assert new_row._parent_container is container
+
+    def test_duplicate_keys_fall_back_to_replacement(self):
+        """Test that duplicate keys replace all children instead of diffing."""
+        container = Container(children=[KeyedRow(1), KeyedRow(2)])
+        replacement = [KeyedRow(3), KeyedRow(3)]
+
+        stats = container.reconcile_children(replacement, key=by_song)
+
+        assert stats["inserted"] == 2
+        assert container.children == replacement
+
+
+class TestLongestIncreasingSubsequence:
+    """Test the LIS helper used to pick children that stay in place."""
+
+    @pytest.mark.parametrize("sequence, length", [
+        ([], 0),
+        ([0, 1, 2], 3),
+        ([2, 1, 0], 1),
+        ([0, 2, 3, 1, 4], 4),
+        ([3, 0, 1, 4, 2], 3),
+    ])
+    def test_lis_length(self, sequence, length):
+        from hibiki.ui.core.component import _longest_increasing_subsequence
+
+        stable = _longest_increasing_subsequence(sequence)
+
+        assert len(stable) == length
+        kept = [value for value in sequence if value in stable]
+        assert kept == sorted(kept)
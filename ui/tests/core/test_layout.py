@@ -0,0 +1,520 @@
+"""
+Tests for the Layout Engine
+===========================
+
+Testing incremental layout: dirty-subtree readback, frame change tracking,
+layout scheduling, style conversion caching, child index bookkeeping and
+positional insert/move.
+"""
+
+import pytest
+import stretchable as st
+
+from hibiki.ui.core import layout
+from hibiki.ui.core.layout import LayoutEngine, StyleConverter
+from hibiki.ui.core.reactive import Effect, Signal, batch
+from hibiki.ui.core.styles import ComponentStyle, Display, FlexDirection, px, vw
+
+
+class StubComponent:
+    """Minimal component: the layout engine only needs a style."""
+
+    def __init__(self, **style_kwargs):
+        self.style = ComponentStyle(**style_kwargs)
+
+
+class MountedComponent(StubComponent):
+    """Stub with a view: records the frames the engine applies."""
+
+    def __init__(self, **style_kwargs):
+        super().__init__(**style_kwargs)
+        self._nsview = object()
+        self.frames = []
+
+    def _get_available_size_from_parent(self):
+        return (400, 300)
+
+    def _apply_layout_result(self, result):
+        self.frames.append((result.x, result.y, result.width, result.height))
+
+    def _apply_children_layout(self, engine):
+        for node in engine.take_layout_changes(self):
+            if hasattr(node.component, "_apply_layout_result"):
+                node.component._apply_layout_result(node._stretchable_node.get_box())
+
+
+@pytest.fixture
+def engine():
+    return LayoutEngine()
+
+
+@pytest.fixture
+def frame_queue(monkeypatch):
+    """Install a frame dispatcher whose callbacks run when the test says so."""
+    queue = []
+    monkeypatch.setattr(layout, "_frame_dispatcher", queue.append)
+    return queue
+
+
+@pytest.fixture
+def readbacks(monkeypatch):
+    """Count full per-node layout readbacks from Taffy."""
+    calls = []
+    original = st.Node._update_layout
+
+    def counting(node):
+        calls.append(node)
+        return original(node)
+
+    monkeypatch.setattr(st.Node, "_update_layout", counting)
+    return calls
+
+
+def build_list(engine, rows, cells=3):
+    """A column of fixed-height rows, each holding a few cells."""
+    root = StubComponent(display=Display.FLEX, flex_direction=FlexDirection.COLUMN, width=px(400))
+    engine.create_node_for_component(root)
+    row_components = []
+    for _ in range(rows):
+        row = StubComponent(display=Display.FLEX, flex_direction=FlexDirection.ROW, height=px(20))
+        engine.add_child_relationship(root, row)
+        for _ in range(cells):
+            engine.add_child_relationship(row, StubComponent(width=px(50), height=px(20)))
+        row_components.append(row)
+    engine.compute_layout_for_component(root, (400, 100000))
+    engine.take_layout_changes(root)
+    return root, row_components
+
+
+class TestIncrementalLayout:
+    """Test that relayout only revisits the changed part of the tree."""
+
+    def test_first_layout_reports_every_descendant(self, engine):
+        """Test that a fresh tree applies frames to all nodes."""
+        root = StubComponent(display=Display.FLEX, width=px(100), height=px(100))
+        engine.create_node_for_component(root)
+        children = [StubComponent(width=px(10), height=px(10)) for _ in range(3)]
+        for child in children:
+            engine.add_child_relationship(root, child)
+
+        engine.compute_layout_for_component(root, (100, 100))
+
+        assert [node.component for node in engine.take_layout_changes(root)] == children
+
+    def test_append_row_touches_only_new_row(self, engine, readbacks):
+        """Test that appending to a long list does not read back the whole tree."""
+        root, _ = build_list(engine, 2000, cells=0)
+        readbacks.clear()
+        new_row = StubComponent(height=px(20))
+        engine.add_child_relationship(root, new_row)
+
+        result = engine.compute_layout_for_component(root, (400, 100000))
+
+        assert result.height == 2001 * 20
+        assert [node.component for node in engine.take_layout_changes(root)] == [new_row]
+        assert engine.get_node_for_component(new_row).get_layout() == (0, 2000 * 20, 400, 20)
+        assert len(readbacks) <= 2  # the root and the new row
+
+    def test_removal_moves_following_siblings_only(self, engine):
+        """Test that removing a row updates the rows after it, not their cells."""
+        root, rows = build_list(engine, 10)
+        engine.remove_child_relationship(root, rows[4])
+
+        engine.compute_layout_for_component(root, (400, 100000))
+
+        changed = [node.component for node in engine.take_layout_changes(root)]
+        assert changed == rows[5:]
+        assert engine.get_node_for_component(rows[5]).get_layout() == (0, 80, 400, 20)
+
+    def test_style_change_relayouts_resized_subtree(self, engine):
+        """Test that a resized row re-reads its cells and shifts later rows."""
+        root, rows = build_list(engine, 5)
+        rows[1].style = ComponentStyle(
+            display=Display.FLEX, flex_direction=FlexDirection.COLUMN, height=px(60)
+        )
+        engine.get_node_for_component(rows[1]).update_style(rows[1].style)
+
+        engine.compute_layout_for_component(root, (400, 100000))
+
+        changed = {node.component for node in engine.take_layout_changes(root)}
+        cells = [node.component for node in engine.get_node_for_component(rows[1]).children]
+        assert changed == {rows[1], rows[2], rows[3], rows[4], *cells[1:]}
+        assert engine.get_node_for_component(cells[2]).get_layout() == (0, 40, 50, 20)
+
+    def test_unchanged_relayout_applies_nothing(self, engine, readbacks):
+        """Test that recomputing a clean tree reads back nothing."""
+        root, _ = build_list(engine, 50)
+        readbacks.clear()
+
+        engine.compute_layout_for_component(root, (400, 100000))
+
+        assert engine.take_layout_changes(root) == []
+        assert readbacks == []
+
+    def test_changes_for_other_component_fall_back_to_all_descendants(self, engine):
+        """Test that a component other than the last computed root gets every descendant."""
+        root, rows = build_list(engine, 3, cells=2)
+
+        descendants = engine.take_layout_changes(rows[0])
+
+        assert [node.component for node in descendants] == [
+            node.component for node in engine.get_node_for_component(rows[0]).children
+        ]
+
+
+def build_mounted_tree(engine, children=50):
+    root = MountedComponent(display=Display.FLEX, flex_direction=FlexDirection.COLUMN, width=px(400))
+    engine.create_node_for_component(root)
+    items = [MountedComponent(height=px(4)) for _ in range(children)]
+    for item in items:
+        engine.add_child_relationship(root, item)
+    return root, items
+
+
+class TestStretchableInternals:
+    """Test the private stretchable API that incremental readback relies on.
+    
+    _IncrementalNode overrides Node._update_layout and probes a node's border
+    box straight from Taffy. If a stretchable release renames any of these,
+    these tests fail instead of layout silently going stale.
+    """
+
+    def test_private_attributes_exist(self):
+        """Test that the overridden method, node slots and Taffy handles are present."""
+        node = st.Node(style=st.Style(size=(10, 10)))
+        assert callable(getattr(st.Node, "_update_layout", None))
+        for name in ("_taffy_layout", "_node_id", "_box"):
+            assert hasattr(node, name), name
+        assert hasattr(layout._taffy, "_ptr")
+        assert callable(layout._taffylib.node_get_layout)
+
+    def test_border_box_probe_matches_public_layout(self):
+        """Test that the direct Taffy read agrees with the public border box."""
+        root = st.Node(style=st.Style(size=(100, 100), padding=5))
+        child = st.Node(style=st.Style(size=(30, 20), margin=3))
+        root.append(child)
+        root.compute_layout((100, 100))
+
+        layout._taffylib.node_get_layout(layout._taffy._ptr, child._node_id, child._taffy_layout)
+
+        probed = child._taffy_layout
+        box = child.get_box(st.Edge.BORDER)
+        assert child._box[st.Edge.BORDER] == box
+        assert (probed.x, probed.y, probed.width, probed.height) == (box.x, box.y, box.width, box.height)
+
+
+class TestLayoutScheduler:
+    """Test that layout requests are coalesced per root per frame."""
+
+    def test_style_burst_in_one_frame_runs_one_pass(self, engine, frame_queue):
+        """Test that 50 signal-driven style changes in one loop turn lay out once."""
+        root, items = build_mounted_tree(engine)
+        heights = [Signal(4) for _ in items]
+
+        def bind(item, height):
+            def apply():
+                item.style = ComponentStyle(height=px(height.value))
+                engine.update_component_style(item)
+
+            return Effect(apply)
+
+        effects = [bind(item, height) for item, height in zip(items, heights)]
+        engine.flush_layout()
+        frame_queue.clear()
+        root.frames.clear()
+        before = engine.get_scheduler_stats()
+
+        for height in heights:
+            height.value = 6  # each write is its own reactive batch
+
+        assert len(frame_queue) == 1
+        assert root.frames == []  # nothing laid out before the frame
+        frame_queue.pop()()
+
+        stats = engine.get_scheduler_stats()
+        assert stats["passes"] - before["passes"] == 1
+        assert stats["coalesced"] - before["coalesced"] == len(items) - 1
+        assert items[-1].frames[-1] == (0, 49 * 6, 400, 6)
+        assert len(effects) == len(items)
+
+    def test_batch_coalesces_without_frame_dispatcher(self, engine):
+        """Test that requests inside a reactive batch run once, at batch end."""
+        root, items = build_mounted_tree(engine, 10)
+
+        with batch():
+            for item in items:
+                engine.request_layout(item)
+            assert root.frames == []
+
+        assert len(root.frames) == 1
+        assert engine.get_scheduler_stats()["passes"] == 1
+
+    def test_request_outside_batch_runs_immediately(self, engine):
+        """Test that scripts without an event loop keep synchronous layout."""
+        root, items = build_mounted_tree(engine, 3)
+
+        engine.request_layout(items[1])
+
+        assert root.frames == [(0, 0, 400, 12)]
+        assert [item.frames for item in items] == [[(0, 0, 400, 4)], [(0, 4, 400, 4)], [(0, 8, 400, 4)]]
+
+    def test_flush_layout_applies_pending_roots(self, engine, frame_queue):
+        """Test that flush_layout is an escape hatch for reading frames early."""
+        first, _ = build_mounted_tree(engine, 2)
+        second, _ = build_mounted_tree(engine, 2)
+        engine.request_layout(first)
+        engine.request_layout(second)
+        engine.request_layout(first)
+
+        assert engine.flush_layout() == 2
+        assert len(first.frames) == len(second.frames) == 1
+        assert engine.get_scheduler_stats() == {
+            "requests": 3,
+            "passes": 2,
+            "coalesced": 1,
+            "pending": 0,
+        }
+
+        frame_queue.pop()()  # the scheduled frame finds nothing left to do
+        assert len(first.frames) == 1
+
+    def test_cleaned_up_root_is_skipped(self, engine, frame_queue):
+        """Test that a root disposed before the frame is not laid out."""
+        root, _ = build_mounted_tree(engine, 2)
+        engine.request_layout(root)
+        engine.cleanup_component(root)
+
+        assert engine.flush_layout() == 0
+        assert root.frames == []
+
+
+@pytest.fixture
+def converter():
+    StyleConverter.clear_cache()
+    yield StyleConverter
+    StyleConverter.clear_cache()
+
+
+class TestStyleConversionCache:
+    """Test that identical layout styles are converted once."""
+
+    def test_mounting_large_tree_converts_each_style_once(self, engine, converter):
+        """Test that a 5,000-node tree does far fewer conversions than nodes."""
+        root, _ = build_list(engine, 1000, cells=4)
+
+        stats = converter.get_cache_stats()
+        assert len(engine.get_node_for_component(root).children) == 1000
+        assert stats["conversions"] == 3  # root, row and cell styles
+        assert stats["hits"] == 5001 - 3
+
+    def test_shared_style_is_reused(self, converter):
+        """Test that equal layout properties map to the same Stretchable style."""
+        first = converter.convert_to_stretchable_style(ComponentStyle(width=px(50), color="red"))
+        second = converter.convert_to_stretchable_style(ComponentStyle(width=50, color="blue"))
+
+        assert first is second
+
+    def test_mutated_style_is_reconverted(self, converter):
+        """Test that changing a style in place does not hit the stale entry."""
+        style = ComponentStyle(width=px(50))
+        before = converter.convert_to_stretchable_style(style)
+
+        style.width = px(80)
+        after = converter.convert_to_stretchable_style(style)
+
+        assert after is not before
+        assert after.size.width.value == 80
+        assert converter.get_cache_stats()["conversions"] == 2
+
+    def test_viewport_units_bypass_cache(self, converter):
+        """Test that vw/vh styles are converted every time."""
+        style = ComponentStyle(width=vw(50))
+
+        converter.convert_to_stretchable_style(style)
+        converter.convert_to_stretchable_style(style)
+
+        assert converter.get_cache_stats() == {
+            "conversions": 2,
+            "hits": 0,
+            "cached": 0,
+            "grid_template_parses": 0,
+            "grid_template_hits": 0,
+        }
+
+    def test_grid_template_parsed_once(self, converter):
+        """Test that grid templates are cached separately from whole styles."""
+        for width in (100, 200, 300):
+            converter.convert_to_stretchable_style(
+                ComponentStyle(display=Display.GRID, grid_template_columns="repeat(3, 1fr)", width=width)
+            )
+
+        stats = converter.get_cache_stats()
+        assert stats["conversions"] == 3
+        assert stats["grid_template_parses"] == 1
+        assert stats["grid_template_hits"] == 2
+
+    def test_visual_only_update_keeps_node_clean(self, engine, converter):
+        """Test that a style update touching no layout property does not dirty the node."""
+        item = StubComponent(width=px(50), height=px(20))
+        node = engine.create_node_for_component(item)
+        engine.compute_layout_for_component(item, (100, 100))
+
+        item.style = ComponentStyle(width=px(50), height=px(20), background_color="#fff")
+        node.update_style(item.style)
+
+        assert not node._stretchable_node.is_dirty
+
+
+class ScanCountingDict(dict):
+    """Component map that counts full scans."""
+
+    scans = 0
+
+    def items(self):
+        ScanCountingDict.scans += 1
+        return super().items()
+
+
+def build_flat_tree(engine, children):
+    root = StubComponent(display=Display.FLEX, width=px(400))
+    engine.create_node_for_component(root)
+    items = [StubComponent(height=px(10)) for _ in range(children)]
+    for item in items:
+        engine.add_child_relationship(root, item)
+    return root, items
+
+
+class TestChildIndex:
+    """Test position bookkeeping between layout nodes and their children."""
+
+    def test_index_of_tracks_removals(self, engine):
+        """Test that positions stay correct after removing from the middle."""
+        root, items = build_flat_tree(engine, 6)
+        root_node = engine.get_node_for_component(root)
+        nodes = [engine.get_node_for_component(item) for item in items]
+
+        root_node.remove_child(nodes[1])
+        root_node.remove_child(nodes[3])
+
+        assert [root_node.index_of(node) for node in nodes] == [0, -1, 1, -1, 2, 3]
+        assert list(root_node._stretchable_node) == [
+            node._stretchable_node for node in root_node.children
+        ]
+
+    def test_index_of_ignores_foreign_nodes(self, engine):
+        """Test that a node of another parent is not reported as a child."""
+        first, first_items = build_flat_tree(engine, 2)
+        second, _ = build_flat_tree(engine, 2)
+
+        other = engine.get_node_for_component(first_items[1])
+        assert engine.get_node_for_component(second).index_of(other) == -1
+
+    def test_index_of_recovers_from_direct_list_edits(self, engine):
+        """Test that editing children directly does not leave stale positions."""
+        root, items = build_flat_tree(engine, 4)
+        root_node = engine.get_node_for_component(root)
+        last = engine.get_node_for_component(items[3])
+        assert root_node.index_of(last) == 3
+
+        root_node.children.reverse()
+
+        assert root_node.index_of(last) == 0
+
+    def test_tree_info_does_not_scan_component_map(self, engine):
+        """Test that building tree info resolves children through back-references."""
+        engine._component_nodes = ScanCountingDict()
+        root, _ = build_list(engine, 200, cells=2)
+        ScanCountingDict.scans = 0
+
+        info = engine.get_node_tree_info(root)
+
+        assert ScanCountingDict.scans == 0
+        assert info["children_count"] == 200
+        assert info["children"][-1]["children_count"] == 2
+
+    def test_health_check_finds_consistent_tree_healthy(self, engine):
+        """Test that health_check verifies parent links through child positions."""
+        root, items = build_flat_tree(engine, 50)
+        for item in items:
+            item.parent = root
+        stray = StubComponent()
+        stray.parent = root
+        engine.create_node_for_component(stray)
+
+        health = engine.health_check()
+
+        assert health["total_nodes"] == 52
+        assert health["orphaned_nodes"] == 1
+        assert not health["healthy"]
+
+
+def child_tops(engine, root):
+    """Each child's y position after a fresh layout pass, in tree order."""
+    engine.compute_layout_for_component(root, (400, 1000))
+    return [node.get_layout()[1] for node in engine.get_node_for_component(root).children]
+
+
+class TestChildOrdering:
+    """Test positional insert, move and reorder on the layout tree."""
+
+    def test_add_child_honors_index(self, engine):
+        """Test that inserting at an index places the node there in Taffy too."""
+        root, items = build_flat_tree(engine, 3)
+        inserted = StubComponent(height=px(30))
+
+        engine.add_child_relationship(root, inserted, 1)
+
+        order = [node.component for node in engine.get_node_for_component(root).children]
+        assert order == [items[0], inserted, items[1], items[2]]
+        assert child_tops(engine, root) == [0, 10, 40, 50]
+
+    def test_out_of_range_index_appends(self, engine):
+        """Test that an index past the end appends."""
+        root, items = build_flat_tree(engine, 2)
+        extra = StubComponent(height=px(10))
+
+        engine.add_child_relationship(root, extra, 99)
+
+        assert engine.get_node_for_component(root).children[-1].component is extra
+
+    def test_move_child_keeps_node(self, engine):
+        """Test that moving a child reuses its node and relays out the siblings."""
+        root, items = build_flat_tree(engine, 4)
+        items[3].style = ComponentStyle(height=px(25))
+        engine.update_component_style(items[3])
+        moved_node = engine.get_node_for_component(items[3])
+
+        assert engine.move_child_relationship(root, items[3], 0)
+
+        root_node = engine.get_node_for_component(root)
+        assert root_node.children[0] is moved_node
+        assert root_node.index_of(moved_node) == 0
+        assert child_tops(engine, root) == [0, 25, 35, 45]
+
+    def test_reorder_rebuilds_only_changed_suffix(self, engine, monkeypatch):
+        """Test that an unchanged prefix is not detached from Taffy."""
+        root, items = build_flat_tree(engine, 6)
+        root_node = engine.get_node_for_component(root)
+        appended = []
+        original = layout._IncrementalNode.append
+
+        def counting(node, child):
+            appended.append(child)
+            return original(node, child)
+
+        monkeypatch.setattr(layout._IncrementalNode, "append", counting)
+
+        new_order = items[:3] + [items[5], items[3], items[4]]
+        assert engine.reorder_child_relationships(root, new_order)
+
+        assert [node.component for node in root_node.children] == new_order
+        assert len(appended) == 3
+        assert [root_node.index_of(engine.get_node_for_component(c)) for c in new_order] == list(range(6))
+
+    def test_reorder_rejects_different_children(self, engine):
+        """Test that reorder refuses a list that is not a permutation."""
+        root, items = build_flat_tree(engine, 3)
+
+        assert not engine.reorder_child_relationships(root, items[:2])
+        assert not engine.reorder_child_relationships(root, [items[0], items[0], items[1]])
+        assert [node.component for node in engine.get_node_for_component(root).children] == items
@@ -9,7 +9,17 @@ batch processing, and smart dependency tracking.
 
 import pytest
 from unittest.mock import MagicMock, call
-from hibiki.ui.core.reactive import Signal, Computed, Effect, batch
+import gc
+import threading
+import weakref
+
+from hibiki.ui.core.reactive import (
+    Signal, Computed, Effect, batch, set_reactive_tracing, is_reactive_tracing,
+    Owner, create_root, get_owner, get_reactive_stats,
+    set_main_thread_dispatcher, drain_pending_writes, set_thread_check, call_after_batch,
+    run_on_ui_thread,
+    ListSignal, DictSignal, ListChange, DictChange, MISSING
+)
 
 
 class TestSignal:
@@ -364,6 +374,154 @@ class TestBatchProcessing:
         # Should compute once with final values
         assert results == [15]
 
+    def test_call_after_batch_runs_after_effects(self):
+        """Test that after-batch callbacks see every effect of the batch."""
+        signal = Signal(0)
+        seen = []
+        order = []
+
+        def effect_fn():
+            order.append(("effect", signal.value))
+            if signal.value:
+                call_after_batch(lambda: order.append(("after", signal.value)))
+
+        effect = Effect(effect_fn)
+        order.clear()
+
+        with batch():
+            signal.value = 1
+            seen.append(call_after_batch(lambda: order.append(("outer", signal.value))))
+
+        assert seen == [True]
+        assert order == [("effect", 1), ("outer", 1), ("after", 1)]
+
+    def test_call_after_batch_outside_batch(self):
+        """Test that registering outside a batch is refused."""
+        assert call_after_batch(lambda: None) is False
+
+
+class TestPushPullScheduling:
+    """Test the push-pull scheduler (mark dirty, then pull in height order)."""
+    
+    def test_diamond_recomputes_each_node_once(self):
+        """Test that a diamond graph recomputes every node once per change."""
+        source = Signal(1)
+        calls = {"left": 0, "right": 0, "join": 0}
+        
+        def left_fn():
+            calls["left"] += 1
+            return source.value + 1
+        
+        def right_fn():
+            calls["right"] += 1
+            return source.value * 2
+        
+        left = Computed(left_fn)
+        right = Computed(right_fn)
+        
+        def join_fn():
+            calls["join"] += 1
+            return left.value + right.value
+        
+        join = Computed(join_fn)
+        results = []
+        effect = Effect(lambda: results.append(join.value))
+        
+        assert results == [4]
+        for name in calls:
+            calls[name] = 0
+        
+        source.value = 2
+        
+        assert results == [4, 7]
+        assert calls == {"left": 1, "right": 1, "join": 1}
+    
+    def test_unchanged_computed_skips_downstream(self):
+        """Test that an unchanged Computed value does not re-run its effects."""
+        number = Signal(1)
+        parity = Computed(lambda: number.value % 2)
+        runs = []
+        
+        effect = Effect(lambda: runs.append(parity.value))
+        runs.clear()
+        
+        number.value = 3  # parity still 1
+        assert runs == []
+        
+        number.value = 4
+        assert runs == [0]
+    
+    def test_shared_computed_recomputed_once_per_batch(self):
+        """Test that many changed signals feeding one Computed cost one recompute."""
+        signals = [Signal(i) for i in range(50)]
+        call_count = 0
+        
+        def total_fn():
+            nonlocal call_count
+            call_count += 1
+            return sum(s.value for s in signals)
+        
+        total = Computed(total_fn)
+        results = []
+        effect = Effect(lambda: results.append(total.value))
+        call_count = 0
+        results.clear()
+        
+        with batch():
+            for s in signals:
+                s.value += 1
+        
+        assert call_count == 1
+        assert results == [sum(range(50)) + 50]
+    
+    def test_effects_run_in_height_order(self):
+        """Test that shallower effects run before deeper ones within a flush."""
+        source = Signal(0)
+        doubled = Computed(lambda: source.value * 2)
+        order = []
+        
+        deep = Effect(lambda: order.append(("deep", doubled.value)))
+        shallow = Effect(lambda: order.append(("shallow", source.value)))
+        order.clear()
+        
+        source.value = 1
+        assert order == [("shallow", 1), ("deep", 2)]
+    
+    def test_effect_writing_signal_during_flush(self):
+        """Test that an effect may write another signal while the batch flushes."""
+        source = Signal(1)
+        mirror = Signal(0)
+        seen = []
+        
+        writer = Effect(lambda: setattr(mirror, "value", source.value * 10))
+        reader = Effect(lambda: seen.append(mirror.value))
+        
+        source.value = 2
+        assert mirror.value == 20
+        assert seen == [10, 20]
+
+
+class TestTracing:
+    """Test the reactive tracing switch."""
+    
+    def test_tracing_disabled_by_default(self):
+        """Test that the hot path runs without tracing unless enabled."""
+        assert is_reactive_tracing() is False
+    
+    def test_tracing_does_not_change_behavior(self):
+        """Test that enabling tracing only adds logging."""
+        set_reactive_tracing(True)
+        try:
+            signal = Signal(1)
+            doubled = Computed(lambda: signal.value * 2)
+            results = []
+            effect = Effect(lambda: results.append(doubled.value))
+            signal.value = 2
+            assert results == [2, 4]
+        finally:
+            set_reactive_tracing(False)
+        assert is_reactive_tracing() is False
+
 
 class TestCircularDependencies:
     """Test circular dependency detection and handling."""
@@ -462,6 +620,450 @@ class TestMemoryManagement:
         assert double not in base._observers
 
 
+class TestCompactStorage:
+    """Test slotted primitives and compact dependency storage."""
+    
+    def test_primitives_have_no_instance_dict(self):
+        """Test that Signal, Computed and Effect are slotted."""
+        signal = Signal(0)
+        computed = Computed(lambda: signal.value)
+        effect = Effect(lambda: computed.value)
+        
+        for node in (signal, computed, effect):
+            assert not hasattr(node, "__dict__")
+        effect.cleanup()
+    
+    def test_effect_memory_footprint(self):
+        """Test bytes per Effect with one dependency (see benchmarks/bench_reactive_memory.py)."""
+        import tracemalloc
+        
+        count = 2000
+        sources = [Signal(0) for _ in range(count)]
+        callbacks = [lambda s=s: s.value for s in sources]
+        gc.collect()
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        effects = [Effect(callbacks[i]) for i in range(count)]
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        assert all(effect._scope is None for effect in effects)  # 没有子节点时不分配子作用域
+        assert (after - before) / count < 500
+        for effect in effects:
+            effect.cleanup()
+    
+    def test_signal_observers_allocated_lazily(self):
+        """Test that an unobserved signal does not allocate observer storage."""
+        signal = Signal(0)
+        assert signal._obs is None
+    
+    def test_repeated_reads_track_dependency_once(self):
+        """Test that reading the same signal repeatedly records one dependency."""
+        signal = Signal(1)
+        effect = Effect(lambda: [signal.value for _ in range(20)])
+        
+        assert effect._sources == [signal]
+        assert len(signal._observers) == 1
+        effect.cleanup()
+    
+    def test_many_dependencies_promote_to_index(self):
+        """Test that large dependency lists stay deduplicated and reactive."""
+        signals = [Signal(i) for i in range(30)]
+        results = []
+        
+        effect = Effect(lambda: results.append(sum(s.value + s.value for s in signals)))
+        assert len(effect._sources) == 30
+        assert effect._source_index is not None
+        
+        signals[25].value = 100
+        assert results[-1] == 2 * (sum(range(30)) - 25 + 100)
+        effect.cleanup()
+        assert all(not s._observers for s in signals)
+
+
+class TestOwnership:
+    """Test Owner scopes, weak observer links and the leak counter."""
+    
+    def test_owner_dispose_stops_effects(self):
+        """Test that disposing an owner cleans up every effect created in it."""
+        signal = Signal(0)
+        runs = []
+        owner = Owner()
+        
+        with owner:
+            Effect(lambda: runs.append(("a", signal.value)))
+            Effect(lambda: runs.append(("b", signal.value)))
+        
+        assert owner.node_count == 2
+        owner.dispose()
+        assert owner.node_count == 0
+        
+        runs.clear()
+        signal.value = 1
+        assert runs == []
+        assert len(signal._observers) == 0
+    
+    def test_nested_owner_disposed_with_parent(self):
+        """Test that child owners are disposed with their parent."""
+        signal = Signal(0)
+        runs = []
+        parent = Owner()
+        child = Owner(parent=parent)
+        
+        with child:
+            Effect(lambda: runs.append(signal.value))
+        
+        parent.dispose()
+        signal.value = 1
+        assert runs == [0]
+    
+    def test_create_root_returns_result_and_dispose(self):
+        """Test create_root runs fn in a detached scope with a dispose handle."""
+        signal = Signal(0)
+        runs = []
+        
+        def setup(dispose):
+            assert get_owner() is not None
+            Effect(lambda: runs.append(signal.value))
+            return dispose
+        
+        dispose = create_root(setup)
+        assert get_owner() is None
+        
+        signal.value = 1
+        dispose()
+        signal.value = 2
+        assert runs == [0, 1]
+    
+    def test_effect_created_by_effect_owned_by_its_run(self):
+        """Test that nodes created during an effect run are disposed before it reruns."""
+        trigger = Signal(0)
+        inner_signal = Signal(0)
+        inner_runs = []
+        owner = Owner()
+        
+        def outer():
+            _ = trigger.value
+            Computed(lambda: inner_signal.value)
+            Effect(lambda: inner_runs.append(inner_signal.value))
+        
+        with owner:
+            effect = Effect(outer)
+        
+        for i in range(1, 6):
+            trigger.value = i
+        
+        assert owner.node_count == 1
+        assert effect._scope.node_count == 2
+        
+        inner_runs.clear()
+        inner_signal.value = 1
+        assert inner_runs == [1]
+        
+        owner.dispose()
+        inner_runs.clear()
+        inner_signal.value = 2
+        assert inner_runs == []
+        assert len(inner_signal._observers) == 0
+    
+    def test_unowned_effect_cleanup_disposes_children(self):
+        """Test that an unowned effect's children do not leak into the global registry."""
+        signal = Signal(0)
+        before = get_reactive_stats()["unowned_effects"]
+        
+        effect = Effect(lambda: Effect(lambda: signal.value))
+        assert get_reactive_stats()["unowned_effects"] == before + 1
+        
+        effect.cleanup()
+        assert get_reactive_stats()["unowned_effects"] == before
+        assert len(signal._observers) == 0
+    
+    def test_create_root_survives_dropped_dispose_handle(self):
+        """Test that a root stays alive until dispose even if the caller drops the handle."""
+        signal = Signal(0)
+        runs = []
+        
+        def setup(dispose):
+            Effect(lambda: runs.append(signal.value))
+            return weakref.ref(get_owner())
+        
+        root = create_root(setup)
+        roots = get_reactive_stats()["roots"]
+        gc.collect()
+        
+        signal.value = 1
+        assert runs == [0, 1]
+        
+        root().dispose()
+        assert get_reactive_stats()["roots"] == roots - 1
+        signal.value = 2
+        assert runs == [0, 1]
+    
+    def test_dropped_owner_releases_effects(self):
+        """Test that signals only hold weak links to their observers."""
+        signal = Signal(0)
+        runs = []
+        owner = Owner()
+        
+        with owner:
+            Effect(lambda: runs.append(signal.value))
+        assert len(signal._observers) == 1
+        
+        del owner
+        gc.collect()
+        
+        assert len(signal._observers) == 0
+        signal.value = 1
+        assert runs == [0]
+    
+    def test_leak_counter_tracks_unowned_effects(self):
+        """Test that get_reactive_stats reports effects without an owner."""
+        signal = Signal(0)
+        before = get_reactive_stats()
+        
+        unowned = Effect(lambda: signal.value)
+        with Owner():
+            owned = Effect(lambda: signal.value)
+        
+        during = get_reactive_stats()
+        assert during["unowned_effects"] == before["unowned_effects"] + 1
+        assert during["effects_created"] == before["effects_created"] + 2
+        
+        unowned.cleanup()
+        owned.cleanup()
+        after = get_reactive_stats()
+        assert after["unowned_effects"] == before["unowned_effects"]
+        assert after["effects_disposed"] == before["effects_disposed"] + 2
+
+
+class TestEqualityStrategies:
+    """Test pluggable equality for Signal and Computed."""
+    
+    def test_identity_equality_skips_deep_comparison(self):
+        """Test that identity equality notifies for equal-but-distinct values."""
+        signal = Signal([1, 2], equals="identity")
+        runs = []
+        effect = Effect(lambda: runs.append(signal.value))
+        
+        signal.value = [1, 2]
+        assert len(runs) == 2
+        
+        same = signal.value
+        signal.value = same
+        assert len(runs) == 2
+        effect.cleanup()
+    
+    def test_versioned_equality_always_notifies(self):
+        """Test that versioned equality treats every write as a change."""
+        signal = Signal(1, equals="versioned")
+        signal.value = 1
+        signal.value = 1
+        assert signal._version == 2
+    
+    def test_custom_comparator(self):
+        """Test a custom equals(old, new) comparator."""
+        signal = Signal(1.0, equals=lambda old, new: abs(old - new) < 0.5)
+        signal.value = 1.2
+        assert signal.value == 1.0
+        signal.value = 2.0
+        assert signal.value == 2.0
+    
+    def test_computed_equals(self):
+        """Test that Computed honours its equality strategy."""
+        source = Signal(1)
+        computed = Computed(lambda: source.value // 10, equals=lambda old, new: old == new)
+        assert computed.value == 0
+        version = computed._version
+        source.value = 2
+        assert computed.value == 0
+        assert computed._version == version
+    
+    def test_unknown_strategy_rejected(self):
+        """Test that unknown strategy names raise ValueError."""
+        with pytest.raises(ValueError):
+            Signal(0, equals="deep")
+
+
+class TestCollectionSignals:
+    """Test ListSignal / DictSignal in-place mutation and change records."""
+    
+    def test_list_mutations_record_changes(self):
+        """Test that list mutations emit ListChange records."""
+        songs = ListSignal([1, 2, 3])
+        start = songs.version
+        
+        songs.append(4)
+        songs.insert(0, 0)
+        songs.remove(2)
+        songs.set_item(0, 10)
+        
+        assert songs.value == [10, 1, 3, 4]
+        changes = songs.changes_since(start)
+        assert [(c.index, c.removed, c.inserted) for c in changes] == [
+            (3, (), (4,)),
+            (0, (), (0,)),
+            (2, (2,), ()),
+            (0, (0,), (10,)),
+        ]
+        assert all(isinstance(c, ListChange) for c in changes)
+        assert songs.changes_since(songs.version) == []
+    
+    def test_list_mutation_is_in_place(self):
+        """Test that mutations keep the same list object (no copy)."""
+        songs = ListSignal()
+        backing = songs.value
+        songs.extend(range(1000))
+        assert songs.value is backing
+        assert songs.pop() == 999
+        assert songs.splice(0, 2, ["a"]) == [0, 1]
+        assert songs.value[:2] == ["a", 2]
+    
+    def test_list_mutation_notifies_observers(self):
+        """Test that effects and versioned computeds see in-place changes."""
+        songs = ListSignal([1])
+        passthrough = Computed(lambda: songs.value, equals="versioned")
+        sizes = []
+        effect = Effect(lambda: sizes.append(len(passthrough.value)))
+        
+        songs.append(2)
+        songs.extend([])  # 空修改不通知
+        assert sizes == [1, 2]
+        effect.cleanup()
+    
+    def test_replacement_resets_history(self):
+        """Test that set() invalidates incremental history."""
+        songs = ListSignal([1])
+        start = songs.version
+        songs.append(2)
+        songs.value = [3]
+        assert songs.changes_since(start) is None
+        assert songs.changes_since(songs.version) == []
+    
+    def test_history_overflow(self):
+        """Test that an overflowed history reports increments as unavailable."""
+        songs = ListSignal()
+        start = songs.version
+        for i in range(ListSignal._MAX_CHANGES + 1):
+            songs.append(i)
+        assert songs.changes_since(start) is None
+        assert len(songs.changes_since(songs.version - 5)) == 5
+    
+    def test_dict_signal_changes(self):
+        """Test DictSignal change records and batched update()."""
+        tags = DictSignal({"a": 1})
+        runs = []
+        effect = Effect(lambda: runs.append(tags.get_item("b")))
+        start = tags.version
+        
+        tags.update({"a": 2, "b": 3})
+        assert runs == [None, 3]  # 一次 update 只通知一次
+        assert tags.pop("a") == 2
+        
+        assert tags.changes_since(start) == [
+            DictChange(start + 1, "a", 1, 2),
+            DictChange(start + 1, "b", MISSING, 3),
+            DictChange(start + 2, "a", 2, MISSING),
+        ]
+        effect.cleanup()
+
+
+class TestThreadAffinity:
+    """Test marshalling of off-thread Signal writes onto the UI thread."""
+    
+    def _write_from_thread(self, signal, value):
+        thread = threading.Thread(target=lambda: signal.set(value))
+        thread.start()
+        thread.join()
+    
+    def test_off_thread_write_is_queued_until_drained(self):
+        """Test that a background write only lands when the UI thread drains the queue."""
+        scheduled = []
+        set_main_thread_dispatcher(scheduled.append)
+        try:
+            signal = Signal(0)
+            seen = []
+            effect = Effect(lambda: seen.append(signal.value))
+            
+            self._write_from_thread(signal, 1)
+            self._write_from_thread(signal, 2)
+            
+            assert signal.value == 0
+            assert scheduled == [drain_pending_writes]  # 只调度一次
+            
+            assert scheduled[0]() == 2
+            assert signal.value == 2
+            assert seen == [0, 2]  # 同一轮写入合并为一次更新
+            effect.cleanup()
+        finally:
+            set_main_thread_dispatcher(None)
+            drain_pending_writes()
+    
+    def test_off_thread_write_without_dispatcher_waits_for_drain(self):
+        """Test that without a dispatcher off-thread writes stay queued until drained."""
+        signal = Signal(0)
+        seen = []
+        effect = Effect(lambda: seen.append(signal.value))
+        
+        self._write_from_thread(signal, 5)
+        assert signal.value == 0
+        assert get_reactive_stats()["pending_writes"] == 1
+        
+        assert drain_pending_writes() == 1
+        assert signal.value == 5
+        assert seen == [0, 5]
+        effect.cleanup()
+    
+    def test_off_thread_list_mutation_is_queued(self):
+        """Test that ListSignal mutations are marshalled like plain writes."""
+        scheduled = []
+        set_main_thread_dispatcher(scheduled.append)
+        try:
+            songs = ListSignal([1])
+            thread = threading.Thread(target=lambda: songs.append(2))
+            thread.start()
+            thread.join()
+            assert songs.value == [1]
+            drain_pending_writes()
+            assert songs.value == [1, 2]
+        finally:
+            set_main_thread_dispatcher(None)
+            drain_pending_writes()
+    
+    def test_run_on_ui_thread_keeps_order_with_queued_writes(self):
+        """Test that a marshalled closure runs after earlier writes and sees their result."""
+        songs = ListSignal([1])
+        seen = []
+        
+        def worker():
+            songs.append(2)
+            run_on_ui_thread(lambda: seen.append(list(songs.value)))
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        assert seen == []
+        
+        assert drain_pending_writes() == 2
+        assert seen == [[1, 2]]
+        
+        run_on_ui_thread(seen.append, "now")  # UI 线程上立即执行
+        assert seen[-1] == "now"
+    
+    def test_cross_thread_writes_are_counted_and_flagged(self):
+        """Test that debug thread checking reports off-thread writes."""
+        signal = Signal(0)
+        before = get_reactive_stats()["cross_thread_writes"]
+        set_thread_check(True)
+        try:
+            self._write_from_thread(signal, 1)
+        finally:
+            set_thread_check(False)
+            drain_pending_writes()
+        
+        signal.set(2)  # UI 线程写入不计数
+        assert get_reactive_stats()["cross_thread_writes"] == before + 1
+
+
 class TestEdgeCases:
     """Test edge cases and error conditions."""
     
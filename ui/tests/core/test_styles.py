@@ -441,4 +441,31 @@ class TestStyleUtilities:
         
         # Styles with same properties should be equal
         assert style1.to_dict() == style2.to_dict()
-        assert style1.to_dict() != style3.to_dict()
\ No newline at end of file
+        assert style1.to_dict() != style3.to_dict()
+
+class TestLayoutKey:
+    """Test the hashable layout snapshot used by the style conversion cache."""
+
+    def test_equal_layout_gives_equal_key(self):
+        """Test that styles differing only in visual properties share a key."""
+        style1 = ComponentStyle(width=100, height=px(20), background_color="#fff")
+        style2 = ComponentStyle(width=px(100), height=20, background_color="#000")
+
+        assert style1.layout_key() == style2.layout_key()
+        assert hash(style1.layout_key()) == hash(style2.layout_key())
+
+    def test_mutation_changes_key(self):
+        """Test that the key follows in-place changes to the style and its lengths."""
+        style = ComponentStyle(width=px(100))
+        before = style.layout_key()
+
+        style.width.value = 120
+        assert style.layout_key() != before
+
+        style.width = px(100)
+        assert style.layout_key() == before
+
+    def test_viewport_units_are_not_cacheable(self):
+        """Test that vw/vh styles have no key because they depend on the window."""
+        assert ComponentStyle(width=vw(50)).layout_key() is None
+        assert ComponentStyle(margin=vh(10)).layout_key() is None